@@ -0,0 +1,1288 @@
+# benchmarks.py
+"""
+Offline benchmarks for the matching pipeline.
+
+Run ``python benchmarks.py`` for every benchmark or ``python benchmarks.py rank_resumes``
+for a single one. Each benchmark returns a dict of numbers that is printed as JSON.
+HF_API_TOKEN is cleared so extraction always takes the local fallback path, and the
+Hugging Face libraries are put in offline mode, so everything runs without a network.
+
+Save a run with ``--out run.jsonl`` and check a later run against it with
+``python benchmarks.py --compare base.jsonl new.jsonl`` (exits 1 on a regression).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from stub_inference import StubInferenceServer
+from synthetic_corpus import generate_corpus, make_jd, make_pair, make_resume
+
+os.environ.pop("HF_API_TOKEN", None)
+
+# Models must already be in the local Hugging Face cache; nothing is downloaded
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+BENCHMARKS: Dict[str, Callable[..., Dict]] = {}
+
+
+def benchmark(fn: Callable[..., Dict]) -> Callable[..., Dict]:
+    """Register a ``bench_<name>`` function under ``<name>``."""
+    BENCHMARKS[fn.__name__[len("bench_"):]] = fn
+    return fn
+
+
+def reset_caches() -> None:
+    """Empty the in-memory section and embedding caches so every phase starts cold."""
+    import matching
+
+    matching.section_cache.clear()
+    matching.embedding_cache.clear()
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence stray prints (e.g. model loading chatter) while timing."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+@benchmark
+def bench_rank_resumes(n: int = 200, seed: int = 0) -> Dict:
+    """Throughput of rank_resumes versus looping match_resume_to_jd."""
+    from matching import match_resume_to_jd, rank_resumes
+
+    rng = random.Random(seed)
+    jd = make_jd(rng)
+    resumes = [make_resume(rng) for _ in range(n)]
+
+    with quiet():
+        # Warm the model so neither side pays for lazy initialisation
+        match_resume_to_jd(resumes[0], jd)
+
+        reset_caches()
+        start = time.perf_counter()
+        looped = [match_resume_to_jd(resume, jd)[0] for resume in resumes]
+        loop_seconds = time.perf_counter() - start
+
+        reset_caches()
+        start = time.perf_counter()
+        ranked = rank_resumes(jd, resumes, top_k=None)
+        rank_seconds = time.perf_counter() - start
+
+    batched = {entry["resume_id"]: entry["overall"] for entry in ranked}
+    max_diff = max(abs(looped[i] - batched[i]) for i in range(n))
+
+    return {
+        "resumes": n,
+        "loop_seconds": round(loop_seconds, 3),
+        "rank_seconds": round(rank_seconds, 3),
+        "loop_resumes_per_second": round(n / loop_seconds, 1),
+        "rank_resumes_per_second": round(n / rank_seconds, 1),
+        "speedup": round(loop_seconds / rank_seconds, 2),
+        "max_score_difference": round(max_diff, 2),
+    }
+
+
+@benchmark
+def bench_embedding_cache(n: int = 500, seed: int = 0) -> Dict:
+    """Cold versus warm cost of encoding the same texts through the embedding cache."""
+    import tempfile
+
+    from embedding_cache import EmbeddingCache
+    from matching import EMBEDDING_MODEL_NAME, embedding_model
+
+    rng = random.Random(seed)
+    texts = [make_resume(rng) for _ in range(n)]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = EmbeddingCache(EMBEDDING_MODEL_NAME, cache_dir=cache_dir)
+        start = time.perf_counter()
+        cache.encode(embedding_model, texts)
+        cold_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cache.encode(embedding_model, texts)
+        memory_seconds = time.perf_counter() - start
+
+        # A fresh process-level cache only has the disk tier to draw from
+        reopened = EmbeddingCache(EMBEDDING_MODEL_NAME, cache_dir=cache_dir)
+        start = time.perf_counter()
+        reopened.encode(embedding_model, texts)
+        disk_seconds = time.perf_counter() - start
+
+    return {
+        "texts": n,
+        "cold_seconds": round(cold_seconds, 4),
+        "memory_hit_seconds": round(memory_seconds, 4),
+        "disk_hit_seconds": round(disk_seconds, 4),
+        "memory_stats": cache.stats(),
+        "disk_stats": reopened.stats(),
+    }
+
+
+@benchmark
+def bench_import_time(repeats: int = 5) -> Dict:
+    """Cold-process cost of ``import matching`` versus the first score request."""
+    import subprocess
+    import sys
+
+    script = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "import matching, model_registry\n"
+        "imported = time.perf_counter()\n"
+        "loaded_on_import = model_registry.is_loaded()\n"
+        "matching.calculate_simple_similarity('python developer', 'python engineer')\n"
+        "scored = time.perf_counter()\n"
+        "print(imported - start, scored - imported, loaded_on_import)\n"
+    )
+    import_ms, first_score_ms = [], []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.split()
+        import_ms.append(float(output[-3]) * 1000)
+        first_score_ms.append(float(output[-2]) * 1000)
+        loaded_on_import = output[-1] == "True"
+
+    return {
+        "import_matching_ms": round(min(import_ms), 1),
+        "first_score_ms": round(min(first_score_ms), 1),
+        "model_loaded_on_import": loaded_on_import,
+    }
+
+
+@benchmark
+def bench_extractor_round_trips(pairs: int = 10, delay: float = 0.05, seed: int = 0) -> Dict:
+    """Per-prompt versus batched extraction against a local stand-in inference server."""
+    import matching
+
+    rng = random.Random(seed)
+    jd = make_jd(rng)
+    resumes = [make_resume(rng) for _ in range(pairs)]
+    results = {"pairs": pairs, "server_delay_seconds": delay}
+
+    original_url = matching.HF_API_URL
+    try:
+        for name in ("hf", "hf-batch", "regex"):
+            with StubInferenceServer(delay=delay) as server, quiet():
+                matching.HF_API_URL = server.url
+                matching.set_extractor(name)
+                reset_caches()
+                start = time.perf_counter()
+                matching.match_resume_to_jd(resumes[0], jd)
+                single_seconds = time.perf_counter() - start
+                single_requests = server.requests
+
+                start = time.perf_counter()
+                matching.rank_resumes(jd, resumes, top_k=None)
+                rank_seconds = time.perf_counter() - start
+
+            results[name] = {
+                "round_trips_per_match": single_requests,
+                "match_seconds": round(single_seconds, 3),
+                "round_trips_rank": server.requests - single_requests,
+                "rank_seconds": round(rank_seconds, 3),
+            }
+    finally:
+        matching.close_async_clients()
+        matching.HF_API_URL = original_url
+        matching.set_extractor(None)
+    return results
+
+
+@benchmark
+def bench_llm_concurrency(delay: float = 0.1, seed: int = 0) -> Dict:
+    """End-to-end match latency with serial versus concurrent prompts on a mock server."""
+    import matching
+    from extractors import PromptExtractor
+
+    rng = random.Random(seed)
+    jd, resume = make_jd(rng), make_resume(rng)
+    results = {"server_delay_seconds": delay}
+
+    original_url = matching.HF_API_URL
+    try:
+        serial = PromptExtractor(matching.call_llm, matching.simple_extraction_fallback)
+        concurrent = matching.make_extractor("hf")
+        for label, extractor in (("serial", serial), ("concurrent", concurrent)):
+            with StubInferenceServer(delay=delay) as server, quiet():
+                matching.HF_API_URL = server.url
+                matching.set_extractor(extractor)
+                # Open the pooled sessions before timing
+                extractor.extract(resume, "skills", "resume")
+                server.requests = 0
+                reset_caches()
+                start = time.perf_counter()
+                matching.match_resume_to_jd(resume, jd)
+                results[f"{label}_match_seconds"] = round(time.perf_counter() - start, 3)
+                results[f"{label}_requests"] = server.requests
+
+        # Transient 503 "model loading" and 429 responses are retried, not dropped to regex
+        with StubInferenceServer(delay=0.0, statuses=[503, 429]) as server, quiet():
+            matching.HF_API_URL = server.url
+            client = matching.get_async_client()
+            from llm_client import run_sync
+            answers = run_sync(client.generate_many(["What technical skills?"]))
+            results["retry_answer_ok"] = answers == [server.answer]
+            results["retry_requests"] = server.requests
+    finally:
+        matching.close_async_clients()
+        matching.HF_API_URL = original_url
+        matching.set_extractor(None)
+
+    results["speedup"] = round(results["serial_match_seconds"] / results["concurrent_match_seconds"], 2)
+    return results
+
+
+@benchmark
+def bench_section_cache(n: int = 50, delay: float = 0.02, seed: int = 0) -> Dict:
+    """Round trips and hit rate when one JD is matched against many resumes twice."""
+    import matching
+
+    rng = random.Random(seed)
+    jd = make_jd(rng)
+    resumes = [make_resume(rng) for _ in range(n)]
+
+    original_url = matching.HF_API_URL
+    try:
+        with StubInferenceServer(delay=delay) as server, quiet():
+            matching.HF_API_URL = server.url
+            matching.set_extractor("hf")
+            reset_caches()
+            before = matching.section_cache.stats()
+            for resume in resumes:
+                matching.match_resume_to_jd(resume, jd)
+            first_pass_requests = server.requests
+            for resume in resumes:
+                matching.match_resume_to_jd(resume, jd)
+            second_pass_requests = server.requests - first_pass_requests
+            after = matching.section_cache.stats()
+    finally:
+        matching.close_async_clients()
+        matching.HF_API_URL = original_url
+        matching.set_extractor(None)
+
+    lookups = sum(after[k] - before[k] for k in ("hits", "db_hits", "misses"))
+    hits = sum(after[k] - before[k] for k in ("hits", "db_hits"))
+    return {
+        "matches_per_pass": n,
+        "uncached_round_trips": 6 * n,
+        "first_pass_round_trips": first_pass_requests,
+        "second_pass_round_trips": second_pass_requests,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+def _legacy_fallback(text: str, section: str) -> str:
+    """simple_extraction_fallback as it was before the compiled lexicon, for comparison."""
+    import re
+
+    text_lower = text.lower()
+    patterns = {
+        "skills": [
+            r'python|java|javascript|react|angular|vue|node|django|flask|spring',
+            r'sql|mysql|postgresql|mongodb|oracle|database',
+            r'aws|azure|gcp|cloud|kubernetes|docker',
+            r'machine learning|ml|ai|data science|analytics',
+            r'git|github|version control|agile|scrum',
+        ],
+        "experience": [
+            r'\d+\+?\s*(years?|yrs?)\s*of\s*experience',
+            r'worked\s+as|experience\s+as|role\s+as',
+            r'developed|built|created|implemented|managed|led',
+        ],
+        "education": [
+            r'bachelor|master|phd|degree|university|college',
+            r'computer science|engineering|mathematics|statistics',
+            r'certification|certified|certificate',
+        ],
+    }[section]
+    found = []
+    for pattern in patterns:
+        found.extend(re.findall(pattern, text_lower))
+    if section == "experience":
+        return "; ".join(found[:3])
+    return ", ".join(set(found))
+
+
+@benchmark
+def bench_fallback_extraction(docs: int = 200, repeat: int = 20, seed: int = 0) -> Dict:
+    """Compiled single-pass lexicon versus the original per-pattern re.findall scans."""
+    import matching
+    from lexicon import get_lexicon
+
+    rng = random.Random(seed)
+    # Large resumes: many paragraphs each
+    corpus = ["\n".join(make_resume(rng) for _ in range(repeat)) for _ in range(docs)]
+    sections = ("skills", "experience", "education")
+
+    start = time.perf_counter()
+    for text in corpus:
+        for section in sections:
+            _legacy_fallback(text, section)
+    legacy_seconds = time.perf_counter() - start
+
+    lexicon = get_lexicon()
+    with quiet():
+        matching._lexicon_hits.cache_clear()
+        start = time.perf_counter()
+        for text in corpus:
+            for section in sections:
+                matching.simple_extraction_fallback(text, section)
+        lexicon_seconds = time.perf_counter() - start
+
+    # Grow the skills list to thousands of terms: the single scan should barely notice
+    import json
+    from lexicon import DEFAULT_LEXICON_PATH, Lexicon
+
+    with open(DEFAULT_LEXICON_PATH, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    data["skills"]["terms"] += ["".join(rng.choice(letters) for _ in range(rng.randint(4, 12))) for _ in range(5000)]
+    large = Lexicon(data)
+    start = time.perf_counter()
+    for text in corpus:
+        large.find_all(text)
+    large_seconds = time.perf_counter() - start
+
+    return {
+        "documents": docs,
+        "mean_chars": sum(map(len, corpus)) // docs,
+        "lexicon_terms": len(lexicon.term_sections),
+        "large_lexicon_terms": len(large.term_sections),
+        "large_lexicon_seconds": round(large_seconds, 4),
+        "legacy_seconds": round(legacy_seconds, 4),
+        "lexicon_seconds": round(lexicon_seconds, 4),
+        "speedup": round(legacy_seconds / lexicon_seconds, 2),
+        "legacy_ml_in_html": "ml" in _legacy_fallback("html and xml", "skills"),
+        "lexicon_ml_in_html": "ml" in lexicon.find_all("html and xml")["skills"],
+    }
+
+
+@benchmark
+def bench_vector_index(rows: int = 100000, dim: int = 384, queries: int = 20, k: int = 10, seed: int = 0) -> Dict:
+    """Search latency over a synthetic pool: exact float32, exact int8 and IVF approximate."""
+    import numpy as np
+
+    from vector_index import SectionIndex
+
+    rng = np.random.default_rng(seed)
+    sections = 3
+
+    def unit(shape):
+        vectors = rng.standard_normal(shape).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+    # Clustered data so the IVF lists mean something
+    centers = unit((64, dim))
+    labels = rng.integers(0, len(centers), size=rows)
+    pool = centers[labels][None, :, :].repeat(sections, axis=0) + 0.6 * unit((sections, rows, dim))
+    pool /= np.linalg.norm(pool, axis=-1, keepdims=True)
+    present = np.ones((sections, rows), dtype=bool)
+    hashes = np.arange(1, sections * rows + 1, dtype=np.uint64).reshape(sections, rows)
+    query_vectors = unit((queries, sections, dim)) * 0.3 + centers[rng.integers(0, len(centers), size=queries)][:, None, :]
+    query_vectors /= np.linalg.norm(query_vectors, axis=-1, keepdims=True)
+    query_present = np.ones(sections, dtype=bool)
+    query_hashes = np.zeros(sections, dtype=np.uint64)
+
+    def timed(index, **kwargs):
+        latencies, results = [], []
+        for query in query_vectors:
+            start = time.perf_counter()
+            results.append(index.search_vectors(query, query_present, query_hashes, k=k, **kwargs))
+            latencies.append((time.perf_counter() - start) * 1000)
+        return results, round(float(np.median(latencies)), 2)
+
+    report = {"rows": rows, "dim": dim, "k": k}
+    exact = None
+    for dtype in ("float32", "int8"):
+        index = SectionIndex(dtype=dtype)
+        index.add_vectors(list(range(rows)), pool, present, hashes)
+        results, latency = timed(index)
+        report[f"{dtype}_exact_ms"] = latency
+        report[f"{dtype}_bytes_per_row"] = sections * dim * (4 if dtype == "float32" else 1)
+        if exact is None:
+            exact = [{hit["id"] for hit in hits} for hits in results]
+        else:
+            report["int8_recall_at_k"] = round(float(np.mean(
+                [len(exact[i] & {hit["id"] for hit in hits}) / k for i, hits in enumerate(results)])), 3)
+
+    start = time.perf_counter()
+    index.train_ivf()
+    report["ivf_train_seconds"] = round(time.perf_counter() - start, 2)
+    results, latency = timed(index, approximate=True, nprobe=16)
+    report["int8_ivf_ms"] = latency
+    report["int8_ivf_recall_at_k"] = round(float(np.mean(
+        [len(exact[i] & {hit["id"] for hit in hits}) / k for i, hits in enumerate(results)])), 3)
+    return report
+
+
+@benchmark
+def bench_instrumentation(n: int = 200, seed: int = 0) -> Dict:
+    """Match latency with debug logging off (the default) and on, plus trace/exporter checks."""
+    import logging
+
+    from instrumentation import configure_logging, metrics, render_prometheus
+    from matching import match_resume_to_jd
+
+    rng = random.Random(seed)
+    jd = make_jd(rng)
+    resumes = [make_resume(rng) for _ in range(n)]
+
+    def timed() -> float:
+        reset_caches()
+        start = time.perf_counter()
+        for resume in resumes:
+            match_resume_to_jd(resume, jd)
+        return (time.perf_counter() - start) / n * 1000
+
+    root = configure_logging()
+    handlers, root.handlers = root.handlers, [logging.NullHandler()]
+    try:
+        match_resume_to_jd(resumes[0], jd)
+        metrics.reset()
+        off_ms = timed()
+        configure_logging("DEBUG")
+        on_ms = timed()
+    finally:
+        root.handlers = handlers
+        configure_logging()
+
+    reset_caches()
+    _, _, trace = match_resume_to_jd(resumes[0], jd, return_trace=True)
+    exported = render_prometheus()
+    return {
+        "matches": n,
+        "logging_off_ms_per_match": round(off_ms, 3),
+        "logging_debug_ms_per_match": round(on_ms, 3),
+        "trace_stages": sorted(trace["stage_seconds"]),
+        "trace_fallbacks": trace["events"].count("fallbacks"),
+        "prometheus_lines": exported.count("\n"),
+        "prometheus_has_stage_histogram": "recruitly_stage_seconds_bucket" in exported,
+    }
+
+
+def latency_summary(seconds: List[float], items: Optional[int] = None) -> Dict:
+    """Throughput and p50/p95/p99 latency (milliseconds) of per-item timings."""
+    import numpy as np
+
+    if not seconds:
+        return {"items": 0}
+    ms = np.asarray(seconds) * 1000
+    total = float(np.sum(seconds))
+    return {
+        "items": items if items is not None else len(seconds),
+        "per_second": round((items if items is not None else len(seconds)) / total, 1) if total else None,
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    import resource
+    import sys
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _time_each(fn: Callable, items: List) -> List[float]:
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+@benchmark
+def bench_stages(n: int = 100, paragraphs: int = 5, overlap: float = 0.5, seed: int = 0) -> Dict:
+    """
+    Per-stage throughput, p50/p95/p99 latency and peak RSS on a synthetic corpus.
+
+    Stages run in pipeline order; peak RSS is the process high-water mark after each
+    stage. The end-to-end stage runs the prompt extractor with an in-process stub in
+    place of the LLM, so it measures everything but the model itself. A stage whose
+    offline data is missing (e.g. the stopword list) is reported with an ``error``.
+    """
+    import tempfile
+
+    import matching
+    from extractors import PromptExtractor
+    from pdf_extractor import extract_text
+    from text_preprocessor import clean_text
+
+    report: Dict = {"documents": n, "paragraphs": paragraphs, "overlap": overlap}
+
+    def run(name: str, fn: Callable, items: List, count: Optional[int] = None) -> None:
+        try:
+            with quiet():
+                report[name] = latency_summary(_time_each(fn, items), count)
+        except Exception as e:
+            report[name] = {"error": f"{type(e).__name__}: {' '.join(str(e).split())[:120]}"}
+        report[name]["peak_rss_mb"] = peak_rss_mb()
+
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        manifest = generate_corpus(corpus_dir, n, seed=seed, overlap=overlap, paragraphs=paragraphs)
+        entries = manifest["resumes"]
+        report["mean_resume_chars"] = round(sum(entry["chars"] for entry in entries) / n)
+
+        for fmt in ("txt", "docx", "pdf"):
+            run(f"extract_text_{fmt}", extract_text, [entry["files"][fmt] for entry in entries])
+
+    resumes = [make_pair(random.Random(f"{seed}:{i}"), overlap=overlap, paragraphs=paragraphs) for i in range(n)]
+    texts = [resume for resume, _ in resumes]
+
+    run("clean_text", clean_text, texts)
+
+    def fallback(text: str) -> None:
+        for section in matching.SECTIONS:
+            matching.simple_extraction_fallback(text, section)
+
+    matching._lexicon_hits.cache_clear()
+    run("simple_extraction_fallback", fallback, texts)
+
+    model = matching.embedding_model
+    model.encode(["warm up"])
+    run("embedding", lambda text: model.encode([text]), texts)
+    batch = 64
+    run("embedding_batched", lambda chunk: model.encode(chunk, batch_size=batch),
+        [texts[i:i + batch] for i in range(0, n, batch)], count=n)
+
+    def stub_llm(prompt: str) -> str:
+        # Answer instantly with the start of the quoted document, so sections still differ
+        return prompt.split("\n\n")[1][:200]
+
+    matching.set_extractor(PromptExtractor(stub_llm, matching.simple_extraction_fallback))
+    try:
+        matching.match_resume_to_jd(*resumes[0])
+        reset_caches()
+        run("match_resume_to_jd", lambda pair: matching.match_resume_to_jd(*pair), resumes)
+    finally:
+        matching.set_extractor(None)
+    return report
+
+
+@benchmark
+def bench_chunking(n: int = 50, paragraphs: int = 30, seed: int = 0) -> Dict:
+    """
+    Truncated extraction versus chunked scoring on long resumes whose relevant experience
+    comes last. Quality is how often a resume with the JD's skills (late in the document)
+    outscores one without them; cost is milliseconds per match.
+    """
+    import matching
+    from chunking import chunked_match
+    from extractors import PromptExtractor
+    from synthetic_corpus import SKILLS
+
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(n):
+        jd_skills = rng.sample(SKILLS, 5)
+        others = [skill for skill in SKILLS if skill not in jd_skills]
+        early = make_resume(rng, rng.sample(others, 6), paragraphs)
+        late = "\n".join(make_resume(rng, jd_skills, 3).split("\n")[3:])
+        positive = f"{early}\nExperience\n{late}"
+        negative = f"{early}\nExperience\n" + "\n".join(make_resume(rng, rng.sample(others, 5), 3).split("\n")[3:])
+        cases.append((make_jd(rng, jd_skills), positive, negative))
+
+    def stub_llm(prompt: str) -> str:
+        # Stands in for the LLM: it can only ever see the truncated prompt snippet
+        return prompt.split("\n\n")[1][:200]
+
+    def truncated(resume: str, jd: str):
+        return matching.match_resume_to_jd(resume, jd)
+
+    variants = {
+        "truncated": truncated,
+        "chunked_max": lambda resume, jd: chunked_match(resume, jd, aggregate="max"),
+        "chunked_mean_top_k": lambda resume, jd: chunked_match(resume, jd, aggregate="mean_top_k"),
+    }
+    report: Dict = {"pairs": n, "mean_resume_chars": round(sum(len(c[1]) for c in cases) / n)}
+    matching.set_extractor(PromptExtractor(stub_llm, matching.simple_extraction_fallback))
+    try:
+        with quiet():
+            chunked_match(cases[0][1], cases[0][0])
+            for name, score in variants.items():
+                reset_caches()
+                wins = 0.0
+                start = time.perf_counter()
+                for jd, positive, negative in cases:
+                    positive_score, negative_score = score(positive, jd)[0], score(negative, jd)[0]
+                    # A tie (the difference was never seen) counts as a coin flip
+                    wins += 1.0 if positive_score > negative_score else 0.5 if positive_score == negative_score else 0.0
+                report[f"{name}_ms_per_match"] = round((time.perf_counter() - start) / (2 * n) * 1000, 3)
+                report[f"{name}_ranking_accuracy"] = round(wins / n, 3)
+    finally:
+        matching.set_extractor(None)
+    return report
+
+
+def _load_test(port: int, bodies: List[bytes], concurrency: int) -> Dict:
+    """POST every body to /match from ``concurrency`` keep-alive clients."""
+    import http.client
+
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    lock = threading.Lock()
+    queue = list(bodies)
+
+    def client() -> None:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+        while True:
+            with lock:
+                if not queue:
+                    break
+                body = queue.pop()
+            start = time.perf_counter()
+            conn.request("POST", "/match", body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            elapsed = time.perf_counter() - start
+            with lock:
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+                if response.status == 200:
+                    latencies.append(elapsed)
+        conn.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    summary = latency_summary(latencies)
+    summary["per_second"] = round(len(latencies) / seconds, 1)
+    summary["rejected_503"] = statuses.get(503, 0)
+    return summary
+
+
+@benchmark
+def bench_server(requests: int = 400, concurrency: int = 32, workers: int = 2, seed: int = 0) -> Dict:
+    """Requests/s and p99 of the HTTP service: one pair per call versus micro-batching."""
+    import subprocess
+    import sys
+
+    rng = random.Random(seed)
+    bodies = []
+    for _ in range(requests):
+        resume, jd = make_pair(rng, overlap=rng.random())
+        bodies.append(json.dumps({"resume": resume, "job_description": jd}).encode("utf-8"))
+
+    configs = {
+        "unbatched": ["--workers", "1", "--max-batch", "1"],
+        "batched": ["--workers", "1", "--max-batch", "32"],
+        f"batched_{workers}_workers": ["--workers", str(workers), "--max-batch", "32"],
+        "backpressure": ["--workers", "1", "--max-batch", "8", "--max-queue", "4"],
+    }
+    report: Dict = {"requests": requests, "concurrency": concurrency}
+    for name, flags in configs.items():
+        process = subprocess.Popen(
+            [sys.executable, "-m", "recruitly", "serve", "--port", "0"] + flags,
+            stderr=subprocess.PIPE, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        try:
+            for line in process.stderr:
+                if line.startswith("Listening on"):
+                    port = int(line.split()[2].rsplit(":", 1)[1])
+                    break
+            else:
+                raise RuntimeError(f"server did not start ({name})")
+            threading.Thread(target=process.stderr.read, daemon=True).start()
+            _load_test(port, bodies[:concurrency], concurrency)  # warm up
+            report[name] = _load_test(port, bodies, concurrency)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    return report
+
+
+@benchmark
+def bench_clean_texts(n: int = 100000, seed: int = 0) -> Dict:
+    """Per-document clean_text loop versus batched, tech-aware clean_texts on n documents."""
+    from text_preprocessor import clean_text, clean_texts, get_stop_words
+
+    try:
+        get_stop_words()
+    except LookupError as e:
+        return {"documents": n, "error": f"stopwords unavailable offline: {' '.join(str(e).split())[:80]}"}
+
+    rng = random.Random(seed)
+    base = [make_resume(rng, paragraphs=rng.randint(0, 3)) for _ in range(1000)]
+    docs = [base[i % len(base)] + f" Ref {i}." for i in range(n)]
+    report: Dict = {"documents": n, "mean_chars": round(sum(map(len, docs)) / n)}
+
+    start = time.perf_counter()
+    for doc in docs:
+        clean_text(doc)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    clean_texts(docs)
+    batched = time.perf_counter() - start
+
+    start = time.perf_counter()
+    streamed_tokens = sum(len(tokens) for tokens in clean_texts(iter(docs), as_tokens=True, stream=True))
+    streamed = time.perf_counter() - start
+
+    report.update({
+        "clean_text_docs_per_second": round(n / legacy),
+        "clean_texts_docs_per_second": round(n / batched),
+        "streamed_tokens_docs_per_second": round(n / streamed),
+        "streamed_tokens": streamed_tokens,
+        "speedup": round(legacy / batched, 2),
+    })
+    return report
+
+
+@benchmark
+def bench_lexical_prefilter(n: int = 2000, k: int = 10, top_ns: str = "50,100,200,500", seed: int = 0) -> Dict:
+    """
+    Recall of the BM25 pre-filter against full semantic ranking: the share of the
+    semantic top-k that survives a lexical top-N cut, and what the cut saves in time.
+    """
+    from lexical_index import LexicalIndex
+    from matching import rank_resumes
+    from synthetic_corpus import SKILLS
+
+    rng = random.Random(seed)
+    jd_skills = rng.sample(SKILLS, 5)
+    jd = make_jd(rng, jd_skills)
+    resumes = {}
+    for i in range(n):
+        shared = rng.sample(jd_skills, rng.randint(0, len(jd_skills)))
+        others = rng.sample([skill for skill in SKILLS if skill not in shared], 6 - min(len(shared), 6))
+        resumes[f"r{i}"] = make_resume(rng, shared + others, paragraphs=rng.randint(0, 3))
+
+    with quiet():
+        rank_resumes(jd, dict(list(resumes.items())[:2]))
+        reset_caches()
+        start = time.perf_counter()
+        semantic = rank_resumes(jd, resumes, top_k=None)
+        full_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = LexicalIndex()
+        index.add_many(resumes)
+        build_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        lexical = index.search(jd, k=n)
+        query_seconds = time.perf_counter() - start
+
+    truth = {entry["resume_id"] for entry in semantic[:k]}
+    report: Dict = {
+        "resumes": n,
+        "k": k,
+        "full_rank_seconds": round(full_seconds, 3),
+        "index_docs_per_second": round(n / build_seconds),
+        "query_ms": round(query_seconds * 1000, 3),
+    }
+    for top_n in (int(value) for value in top_ns.split(",")):
+        kept = {entry["id"] for entry in lexical[:top_n]}
+        report[f"top_{top_n}_recall_at_k"] = round(len(truth & kept) / max(len(truth), 1), 3)
+        with quiet():
+            reset_caches()
+            start = time.perf_counter()
+            rank_resumes(jd, resumes, top_k=k, prefilter_top_n=top_n, lexical_index=index)
+            report[f"top_{top_n}_rank_seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+@benchmark
+def bench_job_catalog(jobs: int = 500, resumes: int = 5, large_rows: int = 200000, seed: int = 0) -> Dict:
+    """
+    One resume against ``jobs`` postings: looping match_resume_to_jd versus
+    match_resume_to_jobs on a prebuilt JobCatalog, plus incremental refresh cost and
+    single-thread versus multi-thread scoring of a ``large_rows`` synthetic catalog.
+    """
+    import numpy as np
+
+    from job_catalog import JobCatalog, match_resume_to_jobs
+    from matching import match_resume_to_jd
+
+    rng = random.Random(seed)
+    postings = {f"req-{i}": make_jd(rng, paragraphs=rng.randint(0, 2)) for i in range(jobs)}
+    candidates = [make_resume(rng, paragraphs=2) for _ in range(resumes)]
+    report: Dict = {"jobs": jobs, "resumes": resumes}
+
+    with quiet():
+        match_resume_to_jd(candidates[0], postings["req-0"])
+        reset_caches()
+        start = time.perf_counter()
+        looped = {job_id: match_resume_to_jd(candidates[0], text)[0] for job_id, text in postings.items()}
+        report["loop_seconds_per_resume"] = round(time.perf_counter() - start, 3)
+
+        reset_caches()
+        catalog = JobCatalog()
+        start = time.perf_counter()
+        catalog.upsert_many(postings)
+        report["catalog_build_seconds"] = round(time.perf_counter() - start, 3)
+
+        start = time.perf_counter()
+        ranked = [match_resume_to_jobs(resume, catalog) for resume in candidates]
+        report["catalog_seconds_per_resume"] = round((time.perf_counter() - start) / resumes, 4)
+        report["max_score_difference"] = round(max(abs(entry["overall"] - looped[entry["job_id"]]) for entry in ranked[0]), 2)
+        report["speedup"] = round(report["loop_seconds_per_resume"] / report["catalog_seconds_per_resume"], 1)
+
+        changed = {job_id: text + " Remote friendly." for job_id, text in list(postings.items())[:5]}
+        start = time.perf_counter()
+        embedded = catalog.upsert_many({**postings, **changed})
+        report["refresh_5_changed_seconds"] = round(time.perf_counter() - start, 3)
+        report["refresh_reembedded"] = embedded
+
+    np_rng = np.random.default_rng(seed)
+    dim = catalog.index.dim
+    sections = len(catalog.index.sections)
+    vectors = np_rng.standard_normal((sections, large_rows, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=-1, keepdims=True)
+    large = JobCatalog()
+    large.index.add_vectors(list(range(large_rows)), vectors,
+                            np.ones((sections, large_rows), dtype=bool),
+                            np.arange(1, sections * large_rows + 1, dtype=np.uint64).reshape(sections, large_rows))
+    query = vectors[:, 0]
+    for label, workers in (("single_thread", 1), ("parallel", os.cpu_count() or 1)):
+        start = time.perf_counter()
+        large.index.search_vectors(query, np.ones(sections, dtype=bool), np.zeros(sections, dtype=np.uint64),
+                                   k=None, workers=workers)
+        report[f"large_{label}_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    report["large_rows"] = large_rows
+    report["cpus"] = os.cpu_count()
+    return report
+
+
+@benchmark
+def bench_score_store(resumes: int = 2000, jobs: int = 20, seed: int = 0) -> Dict:
+    """
+    Full scoring of a ``resumes`` x ``jobs`` ScoreStore on one thread and on several,
+    incremental refresh after one JD edit and after a scoring-version bump, and the
+    latency of top-k and histogram queries on the stored scores.
+    """
+    import tempfile
+
+    import matching
+    from score_store import ScoreStore
+
+    rng = random.Random(seed)
+    pool = {f"resume-{i}": make_resume(rng, paragraphs=2) for i in range(resumes)}
+    postings = {f"req-{i}": make_jd(rng, paragraphs=1) for i in range(jobs)}
+    workers = os.cpu_count() or 1
+    report: Dict = {"resumes": resumes, "jobs": jobs, "workers": workers}
+
+    with tempfile.TemporaryDirectory() as tmp, quiet():
+        matching.match_resume_to_jd(pool["resume-0"], postings["req-0"])
+        for label, threads in (("single_thread", 1), ("parallel", workers)):
+            store = ScoreStore(os.path.join(tmp, f"{label}.db"))
+            store.put_resumes(pool)
+            store.put_jobs(postings)
+            reset_caches()
+            start = time.perf_counter()
+            report["pairs_scored"] = store.refresh(workers=threads)
+            report[f"full_{label}_seconds"] = round(time.perf_counter() - start, 3)
+        report["parallel_speedup"] = round(report["full_single_thread_seconds"] / report["full_parallel_seconds"], 2)
+
+        expected = matching.rank_resumes(postings["req-0"], pool, top_k=10)
+        stored = store.top_k("req-0", k=10)
+        report["max_score_difference"] = round(max(abs(a["overall"] - b["overall"]) for a, b in zip(expected, stored)), 2)
+
+        store.put_job("req-0", postings["req-0"] + " Kubernetes experience required.")
+        start = time.perf_counter()
+        report["jd_edit_rescored"] = store.refresh(workers=workers)
+        report["jd_edit_seconds"] = round(time.perf_counter() - start, 3)
+
+        start = time.perf_counter()
+        for job_id in postings:
+            store.top_k(job_id, k=10)
+        report["top_k_ms"] = round((time.perf_counter() - start) * 1000 / jobs, 3)
+        start = time.perf_counter()
+        store.histogram()
+        report["histogram_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+        version = matching.SCORING_VERSION
+        matching.SCORING_VERSION = f"{version}-bench"
+        try:
+            start = time.perf_counter()
+            report["stale_after_version_bump"] = len(store.stale_pairs())
+            report["stale_scan_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        finally:
+            matching.SCORING_VERSION = version
+        store.close()
+    return report
+
+
+@benchmark
+def bench_skill_gap(pairs: int = 200, repeats: int = 3, seed: int = 0) -> Dict:
+    """
+    Latency added by skill-gap explanations: match_resume_to_jd alone versus followed by
+    explain_match over the same ``pairs`` (best of ``repeats``, caches reset before each
+    run), plus a cold skill_gap call with none of its phrases cached.
+    """
+    from matching import match_resume_to_jd
+    from skill_gap import explain_match, skill_gap
+
+    rng = random.Random(seed)
+    inputs = [make_pair(rng, overlap=rng.random(), paragraphs=2) for _ in range(pairs)]
+
+    def run(explain: bool) -> float:
+        reset_caches()
+        start = time.perf_counter()
+        for resume, jd in inputs:
+            match_resume_to_jd(resume, jd)
+            if explain:
+                explain_match(resume, jd)
+        return time.perf_counter() - start
+
+    with quiet():
+        match_resume_to_jd(*inputs[0])
+        match_seconds = min(run(False) for _ in range(repeats))
+        explained_seconds = min(run(True) for _ in range(repeats))
+
+        reset_caches()
+        unseen = [f"skill {i}" for i in range(20)]
+        start = time.perf_counter()
+        skill_gap(unseen[:12], unseen[8:])
+        cold_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "pairs": pairs,
+        "match_ms_per_pair": round(match_seconds * 1000 / pairs, 3),
+        "explained_ms_per_pair": round(explained_seconds * 1000 / pairs, 3),
+        "overhead_percent": round(100 * (explained_seconds - match_seconds) / match_seconds, 1),
+        "cold_skill_gap_ms": round(cold_ms, 2),
+    }
+
+
+_EXTRACT_CHILD = """
+import json, resource, sys, time
+limit = int(sys.argv[3]) * 1024 * 1024
+resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+import pdf_extractor
+start = time.perf_counter()
+report = {"error": None, "truncated": None, "chars": 0}
+try:
+    if sys.argv[1] == "legacy":
+        report["chars"] = len(pdf_extractor.extract_text(sys.argv[2]))
+    else:
+        text, stats = pdf_extractor.extract_text_bounded(sys.argv[2])
+        report.update(chars=len(text), truncated=stats["truncated"], total_pages=stats["total_pages"])
+except MemoryError:
+    report["error"] = "MemoryError"
+report["seconds"] = round(time.perf_counter() - start, 2)
+report["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+print(json.dumps(report))
+"""
+
+
+def _write_docx_bomb(path: str, uncompressed_mb: int) -> None:
+    """A valid DOCX whose document.xml inflates to ``uncompressed_mb`` MB of repeated paragraphs."""
+    import tempfile
+    import zipfile
+
+    from docx import Document
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, "template.docx")
+        Document().save(template)
+        paragraph = b"<w:p><w:r><w:t>Python developer with SQL and Docker experience.</w:t></w:r></w:p>" * 1000
+        with zipfile.ZipFile(template) as source, zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as bomb:
+            for item in source.infolist():
+                if item.filename != "word/document.xml":
+                    bomb.writestr(item, source.read(item.filename))
+            with bomb.open("word/document.xml", "w", force_zip64=True) as document:
+                document.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                               b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                               b"<w:body>")
+                for _ in range(uncompressed_mb * 1024 * 1024 // len(paragraph)):
+                    document.write(paragraph)
+                document.write(b"</w:body></w:document>")
+
+
+@benchmark
+def bench_adversarial_extraction(pages: int = 300, bomb_mb: int = 200, txt_mb: int = 100,
+                                 memory_limit_mb: int = 2048, seed: int = 0) -> Dict:
+    """
+    Peak RSS and time of extract_text versus bounded streaming extraction on a
+    ``pages``-page PDF, a DOCX zip bomb and a huge TXT file, each in a fresh process
+    capped at ``memory_limit_mb`` of address space.
+    """
+    import subprocess
+    import sys
+    import tempfile
+
+    from synthetic_corpus import write_pdf
+
+    rng = random.Random(seed)
+    report: Dict = {"pages": pages, "bomb_uncompressed_mb": bomb_mb, "txt_mb": txt_mb}
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {
+            "pdf": os.path.join(tmp, "long.pdf"),
+            "docx_bomb": os.path.join(tmp, "bomb.docx"),
+            "txt": os.path.join(tmp, "huge.txt"),
+        }
+        # About 30 filler paragraphs fill one 60-line page
+        write_pdf(files["pdf"], make_resume(rng, paragraphs=pages * 30))
+        _write_docx_bomb(files["docx_bomb"], bomb_mb)
+        line = (make_resume(rng) + "\n").encode("utf-8")
+        with open(files["txt"], "wb") as f:
+            for _ in range(txt_mb * 1024 * 1024 // len(line)):
+                f.write(line)
+
+        for name, path in files.items():
+            report[f"{name}_file_mb"] = round(os.path.getsize(path) / 1024 / 1024, 2)
+            for mode in ("legacy", "bounded"):
+                child = subprocess.run(
+                    [sys.executable, "-c", _EXTRACT_CHILD, mode, path, str(memory_limit_mb)],
+                    capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+                )
+                try:
+                    result = json.loads(child.stdout.strip().splitlines()[-1])
+                except (IndexError, ValueError):
+                    result = {"error": (child.stderr.strip().splitlines() or ["no output"])[-1][:120]}
+                for key, value in result.items():
+                    report[f"{name}_{mode}_{key}"] = value
+    return report
+
+
+def _edit_words(rng: random.Random, text: str, edits: int) -> str:
+    words = text.split()
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = rng.choice(["senior", "lead", "cloud", "remote", "2024"])
+    return " ".join(words)
+
+
+@benchmark
+def bench_dedup(signatures: int = 1000000, queries: int = 10000, docs: int = 2000, seed: int = 0) -> Dict:
+    """
+    Near-duplicate detection quality on edited synthetic resumes, then lookup and
+    storage cost of a DedupIndex holding ``signatures`` (random) signatures.
+    """
+    import tempfile
+
+    import numpy as np
+
+    from dedup import NUM_PERM, DedupIndex
+
+    rng = random.Random(seed)
+    texts = [make_resume(rng, paragraphs=rng.randint(2, 6)) for _ in range(docs)]
+    report: Dict = {"documents": docs, "signatures": signatures}
+
+    start = time.perf_counter()
+    index = DedupIndex()
+    false_positives = sum(index.register(i, text) is not None for i, text in enumerate(texts))
+    report["register_docs_per_second"] = round(docs / (time.perf_counter() - start))
+    report["distinct_false_positive_rate"] = round(false_positives / docs, 4)
+    for edits in (0, 3, 8):
+        probes = texts[:500]
+        found = sum(
+            (match := index.find(_edit_words(rng, text, edits) if edits else text + "\n")) is not None and match.id == i
+            for i, text in enumerate(probes)
+        )
+        report[f"edits_{edits}_hit_rate"] = round(found / len(probes), 3)
+
+    np_rng = np.random.default_rng(seed)
+    exact = np_rng.integers(0, 2 ** 63, signatures, dtype=np.uint64)
+    minhashes = np_rng.integers(0, 2 ** 16, (signatures, NUM_PERM), dtype=np.uint16)
+    store = DedupIndex()
+    start = time.perf_counter()
+    store.add_signatures(list(range(signatures)), exact, minhashes)
+    store._reindex()
+    report["build_seconds"] = round(time.perf_counter() - start, 3)
+
+    # Half the queries are copies of stored rows with a quarter of the values changed
+    targets = np_rng.integers(0, signatures, queries // 2)
+    near = minhashes[targets].copy()
+    changed = np_rng.random(near.shape) < 0.25
+    near[changed] = np_rng.integers(0, 2 ** 16, int(changed.sum()), dtype=np.uint16)
+    fresh = np_rng.integers(0, 2 ** 16, (queries - len(targets), NUM_PERM), dtype=np.uint16)
+    start = time.perf_counter()
+    hits = sum(
+        (match := store.find_signature(0, row)) is not None and match.id == int(target)
+        for row, target in zip(near, targets)
+    )
+    misses = sum(store.find_signature(0, row) is None for row in fresh)
+    elapsed = time.perf_counter() - start
+    report["lookups_per_second"] = round(queries / elapsed)
+    report["near_duplicate_hit_rate"] = round(hits / len(targets), 4)
+    report["random_false_positive_rate"] = round(1 - misses / len(fresh), 4)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store.path = tmp
+        start = time.perf_counter()
+        store.save()
+        report["save_seconds"] = round(time.perf_counter() - start, 3)
+        size = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp))
+        report["disk_bytes_per_signature"] = round(size / signatures, 1)
+        start = time.perf_counter()
+        DedupIndex(tmp)
+        report["load_seconds"] = round(time.perf_counter() - start, 3)
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+@benchmark
+def bench_embedding_backends(n: int = 256, batch_size: int = 32, threads: int = 0, seed: int = 0) -> Dict:
+    """
+    Throughput, load time and peak RSS of every embedding backend (one process each), plus
+    a parity check: resume/JD cosine scores must stay within COSINE_TOLERANCE (see
+    embedding_backends) of the torch backend. Backends whose dependencies are missing report an ``error``.
+    """
+    import subprocess
+    import sys
+    import tempfile
+
+    import numpy as np
+
+    from embedding_backends import BACKENDS, COSINE_TOLERANCE
+
+    rng = random.Random(seed)
+    pairs = [make_pair(rng, overlap=rng.random(), paragraphs=rng.randint(0, 6)) for _ in range(n // 2)]
+    texts = [text for pair in pairs for text in pair]
+
+    script = (
+        "import json, resource, sys, time\n"
+        "import numpy as np\n"
+        "from model_registry import get_embedding_model\n"
+        "texts = json.load(open(sys.argv[2]))\n"
+        "start = time.perf_counter()\n"
+        "model = get_embedding_model(backend=sys.argv[1])\n"
+        "model.encode(texts[:4], batch_size=4)\n"
+        "loaded = time.perf_counter()\n"
+        "vectors = model.encode(texts, batch_size=int(sys.argv[4]))\n"
+        "encoded = time.perf_counter()\n"
+        "np.save(sys.argv[3], np.asarray(vectors, dtype=np.float32))\n"
+        "print(json.dumps({'load_seconds': loaded - start, 'encode_seconds': encoded - loaded,\n"
+        "                  'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))\n"
+    )
+    env = dict(os.environ)
+    if threads:
+        env["RECRUITLY_EMBEDDING_THREADS"] = str(threads)
+
+    report: Dict = {"texts": len(texts), "batch_size": batch_size, "cosine_tolerance": COSINE_TOLERANCE}
+    cosines: Dict[str, np.ndarray] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        texts_path = os.path.join(tmp, "texts.json")
+        with open(texts_path, "w", encoding="utf-8") as f:
+            json.dump(texts, f)
+        for backend in BACKENDS:
+            vectors_path = os.path.join(tmp, f"{backend}.npy")
+            done = subprocess.run(
+                [sys.executable, "-W", "ignore", "-c", script, backend, texts_path, vectors_path, str(batch_size)],
+                capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+            )
+            if done.returncode != 0:
+                report[backend] = {"error": done.stderr.strip().splitlines()[-1] if done.stderr.strip() else "failed"}
+                continue
+            stats = json.loads(done.stdout.strip().splitlines()[-1])
+            vectors = np.load(vectors_path)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            cosines[backend] = np.einsum("ij,ij->i", vectors[0::2], vectors[1::2])
+            report[backend] = {
+                "load_seconds": round(stats["load_seconds"], 2),
+                "texts_per_second": round(len(texts) / stats["encode_seconds"], 1),
+                "peak_rss_mb": round(stats["peak_rss_kb"] / 1024, 1),
+            }
+
+    if "torch" in cosines:
+        for backend, values in cosines.items():
+            if backend != "torch":
+                diff = float(np.max(np.abs(values - cosines["torch"])))
+                report[backend]["max_cosine_diff"] = round(diff, 5)
+                report[backend]["parity_ok"] = diff <= COSINE_TOLERANCE
+    return report
+
+
+# Suffixes of metrics where a lower value is better / a higher value is better
+LOWER_IS_BETTER = ("_ms", "_seconds", "_mb", "_bytes_per_row", "_bytes_per_signature", "false_positive_rate")
+HIGHER_IS_BETTER = ("per_second", "speedup", "recall_at_k", "hit_rate", "accuracy")
+
+
+def _flatten(result: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def load_run(path: str) -> Dict[str, Dict]:
+    """Read the JSON lines written by ``main`` into ``{benchmark: result}``."""
+    with open(path, "r", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return {row.pop("benchmark"): row for row in rows}
+
+
+def compare_runs(base: Dict[str, Dict], new: Dict[str, Dict], threshold: float = 0.1) -> List[Dict]:
+    """
+    Every metric present in both runs whose direction is known, with its relative change.
+    A metric is a regression when it got worse by more than ``threshold`` (0.1 = 10%).
+    """
+    changes = []
+    for name in sorted(base.keys() & new.keys()):
+        old_values, new_values = _flatten(base[name]), _flatten(new[name])
+        for metric in sorted(old_values.keys() & new_values.keys()):
+            if metric.endswith(LOWER_IS_BETTER):
+                sign = 1
+            elif metric.endswith(HIGHER_IS_BETTER):
+                sign = -1
+            else:
+                continue
+            old, current = old_values[metric], new_values[metric]
+            change = (current - old) / abs(old) if old else 0.0
+            changes.append({
+                "benchmark": name, "metric": metric, "base": old, "new": current,
+                "change": round(change, 4), "regression": sign * change > threshold,
+            })
+    return changes
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run offline Recruitly benchmarks.")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--out", help="also write the JSON lines to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"),
+                        help="compare two saved runs instead of running benchmarks")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative change counted as a regression (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        changes = compare_runs(load_run(args.compare[0]), load_run(args.compare[1]), args.threshold)
+        for change in changes:
+            print(json.dumps(change))
+        regressions = [change for change in changes if change["regression"]]
+        print(f"{len(regressions)} regressions in {len(changes)} compared metrics")
+        return 1 if regressions else 0
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+    try:
+        for name in args.names or list(BENCHMARKS):
+            if name not in BENCHMARKS:
+                parser.error(f"unknown benchmark: {name}")
+            line = json.dumps({"benchmark": name, **BENCHMARKS[name]()})
+            print(line)
+            if out:
+                out.write(line + "\n")
+                out.flush()
+    finally:
+        if out:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,220 @@
+# chunking.py
+"""
+Section-aware chunked scoring for long documents.
+
+Extraction prompts only see the first ``PROMPT_CHAR_LIMIT`` characters, and MiniLM
+truncates its input at 256 word pieces, so the later parts of a long resume are never
+scored. This module scores the whole document instead:
+
+1. split on the section headers found by ``resume_parser.find_section_spans``
+   (text before the first header is ``summary``);
+2. split each section into overlapping windows of whole words, sized with the
+   embedding model's own tokenizer so no window exceeds its word-piece limit
+   ("C++/C#/.NET," is one word but nine pieces);
+3. embed every chunk of all documents in one batched call (through the embedding
+   cache) and aggregate each section's chunk-pair similarities with ``max`` or
+   ``mean_top_k``.
+
+``matching.set_scoring_mode("chunked")`` (or ``RECRUITLY_SCORING_MODE=chunked``) makes
+``match_resume_to_jd``, ``match_many`` and ``rank_resumes`` score this way.
+
+Chunks are produced by generators working on offsets into the original text, and
+``max_chunks`` caps how many are kept per document, so memory stays bounded.
+"""
+import re
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from matching import (EMBEDDING_MODEL_NAME, SECTIONS, embedding_cache, overall_from_sections,
+                      round_scores, scale_similarity)
+from model_registry import get_embedding_model
+from resume_parser import find_section_spans
+
+MAX_TOKENS = None  # None: as many word pieces as the embedding model accepts
+OVERLAP_TOKENS = 32
+MAX_CHUNKS = 256
+AGGREGATES = ("max", "mean_top_k")
+# Pieces per window for a model that exposes no tokenizer (MiniLM takes 256 minus [CLS]/[SEP])
+FALLBACK_MAX_TOKENS = 254
+
+# Resume headers that feed each scored section; "summary" is text before the first header
+SECTION_SOURCES = {
+    "skills": ("skills",),
+    "experience": ("experience", "projects", "summary"),
+    "education": ("education",),
+}
+
+_WORD = re.compile(r"\S+")
+# Word pieces never span a word/punctuation boundary, so this undercounts only long words
+_APPROXIMATE_PIECE = re.compile(r"\w+|[^\w\s]")
+
+Tokenize = Callable[[str], List[Tuple[int, int]]]
+
+
+class Chunk(NamedTuple):
+    section: str
+    start: int
+    end: int
+
+
+def approximate_pieces(text: str) -> List[Tuple[int, int]]:
+    """Offsets of word and punctuation runs, for models without a tokenizer."""
+    return [match.span() for match in _APPROXIMATE_PIECE.finditer(text)]
+
+
+def model_tokenizer(model=None) -> Tuple[Tokenize, int]:
+    """
+    (text -> word-piece offsets, pieces that fit in one input) for the embedding model,
+    special tokens excluded. Falls back to ``approximate_pieces`` when the model has no
+    fast tokenizer.
+    """
+    model = model if model is not None else get_embedding_model(EMBEDDING_MODEL_NAME)
+    if hasattr(model, "token_offsets"):  # embedding_backends.OnnxEmbeddingModel
+        return model.token_offsets, model.max_seq_length - model.num_special_tokens
+    tokenizer = getattr(model, "tokenizer", None)
+    limit = getattr(model, "max_seq_length", None)
+    if tokenizer is not None and getattr(tokenizer, "is_fast", False) and limit:
+        def offsets(text: str) -> List[Tuple[int, int]]:
+            return tokenizer(text, add_special_tokens=False, return_offsets_mapping=True,
+                             verbose=False)["offset_mapping"]
+        return offsets, int(limit) - tokenizer.num_special_tokens_to_add()
+    return approximate_pieces, FALLBACK_MAX_TOKENS
+
+
+def _units(text: str, start: int, end: int, max_tokens: int, tokenize: Tokenize) -> Iterator[Tuple[int, int, int]]:
+    """(start, end, pieces) of every word in ``text[start:end]``; over-long words are split."""
+    pieces = [(a + start, b + start) for a, b in tokenize(text[start:end]) if b > a]
+    piece_starts = [a for a, _ in pieces]
+    for match in _WORD.finditer(text, start, end):
+        lo = bisect_left(piece_starts, match.start())
+        hi = bisect_left(piece_starts, match.end())
+        if hi - lo <= max_tokens:
+            yield match.start(), match.end(), hi - lo
+            continue
+        # A URL or a run of symbols can be longer than a whole window on its own
+        for first in range(lo, hi, max_tokens):
+            last = min(first + max_tokens, hi) - 1
+            yield (match.start() if first == lo else pieces[first][0],
+                   match.end() if last == hi - 1 else pieces[last][1], last - first + 1)
+
+
+def iter_windows(text: str, start: int = 0, end: Optional[int] = None,
+                 max_tokens: int = FALLBACK_MAX_TOKENS, overlap: int = OVERLAP_TOKENS,
+                 tokenize: Tokenize = approximate_pieces) -> Iterator[Tuple[int, int]]:
+    """
+    (start, end) offsets of word windows over ``text[start:end]`` holding at most
+    ``max_tokens`` pieces of ``tokenize``; consecutive windows share up to ``overlap`` pieces.
+    """
+    if not 0 <= overlap < max_tokens:
+        raise ValueError("overlap must be smaller than max_tokens")
+    window: List[Tuple[int, int, int]] = []
+    total = 0
+    fresh = False
+    for unit in _units(text, start, len(text) if end is None else end, max_tokens, tokenize):
+        if window and total + unit[2] > max_tokens:
+            yield window[0][0], window[-1][1]
+            # Carry the last words (at most ``overlap`` pieces) over, if this unit still fits
+            while window and (total > overlap or total + unit[2] > max_tokens):
+                total -= window.pop(0)[2]
+            fresh = False
+        window.append(unit)
+        total += unit[2]
+        fresh = True
+    if fresh:
+        yield window[0][0], window[-1][1]
+
+
+def iter_chunks(text: str, max_tokens: int = FALLBACK_MAX_TOKENS, overlap: int = OVERLAP_TOKENS,
+                tokenize: Tokenize = approximate_pieces) -> Iterator[Chunk]:
+    """Section-labelled chunks of ``text`` in document order."""
+    spans = find_section_spans(text)
+    regions = [("summary", 0, spans[0][1] if spans else len(text))]
+    regions += [(header, body_start, body_end) for header, _, body_start, body_end in spans]
+    for section, start, end in regions:
+        for chunk_start, chunk_end in iter_windows(text, start, end, max_tokens, overlap, tokenize):
+            yield Chunk(section, chunk_start, chunk_end)
+
+
+def _section_chunks(text: str, max_tokens: int, overlap: int, max_chunks: int,
+                    tokenize: Tokenize) -> Dict[str, List[str]]:
+    grouped: Dict[str, List[str]] = {}
+    for i, chunk in enumerate(iter_chunks(text, max_tokens, overlap, tokenize)):
+        if i >= max_chunks:
+            break
+        grouped.setdefault(chunk.section, []).append(text[chunk.start:chunk.end])
+    return grouped
+
+
+def _pool(grouped: Dict[str, List[str]], section: str) -> List[str]:
+    pool = [chunk for source in SECTION_SOURCES[section] for chunk in grouped.get(source, [])]
+    # A document without that header (most JDs) is compared as a whole
+    return pool or [chunk for chunks in grouped.values() for chunk in chunks]
+
+
+def aggregate_similarities(similarities: np.ndarray, aggregate: str = "max", top_k: int = 3) -> float:
+    """Collapse a chunk-pair similarity matrix into one raw cosine similarity."""
+    values = similarities.ravel()
+    if values.size == 0:
+        return 0.0
+    if aggregate == "max":
+        return float(values.max())
+    if aggregate == "mean_top_k":
+        k = min(top_k, values.size)
+        return float(np.partition(values, values.size - k)[values.size - k:].mean())
+    raise ValueError(f"Unknown aggregate {aggregate!r}; expected one of {AGGREGATES}")
+
+
+def chunked_match_many(pairs: List[Tuple[str, str]], aggregate: str = "max", top_k: int = 3,
+                       max_tokens: Optional[int] = MAX_TOKENS, overlap: int = OVERLAP_TOKENS,
+                       max_chunks: int = MAX_CHUNKS, batch_size: int = 64) -> List[Tuple[float, Dict[str, float]]]:
+    """
+    Score many (resume_text, jd_text) pairs chunk by chunk, like chunked_match on each.
+
+    Each distinct document is chunked once and every distinct chunk of all pairs goes
+    through one encode call.
+    """
+    model = get_embedding_model(EMBEDDING_MODEL_NAME)
+    tokenize, limit = model_tokenizer(model)
+    max_tokens = min(max_tokens or limit, limit)
+
+    grouped: Dict[str, Dict[str, List[str]]] = {}
+    pools: List[Optional[Dict[str, Tuple[List[str], List[str]]]]] = []
+    for resume_text, jd_text in pairs:
+        if not resume_text.strip() or not jd_text.strip():
+            pools.append(None)
+            continue
+        for text in (resume_text, jd_text):
+            if text not in grouped:
+                grouped[text] = _section_chunks(text, max_tokens, overlap, max_chunks, tokenize)
+        pools.append({section: (_pool(grouped[resume_text], section), _pool(grouped[jd_text], section))
+                      for section in SECTIONS})
+
+    unique = list(dict.fromkeys(chunk for pool in pools if pool for pair in pool.values()
+                                for side in pair for chunk in side))
+    embeddings = embedding_cache.encode(model, unique, batch_size=batch_size, normalize=True)
+    rows = {chunk: i for i, chunk in enumerate(unique)}
+
+    results = []
+    for pool in pools:
+        if pool is None:
+            results.append((0.0, {section: 0.0 for section in SECTIONS}))
+            continue
+        raw = np.zeros(len(SECTIONS), dtype=np.float64)
+        for s, section in enumerate(SECTIONS):
+            resume_pool, jd_pool = pool[section]
+            similarities = embeddings[[rows[c] for c in jd_pool]] @ embeddings[[rows[c] for c in resume_pool]].T
+            raw[s] = aggregate_similarities(similarities.astype(np.float64), aggregate, top_k)
+        scores = round_scores(scale_similarity(raw))
+        overall = float(overall_from_sections(scores[:, None])[0])
+        results.append((overall, {section: float(scores[s]) for s, section in enumerate(SECTIONS)}))
+    return results
+
+
+def chunked_match(resume_text: str, jd_text: str, aggregate: str = "max", top_k: int = 3,
+                  max_tokens: Optional[int] = MAX_TOKENS, overlap: int = OVERLAP_TOKENS,
+                  max_chunks: int = MAX_CHUNKS, batch_size: int = 64) -> Tuple[float, Dict[str, float]]:
+    """Score the full texts chunk by chunk; same ``(overall, section_scores)`` shape as match_resume_to_jd."""
+    return chunked_match_many([(resume_text, jd_text)], aggregate, top_k, max_tokens, overlap,
+                              max_chunks, batch_size)[0]
@@ -0,0 +1,259 @@
+# dedup.py
+"""
+Exact and near-duplicate detection for incoming resumes.
+
+Every document gets a 136-byte signature computed from its extracted text:
+
+- an exact hash of the whitespace-normalized text (64-bit BLAKE2b)
+- a MinHash of its 3-word shingles (tech-aware tokens): ``NUM_PERM`` minimums, of which
+  the low 16 bits are kept. The share of equal positions between two signatures
+  estimates the Jaccard similarity of their shingle sets, so a resume with a few words
+  edited stays close to the original while distinct resumes do not.
+
+``DedupIndex.find(text)`` returns the earliest indexed document that is an exact copy,
+else the most similar one with estimated Jaccard similarity of at least ``threshold``.
+Candidates come from LSH: the MinHash is cut into ``BANDS`` bands of ``ROWS`` values
+(one uint64 key each), and only documents sharing at least one band key are compared.
+The keys live in sorted arrays searched with binary search; rows added since the last
+sort are scanned directly.
+
+Callers reuse work through the canonical id: ``rank_resumes(..., dedup=...)`` scores
+one resume per duplicate group, ``SectionIndex.add_many(..., dedup=...)`` copies the
+section vectors of an indexed near-duplicate, and ``recruitly score --dedup`` copies
+earlier rows. ``python benchmarks.py dedup`` measures a store of 1M signatures.
+
+Layout of an index directory::
+
+    meta.json     threshold
+    ids.json      document ids, row order
+    exact.npy     (rows,) uint64
+    minhash.npy   (rows, NUM_PERM) uint16
+"""
+import hashlib
+import json
+import os
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from embedding_cache import normalize_text
+from instrumentation import metrics, stage
+from text_preprocessor import get_tech_tokenizer
+
+BANDS = 16
+ROWS = 4  # 4 x 16-bit values make one uint64 band key
+NUM_PERM = BANDS * ROWS
+THRESHOLD = 0.5
+SHINGLE_WORDS = 3
+# Rows appended since the last sort are scanned directly up to this many
+REINDEX_ROWS = 8192
+
+_PERMUTATION_SEEDS = np.random.default_rng(20240601).integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+
+
+class DuplicateMatch(NamedTuple):
+    id: object
+    kind: str  # "exact" or "near"
+    similarity: float  # estimated Jaccard similarity of the shingle sets
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+@lru_cache(maxsize=65536)
+def _token_hash(token: str) -> int:
+    return _hash64(token.encode("utf-8"))
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer: a cheap, well-spread 64-bit permutation
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def exact_hash(text: str) -> int:
+    return _hash64(normalize_text(text).encode("utf-8"))
+
+
+def minhash(text: str, shingle_words: int = SHINGLE_WORDS) -> np.ndarray:
+    """(NUM_PERM,) uint16 MinHash of the ``shingle_words``-token shingles of ``text``."""
+    tokens = get_tech_tokenizer().tokenize(text)
+    if not tokens:
+        return np.zeros(NUM_PERM, dtype=np.uint16)
+    with np.errstate(over="ignore"):
+        hashes = np.array([_token_hash(token) for token in tokens], dtype=np.uint64)
+        width = min(shingle_words, len(hashes))
+        count = len(hashes) - width + 1
+        shingles = hashes[:count].copy()
+        for offset in range(1, width):
+            # Order matters: "a b c" and "b a c" are different shingles
+            shingles = shingles * np.uint64(0x9E3779B97F4A7C15) + hashes[offset:offset + count]
+        mins = _mix(np.unique(shingles)[:, None] ^ _PERMUTATION_SEEDS).min(axis=0)
+    # The low bits of a minimum are still uniform (the high bits are not)
+    return (mins & np.uint64(0xFFFF)).astype(np.uint16)
+
+
+def signature(text: str) -> Tuple[int, np.ndarray]:
+    """(exact hash, MinHash) of one extracted text."""
+    return exact_hash(text), minhash(text)
+
+
+class DedupIndex:
+
+    def __init__(self, path: Optional[str] = None, threshold: float = THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self.ids: List = []
+        self.exact = np.zeros(0, dtype=np.uint64)
+        self.minhashes = np.zeros((0, NUM_PERM), dtype=np.uint16)
+        self._size = 0
+        self._sorted_rows = 0
+        self._tables: List[Tuple[np.ndarray, np.ndarray]] = []
+
+        if path and os.path.exists(os.path.join(path, "meta.json")):
+            self._load()
+
+    # ----- persistence -----
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self) -> None:
+        with open(self._file("meta.json"), "r", encoding="utf-8") as f:
+            self.threshold = json.load(f)["threshold"]
+        with open(self._file("ids.json"), "r", encoding="utf-8") as f:
+            self.ids = json.load(f)
+        self.exact = np.load(self._file("exact.npy"))
+        self.minhashes = np.load(self._file("minhash.npy"))
+        self._size = len(self.ids)
+
+    def save(self) -> None:
+        if not self.path:
+            raise ValueError("This index has no path; pass one to DedupIndex() to persist it")
+        os.makedirs(self.path, exist_ok=True)
+        np.save(self._file("exact.npy"), self.exact[:self._size])
+        np.save(self._file("minhash.npy"), self.minhashes[:self._size])
+        with open(self._file("ids.json"), "w", encoding="utf-8") as f:
+            json.dump(self.ids, f)
+        # meta.json last: its presence marks a complete index
+        with open(self._file("meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"threshold": self.threshold}, f)
+
+    # ----- lookup tables -----
+
+    def _band_keys(self, start: int, end: int) -> np.ndarray:
+        return self.minhashes[start:end].view(np.uint64)
+
+    def _reindex(self) -> None:
+        """Sort the exact hashes and every band's keys for binary search."""
+        index_type = np.int32 if self._size < 2 ** 31 else np.int64
+        keys = self._band_keys(0, self._size)
+        self._tables = []
+        for column in [self.exact[:self._size]] + [keys[:, band] for band in range(BANDS)]:
+            order = np.argsort(column, kind="stable").astype(index_type)
+            self._tables.append((column[order], order))
+        self._sorted_rows = self._size
+
+    @staticmethod
+    def _sorted_matches(values: np.ndarray, tables: List[Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        """Rows whose table value equals the query value in any of ``tables``."""
+        rows = [np.zeros(0, dtype=np.int64)]
+        for value, (sorted_values, order) in zip(values, tables):
+            lo = np.searchsorted(sorted_values, value, side="left")
+            hi = np.searchsorted(sorted_values, value, side="right")
+            rows.append(order[lo:hi])
+        return np.concatenate(rows)
+
+    # ----- lookup and insert -----
+
+    def __len__(self) -> int:
+        return self._size
+
+    def find_signature(self, exact: int, signature_minhash: np.ndarray) -> Optional[DuplicateMatch]:
+        """Earliest exact copy, else the most similar document at or above ``threshold``."""
+        if not self._size:
+            return None
+        if self._size - self._sorted_rows > REINDEX_ROWS:
+            self._reindex()
+        tail = slice(self._sorted_rows, self._size)
+
+        exact_value = np.uint64(exact)
+        exact_rows = np.concatenate([
+            self._sorted_matches(np.array([exact_value]), self._tables[:1]),
+            self._sorted_rows + np.flatnonzero(self.exact[tail] == exact_value),
+        ])
+        if len(exact_rows):
+            return DuplicateMatch(self.ids[int(exact_rows.min())], "exact", 1.0)
+
+        keys = np.ascontiguousarray(signature_minhash, dtype=np.uint16).view(np.uint64)
+        tail_hits = (self._band_keys(self._sorted_rows, self._size) == keys).any(axis=1)
+        candidates = np.concatenate([
+            np.unique(self._sorted_matches(keys, self._tables[1:])),
+            self._sorted_rows + np.flatnonzero(tail_hits),
+        ])
+        if not len(candidates):
+            return None
+        similarity = (self.minhashes[candidates] == signature_minhash).mean(axis=1)
+        # Most similar first, then the earliest row, so a group keeps one canonical document
+        best = np.lexsort((candidates, -similarity))[0]
+        if similarity[best] < self.threshold:
+            return None
+        return DuplicateMatch(self.ids[int(candidates[best])], "near", float(similarity[best]))
+
+    def find(self, text: str) -> Optional[DuplicateMatch]:
+        with stage("dedup"):
+            return self.find_signature(*signature(text))
+
+    def add_signatures(self, doc_ids: List, exact: np.ndarray, minhashes: np.ndarray) -> None:
+        """Append precomputed (n,) exact hashes and (n, NUM_PERM) MinHashes."""
+        needed = self._size + len(doc_ids)
+        if needed > len(self.exact):
+            # Grow geometrically so one-at-a-time ingestion stays amortized O(1)
+            capacity = max(needed, 2 * len(self.exact), 1024)
+            exact_grown = np.zeros(capacity, dtype=np.uint64)
+            minhash_grown = np.zeros((capacity, NUM_PERM), dtype=np.uint16)
+            exact_grown[:self._size] = self.exact[:self._size]
+            minhash_grown[:self._size] = self.minhashes[:self._size]
+            self.exact, self.minhashes = exact_grown, minhash_grown
+        self.exact[self._size:needed] = exact
+        self.minhashes[self._size:needed] = minhashes
+        self.ids.extend(doc_ids)
+        self._size = needed
+
+    def add(self, doc_id, text: str) -> None:
+        exact, signature_minhash = signature(text)
+        self.add_signatures([doc_id], np.array([exact], dtype=np.uint64), signature_minhash[None, :])
+
+    def register(self, doc_id, text: str) -> Optional[DuplicateMatch]:
+        """Return the duplicate of ``text`` if one is indexed, else index ``text`` as ``doc_id``."""
+        with stage("dedup"):
+            exact, signature_minhash = signature(text)
+            match = self.find_signature(exact, signature_minhash)
+            if match is None:
+                self.add_signatures([doc_id], np.array([exact], dtype=np.uint64), signature_minhash[None, :])
+            else:
+                metrics.inc(f"dedup_{match.kind}")
+            return match
+
+
+def collapse_duplicates(documents: Dict, index: Optional[DedupIndex] = None) -> Tuple[Dict, Dict]:
+    """
+    Split ``{doc_id: text}`` into unique documents and ``{duplicate_id: canonical_id}``.
+
+    A document is only mapped to a canonical one from the same ``documents``, since
+    that is the one whose results get reused; duplicates of documents indexed earlier
+    (with a persistent ``index``) stay in the unique set.
+    """
+    index = index if index is not None else DedupIndex()
+    unique: Dict = {}
+    duplicates: Dict = {}
+    for doc_id, text in documents.items():
+        match = index.register(doc_id, text or "")
+        if match is not None and match.id in unique and match.id != doc_id:
+            duplicates[doc_id] = match.id
+        else:
+            unique[doc_id] = text
+    return unique, duplicates
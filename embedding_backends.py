@@ -0,0 +1,226 @@
+# embedding_backends.py
+"""
+CPU inference backends for the sentence embedding model.
+
+- ``torch``: the SentenceTransformer as published (float32 PyTorch), the default
+- ``torch-int8``: the same model with every ``nn.Linear`` dynamically quantized to int8
+- ``onnx``: the transformer exported once to ONNX and run with ONNX Runtime; tokenizing
+  uses ``tokenizers`` and pooling numpy, so PyTorch is not even imported after the export
+- ``onnx-int8``: the ONNX export with int8 dynamically quantized weights
+
+Choose one with ``RECRUITLY_EMBEDDING_BACKEND`` (see model_registry) and the number of
+intra-op threads with ``RECRUITLY_EMBEDDING_THREADS``. The int8 backends trade a small
+cosine drift for speed and memory: ``python benchmarks.py embedding_backends`` measures
+both, and tests/test_embedding_backends.py fails when a backend's cosines move more than
+``COSINE_TOLERANCE`` from torch. ONNX exports are kept under ``RECRUITLY_ONNX_DIR`` (default
+``~/.cache/recruitly/onnx``); exporting needs torch and the ``onnx`` package once,
+running needs ``onnxruntime``.
+
+Every backend has the ``encode(sentences, batch_size=..., convert_to_numpy=True)``
+signature that EmbeddingCache and the rest of the code already call.
+"""
+import json
+import os
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+DEFAULT_BACKEND = "torch"
+
+# Largest resume/JD cosine difference from the torch backend a backend may show
+COSINE_TOLERANCE = 0.03
+
+ONNX_DIR = os.getenv("RECRUITLY_ONNX_DIR", os.path.join(os.path.expanduser("~"), ".cache", "recruitly", "onnx"))
+
+
+def _load_sentence_transformer(name: str, threads: Optional[int]):
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if threads:
+        torch.set_num_threads(threads)
+    return SentenceTransformer(name, device="cpu")
+
+
+def export_onnx(name: str, out_dir: str) -> None:
+    """Export the transformer of ``name`` to ``out_dir`` with its tokenizer and pooling settings."""
+    import torch
+
+    model = _load_sentence_transformer(name, None)
+    transformer = model[0]
+    pooling = next((module for module in model if type(module).__name__ == "Pooling"), None)
+    if pooling is None:
+        mode = "mean"
+    elif hasattr(pooling, "get_pooling_mode_str"):  # sentence-transformers < 6
+        mode = pooling.get_pooling_mode_str()
+    else:
+        mode = pooling.pooling_mode if isinstance(pooling.pooling_mode, str) else "+".join(pooling.pooling_mode)
+    if mode not in ("mean", "cls"):
+        raise ValueError(f"ONNX backend supports mean or cls pooling, not {mode!r}")
+
+    class LastHiddenState(torch.nn.Module):
+        def __init__(self, auto_model):
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, input_ids, attention_mask, token_type_ids=None):
+            kwargs = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if token_type_ids is not None:
+                kwargs["token_type_ids"] = token_type_ids
+            return self.auto_model(**kwargs).last_hidden_state
+
+    sample = transformer.tokenizer(["warm up export", "a"], padding=True, return_tensors="pt")
+    input_names = [key for key in ("input_ids", "attention_mask", "token_type_ids") if key in sample]
+    os.makedirs(out_dir, exist_ok=True)
+    tmp_path = os.path.join(out_dir, f"model.onnx.{os.getpid()}.tmp")
+    torch.onnx.export(
+        LastHiddenState(transformer.auto_model).eval(),
+        tuple(sample[key] for key in input_names),
+        tmp_path,
+        input_names=input_names,
+        output_names=["last_hidden_state"],
+        dynamic_axes={key: {0: "batch", 1: "sequence"} for key in input_names + ["last_hidden_state"]},
+        opset_version=17,
+        dynamo=False,
+    )
+    os.replace(tmp_path, os.path.join(out_dir, "model.onnx"))
+    transformer.tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, "recruitly.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "model": name,
+            "pooling": mode,
+            "normalize": any(type(module).__name__ == "Normalize" for module in model),
+            "max_seq_length": model.max_seq_length,
+            "pad_token": transformer.tokenizer.pad_token,
+            "pad_token_id": transformer.tokenizer.pad_token_id,
+            "dimension": model.get_sentence_embedding_dimension(),
+        }, f)
+
+
+def quantize_onnx(src: str, dst: str) -> None:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    tmp_path = f"{dst}.{os.getpid()}.tmp"
+    quantize_dynamic(src, tmp_path, weight_type=QuantType.QInt8)
+    os.replace(tmp_path, dst)
+
+
+class OnnxEmbeddingModel:
+    """A SentenceTransformer look-alike running an exported model on ONNX Runtime.
+
+    With ``length_bucketing`` (the default) texts are sorted by length before batching,
+    so each batch is padded only to the length of similar texts. SentenceTransformer
+    already does the same on the torch backends.
+    """
+
+    def __init__(self, name: str, quantized: bool = False, threads: Optional[int] = None,
+                 length_bucketing: bool = True, model_dir: Optional[str] = None):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("The onnx embedding backends need onnxruntime: pip install onnxruntime")
+        from tokenizers import Tokenizer
+
+        self.name = name
+        self.model_dir = model_dir or os.path.join(ONNX_DIR, name.replace("/", "__"))
+        model_path = os.path.join(self.model_dir, "model.onnx")
+        if not os.path.exists(model_path):
+            export_onnx(name, self.model_dir)
+        if quantized:
+            quantized_path = os.path.join(self.model_dir, "model_int8.onnx")
+            if not os.path.exists(quantized_path):
+                quantize_onnx(model_path, quantized_path)
+            model_path = quantized_path
+
+        with open(os.path.join(self.model_dir, "recruitly.json"), "r", encoding="utf-8") as f:
+            self.config = json.load(f)
+        self.max_seq_length = self.config["max_seq_length"]
+        self.length_bucketing = length_bucketing
+        self.tokenizer = Tokenizer.from_file(os.path.join(self.model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(self.max_seq_length)
+        self.tokenizer.enable_padding(pad_id=self.config["pad_token_id"] or 0, pad_token=self.config["pad_token"] or "[PAD]")
+        # An untruncated copy measures texts for chunking.model_tokenizer
+        self._counter = Tokenizer.from_file(os.path.join(self.model_dir, "tokenizer.json"))
+        self._counter.no_truncation()
+        self._counter.no_padding()
+        self.num_special_tokens = len(self._counter.encode("").ids)
+
+        self.model_path = model_path
+        self.set_num_threads(threads)
+        self.input_names = [node.name for node in self.session.get_inputs()]
+
+    def set_num_threads(self, threads: Optional[int]) -> None:
+        """(Re)open the inference session with ``threads`` intra-op threads (None: all cores)."""
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config["dimension"]
+
+    def token_offsets(self, text: str) -> List[Tuple[int, int]]:
+        """Character offsets of the word pieces of ``text``, without special tokens or truncation."""
+        return self._counter.encode(text, add_special_tokens=False).offsets
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {name: inputs[name] for name in self.input_names})[0]
+        if self.config["pooling"] == "cls":
+            pooled = hidden[:, 0]
+        else:
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return pooled.astype(np.float32)
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, **_) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        order = np.argsort([-len(text) for text in texts], kind="stable") if self.length_bucketing \
+            else np.arange(len(texts))
+        embeddings = np.empty((len(texts), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            embeddings[rows] = self._encode_batch([texts[i] for i in rows])
+
+        if self.config["normalize"] or normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.where(norms > 0, norms, 1.0)
+        return embeddings[0] if single else embeddings
+
+
+def set_num_threads(model, threads: int) -> None:
+    """Change the intra-op thread count of a model loaded by load_embedding_model."""
+    if isinstance(model, OnnxEmbeddingModel):
+        model.set_num_threads(threads)
+    else:
+        import torch
+
+        torch.set_num_threads(threads)
+
+
+def load_embedding_model(name: str, backend: str = DEFAULT_BACKEND, threads: Optional[int] = None):
+    """Load ``name`` on the given backend (one of BACKENDS)."""
+    if backend == "torch":
+        return _load_sentence_transformer(name, threads)
+    if backend == "torch-int8":
+        import torch
+
+        model = _load_sentence_transformer(name, threads)
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxEmbeddingModel(name, quantized=backend == "onnx-int8", threads=threads)
+    raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {BACKENDS}")
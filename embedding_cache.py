@@ -0,0 +1,262 @@
+# embedding_cache.py
+"""
+Content-addressed cache for sentence embeddings.
+
+Embeddings are keyed by a hash of (model name, whitespace-normalized text) and kept
+in two tiers:
+
+- an in-memory LRU bounded by ``max_entries``
+- an optional on-disk store: a flat float32 matrix (memory-mapped for reads) plus an
+  append-only index of ``<key> <row>`` lines. It survives restarts and can be shared by several worker
+  processes, which coordinate appends through an advisory file lock.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from instrumentation import stage
+from model_registry import get_backend
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def cache_key(model_name: str, text: str) -> str:
+    payload = f"{model_name}\x00{normalize_text(text)}".encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class DiskEmbeddingStore:
+    """
+    Append-only float32 matrix on disk with a ``<key> <row>`` line per stored vector.
+
+    Rows are explicit, so a writer that dies between appending vectors and keys only
+    leaves unreferenced rows behind; the next writer trims any torn tail first.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._keys_path = os.path.join(directory, "keys.txt")
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._lock_path = os.path.join(directory, ".lock")
+
+        self.dim: Optional[int] = None
+        self._index: Dict[str, int] = {}
+        self._keys_offset = 0
+        self._lines = 0
+        self._matrix: Optional[np.memmap] = None
+        self._mapped_rows = 0
+        self._refresh()
+
+    def _file_lock(self):
+        handle = open(self._lock_path, "a")
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        return handle
+
+    def _file_unlock(self, handle) -> None:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+        handle.close()
+
+    def _refresh(self) -> None:
+        """Pick up rows appended by other processes since the last read."""
+        if self.dim is None and os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+        if not os.path.exists(self._keys_path):
+            return
+        with open(self._keys_path, "rb") as f:
+            f.seek(self._keys_offset)
+            chunk = f.read()
+        # Only consume complete lines; a writer may be mid-append
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            key, _, row = line.decode("ascii").partition(" ")
+            # Lines without a row come from the older implicit-order format
+            self._index.setdefault(key, int(row) if row else self._lines)
+            self._lines += 1
+        self._keys_offset += end
+
+    def _trim_torn_tails(self) -> int:
+        """Cut a partial row or key line left by a crashed writer; returns the next free row.
+
+        Must hold the file lock, right after ``_refresh``.
+        """
+        row_bytes = 4 * self.dim
+        rows = 0
+        if os.path.exists(self._vectors_path):
+            rows, torn = divmod(os.path.getsize(self._vectors_path), row_bytes)
+            if torn:
+                os.truncate(self._vectors_path, rows * row_bytes)
+        if os.path.exists(self._keys_path) and os.path.getsize(self._keys_path) > self._keys_offset:
+            os.truncate(self._keys_path, self._keys_offset)
+        return rows
+
+    def _row(self, row: int) -> np.ndarray:
+        if row >= self._mapped_rows:
+            rows = os.path.getsize(self._vectors_path) // (4 * self.dim)
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+            self._mapped_rows = rows
+        return np.array(self._matrix[row])
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self._index.get(key)
+        if row is None:
+            self._refresh()
+            row = self._index.get(key)
+            if row is None:
+                return None
+        return self._row(row)
+
+    def put_many(self, keys: List[str], vectors: np.ndarray) -> None:
+        handle = self._file_lock()
+        try:
+            self._refresh()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                with open(self._meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"dim": self.dim}, f)
+
+            fresh = [i for i, key in enumerate(keys) if key not in self._index]
+            fresh = list({keys[i]: i for i in fresh}.values())
+            if not fresh:
+                return
+
+            start = self._trim_torn_tails()
+            # Vectors first, then keys, so readers never see a key without its row
+            with open(self._vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray(vectors[fresh], dtype=np.float32).tobytes())
+            with open(self._keys_path, "ab") as f:
+                f.write("".join(f"{keys[i]} {start + n}\n" for n, i in enumerate(fresh)).encode("ascii"))
+            self._refresh()
+        finally:
+            self._file_unlock(handle)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class EmbeddingCache:
+    """LRU + optional disk cache in front of ``model.encode``."""
+
+    def __init__(self, model_name: str, max_entries: int = 50000, cache_dir: Optional[str] = None):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.disk = DiskEmbeddingStore(cache_dir) if cache_dir else None
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def encode(self, model, texts: List[str], batch_size: int = 64, normalize: bool = False) -> np.ndarray:
+        """Return float32 embeddings for ``texts``, encoding only the texts never seen before.
+
+        Missing texts are de-duplicated and sent to ``model.encode`` in one batched call.
+        """
+        keys = [cache_key(self.model_name, text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+
+        with self._lock:
+            for key, text in zip(keys, texts):
+                if key in found or key in missing:
+                    continue
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    found[key] = vector
+                    continue
+                vector = self.disk.get(key) if self.disk is not None else None
+                if vector is not None:
+                    self.disk_hits += 1
+                    self._remember(key, vector)
+                    found[key] = vector
+                    continue
+                self.misses += 1
+                missing[key] = normalize_text(text)
+
+        if missing:
+            new_keys = list(missing)
+            with stage("encode"):
+                vectors = np.asarray(
+                    model.encode(list(missing.values()), batch_size=batch_size, convert_to_numpy=True),
+                    dtype=np.float32,
+                )
+            with self._lock:
+                for key, vector in zip(new_keys, vectors):
+                    self._remember(key, vector)
+                    found[key] = vector
+                if self.disk is not None:
+                    self.disk.put_many(new_keys, vectors)
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        embeddings = np.stack([found[key] for key in keys])
+        if normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.where(norms > 0, norms, 1.0)
+        return embeddings
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+        }
+
+    def clear(self) -> None:
+        """Drop the in-memory tier (the disk tier is left untouched)."""
+        with self._lock:
+            self._memory.clear()
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name: str, backend: Optional[str] = None) -> EmbeddingCache:
+    """Process-wide cache per model name and embedding backend.
+
+    Quantized backends give slightly different vectors, so they are cached under
+    ``<model>@<backend>``; the default torch backend keeps the plain model name.
+    ``RECRUITLY_EMBEDDING_CACHE_DIR`` enables the disk tier (one subdirectory per model)
+    and ``RECRUITLY_EMBEDDING_CACHE_SIZE`` bounds the in-memory tier.
+    """
+    backend = get_backend(backend)
+    if backend != "torch":
+        model_name = f"{model_name}@{backend}"
+    with _caches_lock:
+        cache = _caches.get(model_name)
+        if cache is None:
+            root = os.getenv("RECRUITLY_EMBEDDING_CACHE_DIR")
+            cache_dir = os.path.join(root, model_name.replace("/", "__")) if root else None
+            max_entries = int(os.getenv("RECRUITLY_EMBEDDING_CACHE_SIZE", "50000"))
+            cache = _caches[model_name] = EmbeddingCache(model_name, max_entries=max_entries, cache_dir=cache_dir)
+        return cache
@@ -0,0 +1,221 @@
+# extractors.py
+"""
+Pluggable section extractors used by matching.extract_with_structured_prompt.
+
+Every backend implements ``extract_batch(documents, sections)`` where ``documents`` is a
+list of ``(text, context)`` pairs, and returns one ``{section: extracted_text}`` dict
+per document. Backends:
+
+- ``hf``: one Hugging Face Inference API call per prompt (the original behavior)
+- ``hf-batch``: every prompt of every document in one request per ``max_batch`` prompts
+- ``local``: a CPU seq2seq model through ``transformers`` (no network)
+- ``regex``: the keyword fallback only (no network, no model)
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from instrumentation import get_logger, metrics, stage
+
+logger = get_logger("extractors")
+
+Document = Tuple[str, str]
+
+PROMPT_CHAR_LIMIT = 1000
+# Part of every prompting backend's version, so cached sections are re-extracted
+# after the prompts change: bump it with any edit to build_prompt
+PROMPT_VERSION = "1"
+
+def build_prompt(text: str, section: str, context: str) -> str:
+    """Simple prompts that work better with Flan-T5."""
+    snippet = text[:PROMPT_CHAR_LIMIT]
+    prompts = {
+        "skills": f"What technical skills are mentioned in this {context}?\n\n{snippet}\n\nSkills:",
+        "experience": f"What work experience is described in this {context}?\n\n{snippet}\n\nExperience:",
+        "education": f"What education or qualifications are mentioned in this {context}?\n\n{snippet}\n\nEducation:",
+        "general": f"Summarize the key qualifications from this {context}:\n\n{snippet}\n\nSummary:",
+    }
+    return prompts.get(section, prompts["general"])
+
+def is_extractable(text: str) -> bool:
+    return bool(text) and len(text.strip()) >= 10
+
+def parse_generated_text(item) -> str:
+    """Pull ``generated_text`` out of one element of an Inference API response."""
+    if isinstance(item, list) and item:
+        item = item[0]
+    if isinstance(item, dict) and "generated_text" in item:
+        return str(item["generated_text"]).strip()
+    return ""
+
+
+class SectionExtractor:
+    """Base class. ``version`` must change whenever outputs for the same input can change."""
+
+    name = "base"
+    version = "1"
+
+    def __init__(self, fallback: Callable[[str, str], str]):
+        self.fallback = fallback
+
+    def extract_batch(self, documents: List[Document], sections: List[str]) -> List[Dict[str, str]]:
+        raise NotImplementedError
+
+    def extract(self, text: str, section: str, context: str) -> str:
+        return self.extract_batch([(text, context)], [section])[0][section]
+
+    def _finish(self, result: str, text: str, section: str) -> str:
+        # If the model fails or returns (almost) nothing, use the fallback. Only counted
+        # here: the regex backend calls the fallback as its primary extractor.
+        if not result or len(result.strip()) < 3:
+            logger.debug("Using fallback extraction for %s", section)
+            metrics.inc("fallbacks")
+            result = self.fallback(text, section)
+        return result.strip()
+
+    def _prompts(self, documents: List[Document], sections: List[str]) -> List[Tuple[int, str, str]]:
+        """(document index, section, prompt) for every extractable document/section."""
+        return [
+            (i, section, build_prompt(text, section, context))
+            for i, (text, context) in enumerate(documents) if is_extractable(text)
+            for section in sections
+        ]
+
+    def _assemble(self, documents: List[Document], sections: List[str],
+                  prompts: List[Tuple[int, str, str]], outputs: List[str]) -> List[Dict[str, str]]:
+        results = [{section: "" for section in sections} for _ in documents]
+        for (i, section, _), output in zip(prompts, outputs):
+            results[i][section] = self._finish(output, documents[i][0], section)
+        return results
+
+
+class RegexExtractor(SectionExtractor):
+    """Keyword extraction only; runs fully offline."""
+
+    name = "regex"
+
+    def extract_batch(self, documents: List[Document], sections: List[str]) -> List[Dict[str, str]]:
+        return [
+            {section: self.fallback(text, section).strip() if is_extractable(text) else "" for section in sections}
+            for text, _ in documents
+        ]
+
+
+class PromptExtractor(SectionExtractor):
+    """
+    One round trip per (document, section). With ``call_llm_many`` the prompts of a
+    batch are issued concurrently instead of one after another.
+    """
+
+    name = "hf"
+
+    def __init__(self, call_llm: Callable[[str], str], fallback: Callable[[str, str], str],
+                 call_llm_many: Optional[Callable[[List[str]], List[str]]] = None, model: str = ""):
+        super().__init__(fallback)
+        self.call_llm = call_llm
+        self.call_llm_many = call_llm_many
+        # ``model`` names what call_llm talks to, so switching models misses the cache
+        self.version = f"1:{model}:{PROMPT_VERSION}"
+
+    def extract_batch(self, documents: List[Document], sections: List[str]) -> List[Dict[str, str]]:
+        prompts = self._prompts(documents, sections)
+        texts = [prompt for _, _, prompt in prompts]
+        if self.call_llm_many is not None:
+            outputs = self.call_llm_many(texts)
+        else:
+            outputs = [self.call_llm(prompt) for prompt in texts]
+        return self._assemble(documents, sections, prompts, outputs)
+
+
+class BatchedHTTPExtractor(SectionExtractor):
+    """Send all prompts of a batch in one Inference API request (``inputs`` as a list)."""
+
+    name = "hf-batch"
+
+    def __init__(self, api_url: str, headers: Dict[str, str], fallback: Callable[[str, str], str],
+                 max_batch: int = 64, timeout: float = 120.0, max_new_tokens: int = 300,
+                 get_session: Optional[Callable[[], Any]] = None):
+        super().__init__(fallback)
+        self.api_url = api_url
+        self.headers = headers
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.max_new_tokens = max_new_tokens
+        self.version = f"1:{api_url}:{PROMPT_VERSION}"
+        # A pooled keep-alive ``requests.Session``; without one, the extractor opens its own
+        self.get_session = get_session
+        self._session = None
+
+    def _get_session(self):
+        if self.get_session is not None:
+            return self.get_session()
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def _post(self, prompts: List[str]) -> List[str]:
+        payload = {
+            "inputs": prompts,
+            "parameters": {"max_new_tokens": self.max_new_tokens, "temperature": 0.1, "do_sample": True},
+        }
+        metrics.inc("llm_requests")
+        try:
+            with stage("llm_call"):
+                response = self._get_session().post(self.api_url, headers=self.headers, json=payload,
+                                                    timeout=self.timeout)
+                response.raise_for_status()
+                data = response.json()
+        except Exception as e:
+            logger.warning("Batched LLM API error: %s", e)
+            metrics.inc("llm_failures")
+            return [""] * len(prompts)
+
+        if not isinstance(data, list) or len(data) != len(prompts):
+            logger.warning("Unexpected batched response format: %.200s", data)
+            metrics.inc("llm_failures")
+            return [""] * len(prompts)
+        return [parse_generated_text(item) for item in data]
+
+    def extract_batch(self, documents: List[Document], sections: List[str]) -> List[Dict[str, str]]:
+        prompts = self._prompts(documents, sections)
+        outputs: List[str] = []
+        for start in range(0, len(prompts), self.max_batch):
+            outputs.extend(self._post([prompt for _, _, prompt in prompts[start:start + self.max_batch]]))
+        return self._assemble(documents, sections, prompts, outputs)
+
+
+class Seq2SeqExtractor(SectionExtractor):
+    """Run a local instruction-tuned seq2seq model on CPU; the pipeline loads on first use."""
+
+    name = "local"
+
+    def __init__(self, fallback: Callable[[str, str], str], model_name: str = "google/flan-t5-small",
+                 batch_size: int = 16, max_new_tokens: int = 64):
+        super().__init__(fallback)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_new_tokens = max_new_tokens
+        self.version = f"1:{model_name}:{PROMPT_VERSION}"
+        self._pipeline = None
+
+    def _get_pipeline(self):
+        if self._pipeline is None:
+            from transformers import pipeline
+            self._pipeline = pipeline("text2text-generation", model=self.model_name, device=-1)
+        return self._pipeline
+
+    def extract_batch(self, documents: List[Document], sections: List[str]) -> List[Dict[str, str]]:
+        prompts = self._prompts(documents, sections)
+        outputs: List[str] = []
+        if prompts:
+            pipe = self._get_pipeline()
+            with stage("llm_call"):
+                generated = pipe(
+                    [prompt for _, _, prompt in prompts],
+                    batch_size=self.batch_size,
+                    max_new_tokens=self.max_new_tokens,
+                )
+            outputs = [parse_generated_text(item) for item in generated]
+        return self._assemble(documents, sections, prompts, outputs)
+
+
+EXTRACTOR_NAMES = ("hf", "hf-batch", "local", "regex")
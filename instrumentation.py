@@ -0,0 +1,199 @@
+# instrumentation.py
+"""
+Logging, stage timers, counters and traces for the matching pipeline.
+
+- ``get_logger(name)`` returns a child of the ``recruitly`` logger. Its level comes from
+  ``RECRUITLY_LOG_LEVEL`` (default WARNING). Call sites use lazy ``%s`` arguments, so
+  debug messages cost nothing when debug logging is off.
+- ``stage(name)`` times a block into the ``recruitly_stage_seconds`` histogram and,
+  when a trace is active, into that trace.
+- ``metrics.inc(name)`` bumps a counter, for example ``llm_failures``.
+- ``Trace`` collects per-request stage timings and events (see
+  ``match_resume_to_jd(..., return_trace=True)``).
+- ``render_prometheus()`` and ``serve_metrics(port)`` expose everything in the Prometheus
+  text format for local scraping.
+"""
+import contextlib
+import contextvars
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_root_configured = False
+
+
+def configure_logging(level: Optional[str] = None) -> logging.Logger:
+    """Attach a stderr handler to the ``recruitly`` logger (once) and set its level."""
+    global _root_configured
+    root = logging.getLogger("recruitly")
+    if not _root_configured:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        root.addHandler(handler)
+        root.propagate = False
+        _root_configured = True
+    root.setLevel((level or os.getenv("RECRUITLY_LOG_LEVEL", "WARNING")).upper())
+    return root
+
+
+def get_logger(name: str) -> logging.Logger:
+    if not _root_configured:
+        configure_logging()
+    return logging.getLogger(f"recruitly.{name}")
+
+
+class Trace:
+    """Stage timings and notable events for one request."""
+
+    def __init__(self):
+        self.stages: List[Tuple[str, float]] = []
+        self.events: List[str] = []
+        self._start = time.perf_counter()
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stages.append((name, seconds))
+
+    def event(self, name: str) -> None:
+        self.events.append(name)
+
+    def to_dict(self) -> Dict:
+        totals: Dict[str, float] = {}
+        for name, seconds in self.stages:
+            totals[name] = totals.get(name, 0.0) + seconds
+        return {
+            "total_seconds": round(time.perf_counter() - self._start, 6),
+            "stage_seconds": {name: round(seconds, 6) for name, seconds in totals.items()},
+            "stage_calls": {name: sum(1 for n, _ in self.stages if n == name) for name in totals},
+            "events": list(self.events),
+        }
+
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("recruitly_trace", default=None)
+
+
+@contextlib.contextmanager
+def tracing():
+    """Make a new Trace current for the enclosed block and yield it."""
+    trace = Trace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+class Metrics:
+    """Process-wide counters and stage histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.stage_counts: Dict[str, List[int]] = {}
+        self.stage_sums: Dict[str, float] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+
+    def inc(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.event(name)
+
+    def observe(self, stage_name: str, seconds: float) -> None:
+        with self._lock:
+            counts = self.stage_counts.get(stage_name)
+            if counts is None:
+                counts = self.stage_counts[stage_name] = [0] * (len(STAGE_BUCKETS) + 1)
+            for i, bound in enumerate(STAGE_BUCKETS):
+                if seconds <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self.stage_sums[stage_name] = self.stage_sums.get(stage_name, 0.0) + seconds
+
+    def register_collector(self, prefix: str, collect: Callable[[], Dict[str, float]]) -> None:
+        """Export ``collect()`` values as ``recruitly_<prefix>_<key>`` gauges at scrape time."""
+        self._collectors[prefix] = collect
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.stage_counts.clear()
+            self.stage_sums.clear()
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name in sorted(self.counters):
+                lines.append(f"# TYPE recruitly_{name}_total counter")
+                lines.append(f"recruitly_{name}_total {self.counters[name]:g}")
+            if self.stage_counts:
+                lines.append("# TYPE recruitly_stage_seconds histogram")
+            for name in sorted(self.stage_counts):
+                cumulative = 0
+                for bound, count in zip(STAGE_BUCKETS, self.stage_counts[name]):
+                    cumulative += count
+                    lines.append(f'recruitly_stage_seconds_bucket{{stage="{name}",le="{bound:g}"}} {cumulative}')
+                cumulative += self.stage_counts[name][-1]
+                lines.append(f'recruitly_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {cumulative}')
+                lines.append(f'recruitly_stage_seconds_sum{{stage="{name}"}} {self.stage_sums[name]:.6f}')
+                lines.append(f'recruitly_stage_seconds_count{{stage="{name}"}} {cumulative}')
+            collectors = list(self._collectors.items())
+        for prefix, collect in collectors:
+            for key, value in sorted(collect().items()):
+                if isinstance(value, (int, float)):
+                    lines.append(f"# TYPE recruitly_{prefix}_{key} gauge")
+                    lines.append(f"recruitly_{prefix}_{key} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+@contextlib.contextmanager
+def stage(name: str):
+    """Time the enclosed block as pipeline stage ``name``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        metrics.observe(name, seconds)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_stage(name, seconds)
+
+
+def render_prometheus() -> str:
+    return metrics.render_prometheus()
+
+
+def serve_metrics(port: int = 9108, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve ``GET /metrics`` from a daemon thread; returns the server (call shutdown() to stop)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,90 @@
+# job_catalog.py
+"""
+Score one resume against a catalog of open positions.
+
+``JobCatalog`` keeps every posting as precomputed per-section embeddings in a
+``SectionIndex(context="job description")``. ``upsert_many`` re-extracts and re-embeds
+only the postings whose text changed (tracked by a hash per job id), and ``remove``
+tombstones closed ones. ``match_resume_to_jobs`` extracts and embeds the resume once
+and scores every job in one vectorized pass over the section matrices (split across
+threads for very large catalogs), with the same numbers as ``match_resume_to_jd``.
+
+    catalog = JobCatalog("catalog/")
+    catalog.upsert_many({"req-101": jd_text, ...})
+    catalog.save()
+    match_resume_to_jobs(resume_text, catalog, k=20)
+"""
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from instrumentation import get_logger, metrics
+from section_cache import text_hash
+from vector_index import SectionIndex
+
+logger = get_logger("job_catalog")
+
+
+class JobCatalog:
+
+    def __init__(self, path: Optional[str] = None, dtype: str = "float32"):
+        self.path = path
+        self.index = SectionIndex(path, dtype=dtype, context="job description")
+        self._hashes: Dict[str, str] = {}
+        if path and os.path.exists(self._hashes_file()):
+            with open(self._hashes_file(), "r", encoding="utf-8") as f:
+                self._hashes = json.load(f)
+
+    def _hashes_file(self) -> str:
+        return os.path.join(self.path, "postings.json")
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, job_id) -> bool:
+        return job_id in self.index
+
+    def upsert_many(self, postings: Union[Dict, Iterable[Tuple]]) -> int:
+        """Add new postings and refresh changed ones; returns how many were (re-)embedded."""
+        items = list(postings.items()) if isinstance(postings, dict) else list(postings)
+        changed = []
+        for job_id, text in items:
+            digest = text_hash(text or "")
+            if job_id in self.index and self._hashes.get(str(job_id)) == digest:
+                continue
+            changed.append((job_id, text))
+            self._hashes[str(job_id)] = digest
+        if changed:
+            self.index.add_many(changed)
+        metrics.inc("catalog_postings_embedded", len(changed))
+        logger.debug("Catalog upsert: %d of %d postings changed", len(changed), len(items))
+        return len(changed)
+
+    def upsert(self, job_id, text: str) -> bool:
+        return self.upsert_many([(job_id, text)]) == 1
+
+    def remove(self, job_id) -> bool:
+        self._hashes.pop(str(job_id), None)
+        return self.index.delete(job_id)
+
+    def save(self) -> None:
+        self.index.save()
+        # Hashes last: if this write is lost, the next upsert just re-embeds those postings
+        with open(self._hashes_file(), "w", encoding="utf-8") as f:
+            json.dump(self._hashes, f)
+
+
+def match_resume_to_jobs(resume_text: str, jd_catalog: Union[JobCatalog, Dict[str, str]],
+                         k: Optional[int] = None, workers: Optional[int] = None) -> List[Dict]:
+    """
+    Rank the jobs of ``jd_catalog`` (a JobCatalog or ``{job_id: text}``) for one resume.
+
+    Returns ``[{"job_id": ..., "overall": 72.4, "sections": {...}}, ...]``, best first;
+    ``k=None`` returns every job.
+    """
+    if not isinstance(jd_catalog, JobCatalog):
+        catalog = JobCatalog()
+        catalog.upsert_many(jd_catalog)
+        jd_catalog = catalog
+    ranked = jd_catalog.index.search(resume_text, k=k, query_context="resume", workers=workers)
+    return [{"job_id": entry["id"], "overall": entry["overall"], "sections": entry["sections"]} for entry in ranked]
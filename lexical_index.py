@@ -0,0 +1,240 @@
+# lexical_index.py
+"""
+Persistent BM25 index over a document pool, used as a cheap first stage before embeddings.
+
+Documents are cleaned with ``text_preprocessor.clean_texts`` (lowercased, tech-aware
+tokens, stopwords removed) and stored as a sparse document-term matrix of term counts.
+A query scores only the matrix columns of its own terms, so scoring costs time in
+proportion to the postings of those terms, not the size of the vocabulary.
+
+``lexical_prefilter(jd_text, resumes, top_n)`` keeps the ``top_n`` resumes by BM25
+score (a persistent index re-tokenizes a resume only when its text changed); ``rank_resumes(..., prefilter_top_n=N)`` runs the semantic scoring on those only.
+``python benchmarks.py lexical_prefilter`` reports how many of the semantic top-k
+survive the filter.
+
+Layout of an index directory::
+
+    meta.json    k1, b
+    ids.json     document ids, row order
+    hashes.json  text hash of each row, row order
+    vocab.json   terms, column order
+    tf.npz       (rows, terms) sparse term counts
+    deleted.npy  (rows,) bool tombstones
+"""
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import scipy.sparse as sp
+
+from instrumentation import metrics, stage
+from section_cache import text_hash
+from text_preprocessor import clean_texts
+
+K1 = 1.2
+B = 0.75
+
+
+class LexicalIndex:
+
+    def __init__(self, path: Optional[str] = None, k1: float = K1, b: float = B):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.ids: List = []
+        self.hashes: List[Optional[str]] = []
+        self._row_of: Dict = {}
+        self.vocab: Dict[str, int] = {}
+        self.tf = sp.csr_matrix((0, 0), dtype=np.float32)
+        self.deleted = np.zeros(0, dtype=bool)
+        self.lengths = np.zeros(0, dtype=np.float32)
+        self.df = np.zeros(0, dtype=np.int64)
+        self._by_term: Optional[sp.csc_matrix] = None
+
+        if path and os.path.exists(os.path.join(path, "meta.json")):
+            self._load()
+
+    # ----- persistence -----
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self) -> None:
+        with open(self._file("meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.k1, self.b = meta["k1"], meta["b"]
+        with open(self._file("ids.json"), "r", encoding="utf-8") as f:
+            self.ids = json.load(f)
+        try:
+            with open(self._file("hashes.json"), "r", encoding="utf-8") as f:
+                self.hashes = json.load(f)
+        except FileNotFoundError:
+            # Indexes saved before text hashes were kept: every row counts as changed once
+            self.hashes = [None] * len(self.ids)
+        with open(self._file("vocab.json"), "r", encoding="utf-8") as f:
+            self.vocab = {term: col for col, term in enumerate(json.load(f))}
+        self.tf = sp.load_npz(self._file("tf.npz")).tocsr()
+        self.deleted = np.load(self._file("deleted.npy"))
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self.ids) if not self.deleted[row]}
+        self.lengths = np.asarray(self.tf.sum(axis=1), dtype=np.float32).ravel()
+        live = self.tf[np.flatnonzero(~self.deleted)]
+        self.df = np.bincount(live.indices, minlength=len(self.vocab)).astype(np.int64)
+
+    def save(self) -> None:
+        if not self.path:
+            raise ValueError("This index has no path; pass one to LexicalIndex() to persist it")
+        os.makedirs(self.path, exist_ok=True)
+        sp.save_npz(self._file("tf.npz"), self.tf)
+        np.save(self._file("deleted.npy"), self.deleted)
+        with open(self._file("ids.json"), "w", encoding="utf-8") as f:
+            json.dump(self.ids, f)
+        with open(self._file("hashes.json"), "w", encoding="utf-8") as f:
+            json.dump(self.hashes, f)
+        with open(self._file("vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(sorted(self.vocab, key=self.vocab.get), f)
+        # meta.json last: its presence marks a complete index
+        with open(self._file("meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"k1": self.k1, "b": self.b}, f)
+
+    # ----- building -----
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, doc_id) -> bool:
+        return doc_id in self._row_of
+
+    def is_current(self, doc_id, text: str) -> bool:
+        """Whether ``doc_id`` is indexed with exactly this text."""
+        row = self._row_of.get(doc_id)
+        return row is not None and self.hashes[row] == text_hash(text or "")
+
+    def add_many(self, documents: Union[Dict, Iterable[Tuple]]) -> None:
+        """
+        Add or replace documents from ``{doc_id: text}`` or ``(doc_id, text)`` pairs.
+        An id given more than once keeps its last text.
+        """
+        items = list(documents.items()) if isinstance(documents, dict) else list(dict(documents).items())
+        if not items:
+            return
+        for doc_id, _ in items:
+            self.delete(doc_id)
+
+        columns: List[int] = []
+        indptr = [0]
+        vocab = self.vocab
+        for tokens in clean_texts((text or "" for _, text in items), as_tokens=True, stream=True):
+            columns.extend(vocab.setdefault(token, len(vocab)) for token in tokens)
+            indptr.append(len(columns))
+        block = sp.csr_matrix(
+            (np.ones(len(columns), dtype=np.float32), np.array(columns, dtype=np.int64), np.array(indptr)),
+            shape=(len(items), len(vocab)),
+        )
+        block.sum_duplicates()  # repeated terms become counts
+
+        self.tf.resize((self.tf.shape[0], len(vocab)))
+        self.tf = sp.vstack([self.tf, block], format="csr")
+        self.lengths = np.concatenate([self.lengths, np.diff(indptr).astype(np.float32)])
+        self.df = np.concatenate([self.df, np.zeros(len(vocab) - len(self.df), dtype=np.int64)])
+        self.df += np.bincount(block.indices, minlength=len(vocab))
+        self.deleted = np.concatenate([self.deleted, np.zeros(len(items), dtype=bool)])
+        self._by_term = None
+
+        start = len(self.ids)
+        for offset, (doc_id, text) in enumerate(items):
+            self.ids.append(doc_id)
+            self.hashes.append(text_hash(text or ""))
+            self._row_of[doc_id] = start + offset
+
+    def upsert_many(self, documents: Union[Dict, Iterable[Tuple]]) -> int:
+        """Add new documents and replace changed ones; returns how many were (re-)tokenized."""
+        items = documents.items() if isinstance(documents, dict) else dict(documents).items()
+        changed = [(doc_id, text) for doc_id, text in items if not self.is_current(doc_id, text)]
+        self.add_many(changed)
+        return len(changed)
+
+    def add(self, doc_id, text: str) -> None:
+        self.add_many([(doc_id, text)])
+
+    def delete(self, doc_id) -> bool:
+        """Tombstone a document; the row is dropped for good by ``compact()``."""
+        row = self._row_of.pop(doc_id, None)
+        if row is None:
+            return False
+        self.deleted[row] = True
+        self.df[self.tf.indices[self.tf.indptr[row]:self.tf.indptr[row + 1]]] -= 1
+        return True
+
+    def compact(self) -> None:
+        """Rewrite the matrix without deleted rows."""
+        keep = np.flatnonzero(~self.deleted)
+        self.tf = self.tf[keep]
+        self.lengths = self.lengths[keep]
+        self.ids = [self.ids[i] for i in keep]
+        self.hashes = [self.hashes[i] for i in keep]
+        self.deleted = np.zeros(len(self.ids), dtype=bool)
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        self._by_term = None
+
+    # ----- search -----
+
+    def scores(self, query_text: str) -> np.ndarray:
+        """BM25 score of every row (deleted rows score 0); each distinct query term counts once."""
+        scores = np.zeros(len(self.ids), dtype=np.float64)
+        if not len(self):
+            return scores
+        terms = clean_texts([query_text or ""], as_tokens=True)[0]
+        cols = np.array(sorted({self.vocab[t] for t in terms if t in self.vocab}), dtype=np.int64)
+        if not len(cols):
+            return scores
+
+        if self._by_term is None:
+            # Column slices of a CSC matrix only touch the postings of the query terms
+            self._by_term = self.tf.tocsc()
+        postings = self._by_term[:, cols].tocoo()
+        live = ~self.deleted
+        df = self.df[cols]
+        idf = np.log1p((len(self) - df + 0.5) / (df + 0.5))
+        average_length = max(float(self.lengths[live].mean()), 1e-9)
+        norm = self.k1 * (1.0 - self.b + self.b * self.lengths[postings.row] / average_length)
+        tf = postings.data.astype(np.float64)
+        weights = idf[postings.col] * tf * (self.k1 + 1.0) / (tf + norm)
+        scores += np.bincount(postings.row, weights=weights, minlength=len(self.ids))
+        scores[~live] = 0.0
+        return scores
+
+    def search(self, query_text: str, k: int = 10, ids: Optional[Iterable] = None) -> List[Dict]:
+        """Best k documents (optionally only among ``ids``) as ``{"id", "score"}``, best first."""
+        if ids is None:
+            rows = np.flatnonzero(~self.deleted)
+        else:
+            rows = np.array([self._row_of[doc_id] for doc_id in ids if doc_id in self._row_of], dtype=np.int64)
+        if not len(rows):
+            return []
+        with stage("lexical"):
+            scores = self.scores(query_text)[rows]
+            if k < len(rows):
+                top = np.argpartition(-scores, k - 1)[:k]
+                rows, scores = rows[top], scores[top]
+            # Ties keep index order, so equal scores rank deterministically
+            order = np.lexsort((rows, -scores))
+        return [{"id": self.ids[rows[i]], "score": float(scores[i])} for i in order]
+
+
+def lexical_prefilter(jd_text: str, resumes: Dict, top_n: int, index: Optional[LexicalIndex] = None) -> Dict:
+    """
+    The ``top_n`` entries of ``{resume_id: text}`` with the highest BM25 score for the JD.
+
+    With a persistent ``index`` (keyed by the same ids) only resumes it does not hold yet,
+    or holds with a different text, are tokenized; otherwise a throwaway index is built
+    over ``resumes``.
+    """
+    if len(resumes) <= top_n:
+        return resumes
+    if index is None:
+        index = LexicalIndex()
+    index.upsert_many(resumes)
+    kept = index.search(jd_text, k=top_n, ids=resumes.keys())
+    metrics.inc("lexical_filtered", len(resumes) - len(kept))
+    return {entry["id"]: resumes[entry["id"]] for entry in kept}
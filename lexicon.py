@@ -0,0 +1,104 @@
+# lexicon.py
+"""
+Compiled keyword lexicon for the regex extraction fallback.
+
+All terms of all sections are folded into one character trie and compiled into a
+single regular expression, so a document is scanned once, in linear time, no matter
+how many terms the lexicon holds. Terms only match on word boundaries ("ml" does not
+match inside "html"), and "+", "#" and "." count as part of a term so "c++", "c#"
+and ".net" work. Free-form patterns (e.g. "5+ years of experience") ride along in the
+same expression as named alternatives.
+
+The default lexicon is ``lexicon.json`` next to this module; ``RECRUITLY_LEXICON``
+points at a replacement with the same layout:
+``{"<section>": {"terms": [...], "patterns": [...]}, ...}``.
+"""
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lexicon.json")
+
+# A term may not be glued to surrounding word characters (or to "+"/"#" after it)
+_TERM_START = r"(?<!\w)"
+_TERM_END = r"(?![\w+#])"
+
+
+def _normalize_term(term: str) -> str:
+    return " ".join(term.lower().split())
+
+
+def _trie_regex(terms: List[str]) -> str:
+    """Build a prefix-factored alternation; longer terms win over their prefixes."""
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node: Dict) -> str:
+        branches = []
+        for char in sorted(key for key in node if key):
+            # Multi-word terms tolerate any run of whitespace (line breaks included)
+            branches.append((r"\s+" if char == " " else re.escape(char)) + build(node[char]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class Lexicon:
+
+    def __init__(self, sections: Dict[str, Dict[str, List[str]]]):
+        self.sections = list(sections)
+        self.term_sections: Dict[str, Tuple[str, ...]] = {}
+        self.pattern_sections: Dict[str, str] = {}
+
+        for section, entry in sections.items():
+            for term in entry.get("terms", []):
+                term = _normalize_term(term)
+                if term and section not in self.term_sections.get(term, ()):
+                    self.term_sections[term] = self.term_sections.get(term, ()) + (section,)
+
+        alternatives = []
+        if self.term_sections:
+            alternatives.append(f"(?P<term>{_TERM_START}{_trie_regex(list(self.term_sections))}{_TERM_END})")
+        for section, entry in sections.items():
+            for pattern in entry.get("patterns", []):
+                name = f"p{len(self.pattern_sections)}"
+                self.pattern_sections[name] = section
+                alternatives.append(f"(?P<{name}>{pattern})")
+
+        self.regex = re.compile("|".join(alternatives) or r"(?!)")
+        self.fingerprint = hashlib.sha1(json.dumps(sections, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+    @classmethod
+    def from_file(cls, path: str) -> "Lexicon":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def find_all(self, text: str) -> Dict[str, List[str]]:
+        """Every lexicon hit per section, in document order (duplicates kept), from one scan."""
+        found: Dict[str, List[str]] = {section: [] for section in self.sections}
+        for match in self.regex.finditer(text.lower()):
+            group = match.lastgroup
+            if group == "term":
+                term = _normalize_term(match.group())
+                for section in self.term_sections[term]:
+                    found[section].append(term)
+            else:
+                found[self.pattern_sections[group]].append(match.group())
+        return found
+
+
+@lru_cache(maxsize=1)
+def get_lexicon() -> Lexicon:
+    return Lexicon.from_file(os.getenv("RECRUITLY_LEXICON", DEFAULT_LEXICON_PATH))
@@ -0,0 +1,165 @@
+# llm_client.py
+"""
+Async client for the Hugging Face Inference API.
+
+One pooled aiohttp session per client. The client caps concurrency, applies an
+optional token-bucket rate limit, retries 429/5xx and connection errors with jittered
+exponential backoff, and enforces a deadline per request. Synchronous code submits
+coroutines to a shared background event loop through ``run_sync``, so the session and
+its keep-alive connections outlive a single match.
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+from extractors import parse_generated_text
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """Allow ``rate`` acquisitions per second with bursts of up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AsyncLLMClient:
+    """
+    api_url, headers: Inference API endpoint and auth headers.
+    concurrency: maximum requests in flight (also the connection pool size).
+    rate_per_second: token-bucket limit on request starts (None = unlimited).
+    max_retries: extra attempts after a 429/5xx/connection error.
+    backoff, max_backoff: base and cap in seconds for full-jitter exponential backoff.
+    deadline: total seconds allowed per prompt, retries included.
+    """
+
+    def __init__(self, api_url: str, headers: Dict[str, str], concurrency: int = 6,
+                 rate_per_second: Optional[float] = None, max_retries: int = 3,
+                 backoff: float = 0.5, max_backoff: float = 8.0, deadline: float = 60.0,
+                 parameters: Optional[Dict] = None):
+        self.api_url = api_url
+        self.headers = headers
+        self.concurrency = concurrency
+        self.rate_per_second = rate_per_second
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.parameters = parameters or {"max_new_tokens": 300, "temperature": 0.1, "do_sample": True}
+        self.retries = 0
+        self.failures = 0
+        self._session = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._bucket: Optional[TokenBucket] = None
+
+    async def _ensure_session(self):
+        if self._session is None or self._session.closed:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._bucket = TokenBucket(self.rate_per_second) if self.rate_per_second else None
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncLLMClient":
+        await self._ensure_session()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _retry_delay(self, attempt: int, hint: Optional[float]) -> float:
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        if hint:
+            # 503 "model loading" responses carry an estimated_time worth honoring
+            delay = max(delay, min(self.max_backoff, hint))
+        return delay
+
+    async def _attempts(self, prompt: str) -> str:
+        import aiohttp
+
+        session = await self._ensure_session()
+        payload = {"inputs": prompt, "parameters": self.parameters}
+        for attempt in range(self.max_retries + 1):
+            hint = None
+            async with self._semaphore:
+                if self._bucket is not None:
+                    await self._bucket.acquire()
+                try:
+                    async with session.post(self.api_url, json=payload) as response:
+                        if response.status == 200:
+                            return parse_generated_text(await response.json(content_type=None))
+                        # Other 4xx are final, whatever their body looks like
+                        if response.status not in RETRY_STATUSES:
+                            return ""
+                        retry_after = response.headers.get("Retry-After")
+                        if retry_after and retry_after.replace(".", "", 1).isdigit():
+                            hint = float(retry_after)
+                        else:
+                            data = await response.json(content_type=None)
+                            if isinstance(data, dict):
+                                hint = data.get("estimated_time")
+                except (aiohttp.ClientError, ValueError):
+                    pass
+            if attempt < self.max_retries:
+                self.retries += 1
+                await asyncio.sleep(self._retry_delay(attempt, hint))
+        return ""
+
+    async def generate(self, prompt: str) -> str:
+        """Generated text for one prompt, or "" after retries/deadline are exhausted."""
+        try:
+            result = await asyncio.wait_for(self._attempts(prompt), timeout=self.deadline)
+        except asyncio.TimeoutError:
+            result = ""
+        if not result:
+            self.failures += 1
+        return result
+
+    async def generate_many(self, prompts: List[str]) -> List[str]:
+        """Issue all prompts concurrently (bounded by ``concurrency``), preserving order."""
+        return list(await asyncio.gather(*(self.generate(prompt) for prompt in prompts)))
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-client-loop", daemon=True).start()
+        return _loop
+
+
+def run_sync(coro):
+    """Run ``coro`` on the shared background loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
@@ -6,11 +6,54 @@ except ImportError:
     PLOTLY_AVAILABLE = False
     st.warning("📊 Plotly not installed. Radar chart will be skipped. Run: pip install plotly")
 
-from matching import match_resume_to_jd
-from resume_parser import extract_text
+import hashlib
+import io
+import os
+
+from chunking import chunked_match
+from matching import EMBEDDING_MODEL_NAME, SCORING_MODES, SECTIONS, extract_sections, score_sections
+from model_registry import get_embedding_model
+from pdf_extractor import ExtractionBudget, extract_text_isolated
+from score_store import ScoreStore, current_version
+from skill_gap import skill_gap
+
+# Uploads are streamed page by page and stop once every scored section has been read
+UPLOAD_BUDGET = ExtractionBudget(max_pages=30, max_chars=100_000, max_memory_mb=512, stop_sections=tuple(SECTIONS))
 
 st.set_page_config(page_title="Recruitly - AI Resume Matcher", layout="wide")
 
+@st.cache_resource(show_spinner="Loading embedding model...")
+def load_embedding_model():
+    """One warmed-up model per server process, shared by every session and script rerun."""
+    model = get_embedding_model(EMBEDDING_MODEL_NAME)
+    model.encode(["warm up"])
+    return model
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def extract_resume_text(file_hash: str, file_name: str, _file_bytes: bytes, full_text: bool = False):
+    """(text, stats) of the resume keyed by content hash (the leading underscore skips hashing the bytes)."""
+    buffer = io.BytesIO(_file_bytes)
+    buffer.name = file_name
+    # Chunked scoring reads the whole document, not just up to the scored sections
+    budget = UPLOAD_BUDGET._replace(stop_sections=()) if full_text else UPLOAD_BUDGET
+    # A child process, so a pathological page is killed at max_seconds instead of hanging the app
+    return extract_text_isolated(buffer, budget)
+
+@st.cache_resource
+def load_score_store():
+    """Shared score store when RECRUITLY_SCORE_DB is set, so results outlive the page."""
+    db_path = os.getenv("RECRUITLY_SCORE_DB")
+    return ScoreStore(db_path) if db_path else None
+
+def session_sections(state_key: str, text: str, context: str) -> dict:
+    """Extracted sections for `text`, recomputed only when the text changes."""
+    text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    entry = st.session_state.get(state_key)
+    if entry is None or entry["hash"] != text_hash:
+        entry = {"hash": text_hash, "sections": extract_sections(text, context)}
+        st.session_state[state_key] = entry
+    return entry
+
 # Custom CSS for better styling
 st.markdown("""
 <style>
@@ -46,6 +89,13 @@ with st.sidebar:
     - **30-44%**: Poor match
     - **0-29%**: Very poor match
     """)
+    st.header("⚙️ Scoring Mode")
+    scoring_mode = st.radio(
+        "Score the resume by",
+        SCORING_MODES,
+        format_func={"sections": "Extracted sections (fast)", "chunked": "Whole text in chunks (long resumes)"}.get,
+        help="Section extraction only reads the start of a long resume; chunked scoring covers all of it.",
+    )
 
 # Set defaults (no settings checkboxes)
 show_debug = False
@@ -77,110 +127,169 @@ if st.button("🚀 Analyze Match", type="primary", use_container_width=True):
         st.error("⚠️ Please upload a resume and paste a job description.")
     else:
         with st.spinner("🔍 Analyzing resume and job description..."):
-            # Extract text from resume
-            resume_text = extract_text(resume_file)
+            load_embedding_model()
+            
+            # Extract text from resume (cached by file content hash)
+            file_bytes = resume_file.getvalue()
+            resume_text, extraction_stats = extract_resume_text(
+                hashlib.sha256(file_bytes).hexdigest(), resume_file.name, file_bytes, scoring_mode == "chunked"
+            )
             
             if not resume_text.strip():
                 st.error("❌ Could not extract text from the resume. Please check the file format.")
                 st.stop()
+            if extraction_stats["truncated"] not in (None, "sections"):
+                st.warning(f"⚠️ Only part of the resume was read (limit reached: {extraction_stats['truncated']}).")
+            if len(job_description) > UPLOAD_BUDGET.max_chars:
+                job_description = job_description[:UPLOAD_BUDGET.max_chars]
+                st.warning(f"⚠️ The job description was cut to {UPLOAD_BUDGET.max_chars:,} characters.")
             
-            st.info("📋 Check your terminal/console for detailed debug information!")
+            # Only the side that changed is re-extracted
+            resume_entry = session_sections("resume_sections", resume_text, "resume")
+            jd_entry = session_sections("jd_sections", job_description, "job description")
             
             # Perform matching
-            total_score, section_scores = match_resume_to_jd(resume_text, job_description)
+            match_key = (resume_entry["hash"], jd_entry["hash"], scoring_mode)
+            cached_result = st.session_state.get("match_result")
+            if cached_result is None or cached_result["key"] != match_key:
+                if scoring_mode == "chunked":
+                    total_score, section_scores = chunked_match(resume_text, job_description)
+                else:
+                    total_score, section_scores = score_sections(resume_entry["sections"], jd_entry["sections"])
+                store = load_score_store()
+                if store is not None:
+                    store.put_resume(resume_file.name, resume_text)
+                    store.put_job(jd_entry["hash"][:12], job_description)
+                    store.record(resume_text, job_description, total_score, section_scores,
+                                 version=current_version(scoring_mode))
+                st.session_state["match_result"] = {
+                    "key": match_key,
+                    "total_score": total_score,
+                    "section_scores": section_scores,
+                    # Skill phrases go through the shared embedding cache, so this is cheap
+                    "skill_gap": skill_gap(resume_entry["sections"]["skills"], jd_entry["sections"]["skills"]),
+                    "resume_text": resume_text,
+                    "job_description": job_description,
+                }
 
-        # Display results
-        st.markdown("## 📊 Match Results")
-        
-        # Overall score with color coding
-        score_color = "#28a745" if total_score >= 75 else "#ffc107" if total_score >= 60 else "#dc3545"
-        
-        st.markdown(f"""
-        <div class="metric-card">
-            <h2 style="margin: 0; font-size: 3em; color: white;">{total_score:.1f}%</h2>
-            <h4 style="margin: 10px 0 0 0; color: white;">Overall Match Score</h4>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Interpretation
-        if total_score >= 85:
-            st.success("🎉 **Excellent Match!** This candidate appears to be very well-suited for this role.")
-        elif total_score >= 70:
-            st.success("✅ **Good Match!** This candidate has strong potential for this role.")
-        elif total_score >= 55:
-            st.warning("⚡ **Moderate Match.** Some alignment exists, but gaps may need to be addressed.")
-        elif total_score >= 40:
-            st.warning("⚠️ **Limited Match.** Significant skill or experience gaps present.")
-        else:
-            st.error("❌ **Poor Match.** Major misalignment between resume and job requirements.")
-
-        # Section-wise scores with visual bars
-        st.markdown("### 📋 Detailed Section Analysis")
-        
-        # Create columns for section scores
-        score_cols = st.columns(3)
-        
-        section_names = {"skills": "🛠️ Skills", "experience": "💼 Experience", "education": "🎓 Education"}
-        
-        for i, (section, score) in enumerate(section_scores.items()):
-            with score_cols[i]:
-                # Progress bar color based on score
-                bar_color = "#28a745" if score >= 70 else "#ffc107" if score >= 50 else "#dc3545"
-                
-                st.markdown(f"""
-                <div class="section-score">
-                    <h4 style="margin: 0 0 10px 0;">{section_names.get(section, section.title())}</h4>
-                    <div style="background: #e9ecef; border-radius: 10px; overflow: hidden;">
-                        <div style="background: {bar_color}; width: {score}%; height: 20px; border-radius: 10px; transition: width 0.3s;"></div>
-                    </div>
-                    <p style="margin: 10px 0 0 0; font-size: 1.2em; font-weight: bold;">{score:.1f}%</p>
-                </div>
-                """, unsafe_allow_html=True)
-
-        # Simple section scores summary (fallback if no plotly)
-        if not PLOTLY_AVAILABLE:
-            st.markdown("### 📊 Section Scores Summary")
-            for section, score in section_scores.items():
-                st.metric(label=section_names.get(section, section.title()), value=f"{score:.1f}%")
-
-        # Show extracted sections if requested
-        if show_extractions:
-            st.markdown("---")
-            st.markdown("## 📄 Raw Extracted Content")
-            
-            extract_cols = st.columns(2)
-            
-            with extract_cols[0]:
-                with st.expander("Resume Text"):
-                    st.text_area("Extracted Resume Content", value=resume_text, height=300, disabled=True)
+# Results stay on screen across reruns (any widget interaction) without recomputing
+result = st.session_state.get("match_result")
+if result is not None:
+    total_score = result["total_score"]
+    section_scores = result["section_scores"]
+    resume_text = result["resume_text"]
+    job_description = result["job_description"]
+    gap = result["skill_gap"]
+
+    # Display results
+    st.markdown("## 📊 Match Results")
+    
+    # Overall score with color coding
+    score_color = "#28a745" if total_score >= 75 else "#ffc107" if total_score >= 60 else "#dc3545"
+    
+    st.markdown(f"""
+    <div class="metric-card">
+        <h2 style="margin: 0; font-size: 3em; color: white;">{total_score:.1f}%</h2>
+        <h4 style="margin: 10px 0 0 0; color: white;">Overall Match Score</h4>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Interpretation
+    if total_score >= 85:
+        st.success("🎉 **Excellent Match!** This candidate appears to be very well-suited for this role.")
+    elif total_score >= 70:
+        st.success("✅ **Good Match!** This candidate has strong potential for this role.")
+    elif total_score >= 55:
+        st.warning("⚡ **Moderate Match.** Some alignment exists, but gaps may need to be addressed.")
+    elif total_score >= 40:
+        st.warning("⚠️ **Limited Match.** Significant skill or experience gaps present.")
+    else:
+        st.error("❌ **Poor Match.** Major misalignment between resume and job requirements.")
+
+    # Section-wise scores with visual bars
+    st.markdown("### 📋 Detailed Section Analysis")
+    
+    # Create columns for section scores
+    score_cols = st.columns(3)
+    
+    section_names = {"skills": "🛠️ Skills", "experience": "💼 Experience", "education": "🎓 Education"}
+    
+    for i, (section, score) in enumerate(section_scores.items()):
+        with score_cols[i]:
+            # Progress bar color based on score
+            bar_color = "#28a745" if score >= 70 else "#ffc107" if score >= 50 else "#dc3545"
             
-            with extract_cols[1]:
-                with st.expander("Job Description Text"):
-                    st.text_area("Job Description Content", value=job_description, height=300, disabled=True)
+            st.markdown(f"""
+            <div class="section-score">
+                <h4 style="margin: 0 0 10px 0;">{section_names.get(section, section.title())}</h4>
+                <div style="background: #e9ecef; border-radius: 10px; overflow: hidden;">
+                    <div style="background: {bar_color}; width: {score}%; height: 20px; border-radius: 10px; transition: width 0.3s;"></div>
+                </div>
+                <p style="margin: 10px 0 0 0; font-size: 1.2em; font-weight: bold;">{score:.1f}%</p>
+            </div>
+            """, unsafe_allow_html=True)
 
-        # Recommendations section
+    # Which of the job's skills the resume covers
+    if any(gap.values()):
+        st.markdown("### 🧩 Skill Gap")
+        gap_cols = st.columns(3)
+        gap_titles = {"matched": "✅ Matched", "partial": "🟡 Partial", "missing": "❌ Missing"}
+        for col, (status, title) in zip(gap_cols, gap_titles.items()):
+            with col:
+                st.markdown(f"**{title}** ({len(gap[status])})")
+                for item in gap[status]:
+                    if status == "matched" or item.closest is None:
+                        st.markdown(f"- {item.skill}")
+                    else:
+                        st.markdown(f"- {item.skill} — closest: *{item.closest}* ({item.score:.0f}%)")
+
+    # Simple section scores summary (fallback if no plotly)
+    if not PLOTLY_AVAILABLE:
+        st.markdown("### 📊 Section Scores Summary")
+        for section, score in section_scores.items():
+            st.metric(label=section_names.get(section, section.title()), value=f"{score:.1f}%")
+
+    # Show extracted sections if requested
+    if show_extractions:
         st.markdown("---")
-        st.markdown("## 💡 Recommendations")
-        
-        recommendations = []
-        
-        if section_scores.get("skills", 0) < 60:
-            recommendations.append("🛠️ **Skills Gap**: Consider highlighting more relevant technical skills or acquiring missing skills through training.")
+        st.markdown("## 📄 Raw Extracted Content")
         
-        if section_scores.get("experience", 0) < 60:
-            recommendations.append("💼 **Experience Gap**: Emphasize transferable experience or consider how current experience applies to this role.")
+        extract_cols = st.columns(2)
         
-        if section_scores.get("education", 0) < 60 and section_scores.get("education", 0) > 0:
-            recommendations.append("🎓 **Education**: Consider highlighting relevant coursework, certifications, or continuing education.")
+        with extract_cols[0]:
+            with st.expander("Resume Text"):
+                st.text_area("Extracted Resume Content", value=resume_text, height=300, disabled=True)
         
-        if total_score < 70:
-            recommendations.append("📝 **Resume Optimization**: Tailor your resume to better match the job requirements and use similar terminology.")
-        
-        if not recommendations:
-            recommendations.append("🎉 **Great Match!** Your profile aligns well with the job requirements.")
-        
-        for rec in recommendations:
-            st.markdown(f"- {rec}")
+        with extract_cols[1]:
+            with st.expander("Job Description Text"):
+                st.text_area("Job Description Content", value=job_description, height=300, disabled=True)
+
+    # Recommendations section
+    st.markdown("---")
+    st.markdown("## 💡 Recommendations")
+    
+    recommendations = []
+    
+    if gap["missing"]:
+        missing = ", ".join(item.skill for item in gap["missing"][:5])
+        recommendations.append(f"🛠️ **Skills Gap**: The job asks for {missing}, which the resume does not show. Add them if you have them, or consider training.")
+    elif section_scores.get("skills", 0) < 60:
+        recommendations.append("🛠️ **Skills Gap**: Consider highlighting more relevant technical skills or acquiring missing skills through training.")
+    
+    if section_scores.get("experience", 0) < 60:
+        recommendations.append("💼 **Experience Gap**: Emphasize transferable experience or consider how current experience applies to this role.")
+    
+    if section_scores.get("education", 0) < 60 and section_scores.get("education", 0) > 0:
+        recommendations.append("🎓 **Education**: Consider highlighting relevant coursework, certifications, or continuing education.")
+    
+    if total_score < 70:
+        recommendations.append("📝 **Resume Optimization**: Tailor your resume to better match the job requirements and use similar terminology.")
+    
+    if not recommendations:
+        recommendations.append("🎉 **Great Match!** Your profile aligns well with the job requirements.")
+    
+    for rec in recommendations:
+        st.markdown(f"- {rec}")
 
 # Footer
 st.markdown("---")
@@ -1,21 +1,113 @@
-# matching.py - Debug Version
+# matching.py
+import atexit
+import logging
 import os
-import re
-import requests
-from sentence_transformers import SentenceTransformer, util
 import numpy as np
-from typing import Dict, List, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+
+from embedding_cache import get_embedding_cache
+from extractors import (EXTRACTOR_NAMES, BatchedHTTPExtractor, PromptExtractor, RegexExtractor,
+                        SectionExtractor, Seq2SeqExtractor)
+from instrumentation import get_logger, metrics, stage, tracing
+from lexicon import get_lexicon
+from model_registry import get_embedding_model
+from section_cache import SectionCache
 
 # ===== CONFIG =====
-HF_API_URL = "https://api-inference.huggingface.co/models/google/flan-t5-large"
+# HF_API_URL can point at a local stand-in server for offline testing
+HF_API_URL = os.getenv("HF_API_URL", "https://api-inference.huggingface.co/models/google/flan-t5-large")
 HF_HEADERS = {"Authorization": f"Bearer {os.getenv('HF_API_TOKEN')}"}
 
-# Load local embedding model
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+# Local embedding model, loaded on first use through the shared registry
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Repeat texts (the same JD, the same extracted skills) are only encoded once
+embedding_cache = get_embedding_cache(EMBEDDING_MODEL_NAME)
+
+SECTIONS = ["skills", "experience", "education"]
+
+# Bump when scale_similarity or the overall-score rules change, so stored scores are redone
+SCORING_VERSION = "2"
+
+# "sections" scores the extracted sections (extraction prompts see the first
+# extractors.PROMPT_CHAR_LIMIT characters); "chunked" scores the whole text (chunking.py)
+SCORING_MODES = ("sections", "chunked")
+
+# Debug output is off by default; set RECRUITLY_LOG_LEVEL=DEBUG to see each step
+logger = get_logger("matching")
+
+def __getattr__(name):
+    # Keep `matching.embedding_model` working without loading the model at import time
+    if name == "embedding_model":
+        return get_embedding_model(EMBEDDING_MODEL_NAME)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+_http_session = None
+
+def _get_http_session():
+    """One pooled keep-alive session for every synchronous API call."""
+    global _http_session
+    if _http_session is None:
+        import requests  # deferred: only the API path needs it
+        _http_session = requests.Session()
+    return _http_session
+
+_async_clients: Dict[str, "AsyncLLMClient"] = {}
+
+def get_async_client() -> "AsyncLLMClient":
+    """Shared async client for the current HF_API_URL, configured from the environment."""
+    from llm_client import AsyncLLMClient
+    
+    client = _async_clients.get(HF_API_URL)
+    if client is None:
+        rate = os.getenv("RECRUITLY_LLM_RATE")
+        client = _async_clients[HF_API_URL] = AsyncLLMClient(
+            HF_API_URL,
+            HF_HEADERS,
+            concurrency=int(os.getenv("RECRUITLY_LLM_CONCURRENCY", "6")),
+            rate_per_second=float(rate) if rate else None,
+            max_retries=int(os.getenv("RECRUITLY_LLM_RETRIES", "3")),
+            deadline=float(os.getenv("RECRUITLY_LLM_DEADLINE", "60")),
+        )
+    return client
+
+def close_async_clients() -> None:
+    """Close the pooled sessions of every async client (also runs at interpreter exit)."""
+    if not _async_clients:
+        return
+    from llm_client import run_sync
+    
+    for client in _async_clients.values():
+        run_sync(client.close())
+    _async_clients.clear()
+
+atexit.register(close_async_clients)
+
+def call_llm_many(prompts: List[str]) -> List[str]:
+    """Send several prompts concurrently; falls back to serial call_llm without aiohttp."""
+    try:
+        import aiohttp  # noqa: F401
+    except ImportError:
+        return [call_llm(prompt) for prompt in prompts]
+    
+    from llm_client import run_sync
+    
+    logger.debug("Sending %d LLM prompts concurrently", len(prompts))
+    with stage("llm_call"):
+        results = run_sync(get_async_client().generate_many(prompts))
+    metrics.inc("llm_requests", len(prompts))
+    failed = sum(1 for r in results if not r)
+    if failed:
+        metrics.inc("llm_failures", failed)
+    logger.debug("%d/%d prompts returned text", len(results) - failed, len(results))
+    return results
 
 def call_llm(prompt):
-    """Call Hugging Face API for LLM extraction with debug output."""
-    print(f"🤖 LLM Prompt: {prompt[:200]}...")
+    """Call Hugging Face API for LLM extraction; returns "" on any failure."""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("LLM prompt: %s...", prompt[:200])
+    metrics.inc("llm_requests")
     
     payload = {
         "inputs": prompt, 
@@ -27,199 +119,452 @@ def call_llm(prompt):
     }
     
     try:
-        response = requests.post(HF_API_URL, headers=HF_HEADERS, json=payload, timeout=60)
-        print(f"📡 API Response Status: {response.status_code}")
-        
-        response.raise_for_status()
-        data = response.json()
-        print(f"📄 Raw API Response: {data}")
+        with stage("llm_call"):
+            response = _get_http_session().post(HF_API_URL, headers=HF_HEADERS, json=payload, timeout=60)
+            logger.debug("API response status: %s", response.status_code)
+            response.raise_for_status()
+            data = response.json()
         
         if isinstance(data, list) and len(data) > 0 and "generated_text" in data[0]:
             result = data[0]["generated_text"].strip()
-            print(f"✅ Extracted Text: '{result}'")
+            logger.debug("Extracted text: %r", result)
             return result
         elif isinstance(data, dict) and "error" in data:
-            print(f"❌ API Error: {data['error']}")
-            return ""
+            logger.warning("LLM API error: %s", data["error"])
         else:
-            print(f"❌ Unexpected response format: {data}")
-            return ""
+            logger.warning("Unexpected LLM response format: %.200s", data)
             
     except Exception as e:
-        print(f"❌ LLM API Error: {e}")
-        return ""
+        logger.warning("LLM API error: %s", e)
+    metrics.inc("llm_failures")
+    return ""
+
+@lru_cache(maxsize=32)
+def _lexicon_hits(text: str) -> Dict[str, List[str]]:
+    # Each section asks in turn; the document is scanned once for all of them
+    return get_lexicon().find_all(text)
+
+def _unique(items: List[str]) -> List[str]:
+    return list(dict.fromkeys(items))
 
 def simple_extraction_fallback(text, section):
-    """Fallback extraction if LLM fails."""
-    print(f"🔄 Using fallback extraction for {section}")
+    """Fallback extraction if LLM fails: whole-word lexicon hits (see lexicon.json)."""
+    if section not in ("skills", "experience", "education"):
+        return text[:200] + "..." if len(text) > 200 else text
     
-    text_lower = text.lower()
+    with stage("fallback"):
+        found = _lexicon_hits(text)[section]
     
     if section == "skills":
-        # Look for common skill indicators
-        skill_patterns = [
-            r'python|java|javascript|react|angular|vue|node|django|flask|spring',
-            r'sql|mysql|postgresql|mongodb|oracle|database',
-            r'aws|azure|gcp|cloud|kubernetes|docker',
-            r'machine learning|ml|ai|data science|analytics',
-            r'git|github|version control|agile|scrum'
-        ]
-        found_skills = []
-        for pattern in skill_patterns:
-            matches = re.findall(pattern, text_lower)
-            found_skills.extend(matches)
-        return ", ".join(set(found_skills)) if found_skills else ""
-    
+        return ", ".join(_unique(found))
     elif section == "experience":
-        # Look for experience indicators
-        exp_patterns = [
-            r'\d+\+?\s*(years?|yrs?)\s*of\s*experience',
-            r'worked\s+as|experience\s+as|role\s+as',
-            r'developed|built|created|implemented|managed|led'
-        ]
-        found_exp = []
-        for pattern in exp_patterns:
-            matches = re.findall(pattern, text_lower)
-            found_exp.extend(matches)
-        return "; ".join(found_exp[:3]) if found_exp else ""
-    
-    elif section == "education":
-        # Look for education indicators
-        edu_patterns = [
-            r'bachelor|master|phd|degree|university|college',
-            r'computer science|engineering|mathematics|statistics',
-            r'certification|certified|certificate'
-        ]
-        found_edu = []
-        for pattern in edu_patterns:
-            matches = re.findall(pattern, text_lower)
-            found_edu.extend(matches)
-        return "; ".join(set(found_edu)) if found_edu else ""
-    
-    return text[:200] + "..." if len(text) > 200 else text
+        return "; ".join(found[:3])
+    else:
+        return "; ".join(_unique(found))
+
+# Extracted sections are memoized per (text hash, section, context, extractor version)
+section_cache = SectionCache(
+    max_entries=int(os.getenv("RECRUITLY_SECTION_CACHE_SIZE", "10000")),
+    db_path=os.getenv("RECRUITLY_SECTION_CACHE_DB"),
+)
+
+# Cache hit rates are exported next to the counters and stage timers
+metrics.register_collector("section_cache", section_cache.stats)
+metrics.register_collector("embedding_cache", embedding_cache.stats)
+
+def extractor_version(extractor: SectionExtractor) -> str:
+    # Every backend can fall back to the lexicon, so its contents are part of the version
+    return f"{extractor.name}:{extractor.version}:{get_lexicon().fingerprint}"
+
+_extractor: Optional[SectionExtractor] = None
+_extractor_cache: Dict[str, SectionExtractor] = {}
+
+def make_extractor(name: str) -> SectionExtractor:
+    """Build a section extractor backend by name (see extractors.EXTRACTOR_NAMES)."""
+    if name == "hf":
+        return PromptExtractor(call_llm, simple_extraction_fallback, call_llm_many=call_llm_many, model=HF_API_URL)
+    if name == "hf-batch":
+        return BatchedHTTPExtractor(HF_API_URL, HF_HEADERS, simple_extraction_fallback, get_session=_get_http_session)
+    if name == "local":
+        return Seq2SeqExtractor(simple_extraction_fallback,
+                                model_name=os.getenv("RECRUITLY_LOCAL_EXTRACTOR_MODEL", "google/flan-t5-small"))
+    if name == "regex":
+        return RegexExtractor(simple_extraction_fallback)
+    raise ValueError(f"Unknown extractor {name!r}; expected one of {EXTRACTOR_NAMES}")
+
+def set_extractor(extractor: Union[str, SectionExtractor, None]) -> None:
+    """Pin the extractor backend for this process (None restores the default choice)."""
+    global _extractor
+    _extractor = make_extractor(extractor) if isinstance(extractor, str) else extractor
+
+def get_extractor() -> SectionExtractor:
+    """
+    The pinned extractor, else RECRUITLY_EXTRACTOR, else the original behavior:
+    the per-prompt API backend when HF_API_TOKEN is set and regex otherwise.
+    """
+    if _extractor is not None:
+        return _extractor
+    name = os.getenv("RECRUITLY_EXTRACTOR") or ("hf" if os.getenv("HF_API_TOKEN") else "regex")
+    if name not in _extractor_cache:
+        _extractor_cache[name] = make_extractor(name)
+    return _extractor_cache[name]
+
+_scoring_mode: Optional[str] = None
+
+def set_scoring_mode(mode: Optional[str]) -> None:
+    """Pin the scoring mode for this process (None restores RECRUITLY_SCORING_MODE)."""
+    global _scoring_mode
+    if mode is not None and mode not in SCORING_MODES:
+        raise ValueError(f"Unknown scoring mode {mode!r}; expected one of {SCORING_MODES}")
+    _scoring_mode = mode
+
+def get_scoring_mode() -> str:
+    """The pinned scoring mode, else RECRUITLY_SCORING_MODE, else "sections"."""
+    mode = _scoring_mode or os.getenv("RECRUITLY_SCORING_MODE") or "sections"
+    if mode not in SCORING_MODES:
+        raise ValueError(f"Unknown scoring mode {mode!r}; expected one of {SCORING_MODES}")
+    return mode
 
 def extract_with_structured_prompt(text: str, section: str, context: str) -> str:
     """Extract with LLM or fallback to simple extraction."""
-    print(f"\n🔍 Extracting {section} from {context}")
-    print(f"📝 Input text length: {len(text)} characters")
+    logger.debug("Extracting %s from %s (%d characters)", section, context, len(text))
     
     if not text or len(text.strip()) < 10:
-        print("❌ Text too short or empty")
+        logger.debug("Text too short or empty")
         return ""
     
-    # Check if HF_API_TOKEN is set
-    api_token = os.getenv('HF_API_TOKEN')
-    if not api_token:
-        print("⚠️ HF_API_TOKEN not found, using fallback extraction")
-        return simple_extraction_fallback(text, section)
-    
-    # Simple prompts that work better with Flan-T5
-    simple_prompts = {
-        "skills": f"What technical skills are mentioned in this {context}?\n\n{text[:1000]}\n\nSkills:",
-        "experience": f"What work experience is described in this {context}?\n\n{text[:1000]}\n\nExperience:",
-        "education": f"What education or qualifications are mentioned in this {context}?\n\n{text[:1000]}\n\nEducation:",
-        "general": f"Summarize the key qualifications from this {context}:\n\n{text[:1000]}\n\nSummary:"
-    }
+    extractor = get_extractor()
+    key = section_cache.key(text, section, context, extractor_version(extractor))
+    result = section_cache.get(key)
+    if result is not None:
+        logger.debug("Cached %s for this %s", section, context)
+        return result
+    
+    with stage("extraction"):
+        result = extractor.extract(text, section, context)
+    section_cache.put(key, result)
+    
+    logger.debug("Extracted %s with %s: %r", section, extractor.name, result)
+    return result
+
+def extract_sections_many(documents: List[Tuple[str, str]]) -> List[Dict[str, str]]:
+    """
+    Extract every scored section from many (text, context) documents at once.
+    Batching backends turn this into one round trip (or none) for the whole list.
+    """
+    logger.debug("Extracting %d sections from %d documents", len(SECTIONS), len(documents))
+    extractor = get_extractor()
+    version = extractor_version(extractor)
     
-    prompt = simple_prompts.get(section, simple_prompts["general"])
-    result = call_llm(prompt)
+    results: List[Dict[str, str]] = []
+    pending: Dict[Tuple[str, str], List[int]] = {}
+    for i, (text, context) in enumerate(documents):
+        keys = [section_cache.key(text, section, context, version) for section in SECTIONS]
+        cached = [section_cache.get(key) for key in keys]
+        if all(value is not None for value in cached):
+            results.append(dict(zip(SECTIONS, cached)))
+        else:
+            results.append({})
+            # The same document twice in one batch is extracted once
+            pending.setdefault((text, context), []).append(i)
     
-    # If LLM fails or returns empty, use fallback
-    if not result or len(result.strip()) < 3:
-        print("🔄 LLM extraction failed, using fallback")
-        result = simple_extraction_fallback(text, section)
+    if pending:
+        logger.debug("Extractor backend: %s (%d uncached documents)", extractor.name, len(pending))
+        with stage("extraction"):
+            fresh = extractor.extract_batch(list(pending), SECTIONS)
+        to_store = {}
+        for (text, context), sections in zip(pending, fresh):
+            for section in SECTIONS:
+                to_store[section_cache.key(text, section, context, version)] = sections[section]
+            for i in pending[(text, context)]:
+                results[i] = dict(sections)
+        section_cache.put_many(to_store)
+    return results
+
+def scale_similarity(similarity: np.ndarray) -> np.ndarray:
+    """Convert raw cosine similarities to percentages with realistic scaling.
+
+    Works element-wise so single pairs and whole score matrices share the same rules.
+    """
+    # Convert to percentage
+    percentage = similarity * 100
     
-    print(f"✅ Final extracted {section}: '{result}'")
-    return result.strip()
+    # Apply some scaling to make scores more realistic
+    percentage = np.where(percentage > 90, np.minimum(95, percentage * 0.9), percentage)  # Cap high scores
+    percentage = np.where(percentage < 10, np.maximum(5, percentage * 1.2), percentage)   # Boost very low scores slightly
+    return percentage
+
+def round_scores(scores) -> np.ndarray:
+    """Round percentages to one decimal. Every scoring path rounds through here, so the
+    batched paths return exactly what match_resume_to_jd does for the same pair."""
+    return np.round(np.asarray(scores, dtype=np.float64), 1)
 
 def calculate_simple_similarity(text1: str, text2: str) -> float:
-    """Simplified similarity calculation with debug output."""
-    print(f"\n📊 Calculating similarity:")
-    print(f"   Text1: '{text1[:100]}...'")
-    print(f"   Text2: '{text2[:100]}...'")
+    """Cosine similarity of two texts as a scaled percentage."""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Calculating similarity of %r... and %r...", text1[:100], text2[:100])
     
     if not text1 or not text2:
-        print("❌ One or both texts are empty - returning 0.0")
+        logger.debug("One or both texts are empty - returning 0.0")
         return 0.0
     
     if text1.strip() == text2.strip():
-        print("✅ Texts are identical - returning 100.0")
+        logger.debug("Texts are identical - returning 100.0")
         return 100.0
     
     try:
-        # Use sentence transformers for similarity
-        emb1 = embedding_model.encode(text1, convert_to_tensor=True)
-        emb2 = embedding_model.encode(text2, convert_to_tensor=True)
-        similarity = float(util.cos_sim(emb1, emb2).item())
+        # Use sentence transformers for similarity (through the embedding cache)
+        emb1, emb2 = embedding_cache.encode(get_embedding_model(EMBEDDING_MODEL_NAME), [text1, text2], normalize=True)
+        with stage("cosine"):
+            # float64 like the batched paths, whose float32 kernels round differently
+            similarity = float(emb1.astype(np.float64) @ emb2.astype(np.float64))
         
-        print(f"🎯 Raw cosine similarity: {similarity}")
-        
-        # Convert to percentage with realistic scaling
-        percentage = similarity * 100
-        
-        # Apply some scaling to make scores more realistic
-        if percentage > 90:
-            percentage = min(95, percentage * 0.9)  # Cap high scores
-        elif percentage < 10:
-            percentage = max(5, percentage * 1.2)   # Boost very low scores slightly
+        with stage("scaling"):
+            percentage = float(round_scores(scale_similarity(np.asarray(similarity))))
             
-        print(f"📈 Final similarity score: {percentage:.1f}%")
-        return round(percentage, 1)
+        logger.debug("Raw cosine similarity %.4f -> %.1f%%", similarity, percentage)
+        return percentage
         
     except Exception as e:
-        print(f"❌ Similarity calculation error: {e}")
+        logger.warning("Similarity calculation error: %s", e)
         return 0.0
 
-def match_resume_to_jd(resume_text: str, jd_text: str) -> Tuple[float, Dict[str, float]]:
-    """Generate match scores with extensive debugging."""
-    
-    print("\n" + "="*50)
-    print("🚀 STARTING RESUME MATCHING PROCESS")
-    print("="*50)
-    
-    print(f"📄 Resume text length: {len(resume_text)}")
-    print(f"💼 Job description length: {len(jd_text)}")
-    print(f"📄 Resume preview: {resume_text[:200]}...")
-    print(f"💼 JD preview: {jd_text[:200]}...")
-    
-    if not resume_text or not jd_text:
-        print("❌ Empty input texts")
-        return 0.0, {"skills": 0.0, "experience": 0.0, "education": 0.0}
+def match_resume_to_jd(resume_text: str, jd_text: str, return_trace: bool = False):
+    """Generate match scores: ``(overall, section_scores)``.
+
+    With ``return_trace=True`` a third item is returned: a dict of per-stage timings
+    and events (fallbacks, LLM failures) for this request only. In the "chunked"
+    scoring mode (see get_scoring_mode) the whole texts are scored by chunking.py.
+    """
+    with tracing() as trace:
+        metrics.inc("matches")
+        logger.debug("Matching resume (%d chars) to job description (%d chars)", len(resume_text), len(jd_text))
+        
+        if not resume_text or not jd_text:
+            logger.debug("Empty input texts")
+            result = 0.0, {"skills": 0.0, "experience": 0.0, "education": 0.0}
+        elif get_scoring_mode() == "chunked":
+            from chunking import chunked_match
+            result = chunked_match(resume_text, jd_text)
+        else:
+            # Extract every section of both documents in one batch (one round trip for batching backends)
+            resume_sections, jd_sections = extract_sections_many([(resume_text, "resume"), (jd_text, "job description")])
+            result = score_sections(resume_sections, jd_sections)
     
-    # Extract sections with debugging
+    if return_trace:
+        return result + (trace.to_dict(),)
+    return result
+
+def score_sections(resume_sections: Dict[str, str], jd_sections: Dict[str, str]) -> Tuple[float, Dict[str, float]]:
+    """
+    Score already-extracted sections. Callers that keep one side's sections around
+    (e.g. the Streamlit app) only need to re-extract the side that changed.
+    """
     section_scores = {}
-    sections = ["skills", "experience", "education"]
     
-    all_scores = []
-    
-    for section in sections:
-        print(f"\n{'='*30}")
-        print(f"🔍 ANALYZING {section.upper()}")
-        print(f"{'='*30}")
-        
-        # Extract from both resume and JD
-        resume_section = extract_with_structured_prompt(resume_text, section, "resume")
-        jd_section = extract_with_structured_prompt(jd_text, section, "job description")
+    for section in SECTIONS:
+        resume_section = resume_sections.get(section, "")
+        jd_section = jd_sections.get(section, "")
         
         # Calculate similarity
         similarity = calculate_simple_similarity(resume_section, jd_section)
         section_scores[section] = similarity
         
-        if similarity > 0:
-            all_scores.append(similarity)
+        logger.debug("%s score: %s%%", section, similarity)
+    
+    # Same averaging as the batched paths
+    overall_score = float(overall_from_sections(np.array([[section_scores[section]] for section in SECTIONS]))[0])
+    
+    logger.debug("Overall score %.1f%%, section scores %s", overall_score, section_scores)
+    
+    return overall_score, section_scores
+
+def match_many(pairs: List[Tuple[str, str]], batch_size: int = 64) -> List[Tuple[float, Dict[str, float]]]:
+    """Score many independent (resume_text, jd_text) pairs, like match_resume_to_jd on each.
+
+    Every document goes to the extractor in one batch and each section needs one encode
+    call for all pairs, so concurrent requests can be served together (see server.py).
+    """
+    metrics.inc("matches", len(pairs))
+    if get_scoring_mode() == "chunked":
+        from chunking import chunked_match_many
+        return chunked_match_many([(resume_text or "", jd_text or "") for resume_text, jd_text in pairs],
+                                  batch_size=batch_size)
+    section_scores = np.zeros((len(SECTIONS), len(pairs)), dtype=np.float64)
+    valid = [i for i, (resume_text, jd_text) in enumerate(pairs) if resume_text and jd_text]
+    
+    if valid:
+        documents = []
+        for i in valid:
+            documents += [(pairs[i][0], "resume"), (pairs[i][1], "job description")]
+        extracted = extract_sections_many(documents)
         
-        print(f"🎯 {section.capitalize()} final score: {similarity}%")
+        for s, section in enumerate(SECTIONS):
+            rows, resume_side, jd_side = [], [], []
+            for n, i in enumerate(valid):
+                resume_section = extracted[2 * n].get(section, "")
+                jd_section = extracted[2 * n + 1].get(section, "")
+                if not resume_section or not jd_section:
+                    continue
+                if resume_section.strip() == jd_section.strip():
+                    section_scores[s, i] = 100.0
+                    continue
+                rows.append(i)
+                resume_side.append(resume_section)
+                jd_side.append(jd_section)
+            if not rows:
+                continue
+            
+            embeddings = embedding_cache.encode(
+                get_embedding_model(EMBEDDING_MODEL_NAME), resume_side + jd_side,
+                batch_size=batch_size, normalize=True,
+            )
+            embeddings = embeddings.astype(np.float64)
+            with stage("cosine"):
+                similarities = np.einsum("ij,ij->i", embeddings[:len(rows)], embeddings[len(rows):])
+            with stage("scaling"):
+                section_scores[s, rows] = round_scores(scale_similarity(similarities))
     
-    # Calculate overall score
-    if all_scores:
-        overall_score = sum(all_scores) / len(all_scores)
+    overall = overall_from_sections(section_scores)
+    return [
+        (float(overall[i]), {section: float(section_scores[s, i]) for s, section in enumerate(SECTIONS)})
+        for i in range(len(pairs))
+    ]
+
+def extract_sections(text: str, context: str) -> Dict[str, str]:
+    """Extract every scored section from one document."""
+    return extract_sections_many([(text, context)])[0]
+
+def overall_from_sections(section_scores: np.ndarray) -> np.ndarray:
+    """Average of the non-zero section scores along axis 0, rounded by round_scores.
+
+    The one averaging rule of every path, match_resume_to_jd included.
+    """
+    counts = (section_scores > 0).sum(axis=0)
+    totals = section_scores.sum(axis=0)
+    return round_scores(np.where(counts > 0, totals / np.maximum(counts, 1), 0.0))
+
+def rank_resumes(jd_text: str,
+                 resumes: Union[Dict[str, str], List[str]],
+                 top_k: Optional[int] = 10,
+                 batch_size: int = 64,
+                 prefilter_top_n: Optional[int] = None,
+                 lexical_index=None,
+                 dedup=None) -> List[Dict]:
+    """Score many resumes against one job description and return a top-k leaderboard.
+
+    The JD sections are extracted and embedded once. For each section, every resume
+    text is encoded in a single batched ``encode`` call and all cosine similarities
+    come from one matrix product, so the cost per extra resume is one batch row.
+
+    ``resumes`` is either a ``{resume_id: text}`` dict or a list of texts (ids are
+    list positions). Each entry of the result looks like
+    ``{"resume_id": ..., "overall": 72.4, "sections": {"skills": ..., ...}}``,
+    sorted by overall score. ``top_k=None`` returns every resume.
+
+    With ``prefilter_top_n`` only the resumes with the best BM25 keyword score against
+    the JD (see lexical_index.py, optionally using a persistent ``lexical_index``) are
+    extracted and embedded; the others are left out of the leaderboard.
+
+    With ``dedup=True`` (or a persistent ``dedup.DedupIndex``) exact and near-duplicate
+    resumes are scored once: a duplicate's entry copies the scores of the first resume
+    of its group and names it in ``"duplicate_of"``.
+
+    In the "chunked" scoring mode (see get_scoring_mode) every resume is scored over its
+    whole text by chunking.chunked_match_many instead of over extracted sections.
+    """
+    if isinstance(resumes, dict):
+        resume_ids, resume_texts = list(resumes.keys()), list(resumes.values())
     else:
-        overall_score = 0.0
+        resume_texts = list(resumes)
+        resume_ids = list(range(len(resume_texts)))
+
+    duplicates: Dict = {}
+    if dedup:
+        from dedup import collapse_duplicates
+
+        unique, duplicates = collapse_duplicates(dict(zip(resume_ids, resume_texts)),
+                                                 None if dedup is True else dedup)
+        resume_ids, resume_texts = list(unique.keys()), list(unique.values())
+
+    if prefilter_top_n is not None and len(resume_texts) > prefilter_top_n:
+        from lexical_index import lexical_prefilter
+
+        kept = lexical_prefilter(jd_text, dict(zip(resume_ids, resume_texts)), prefilter_top_n, lexical_index)
+        resume_ids, resume_texts = list(kept.keys()), list(kept.values())
+    
+    n = len(resume_texts)
+    logger.debug("Ranking %d resumes against one job description", n)
+    if n == 0:
+        return []
     
-    print(f"\n🏆 FINAL OVERALL SCORE: {overall_score:.1f}%")
-    print(f"📊 SECTION SCORES: {section_scores}")
+    section_scores = np.zeros((len(SECTIONS), n), dtype=np.float64)
+    
+    if get_scoring_mode() == "chunked":
+        from chunking import chunked_match_many
+        # Every chunk of the JD and of every resume goes through one encode call
+        chunked = chunked_match_many([(text or "", jd_text or "") for text in resume_texts], batch_size=batch_size)
+        for i, (_, scores) in enumerate(chunked):
+            section_scores[:, i] = [scores[section] for section in SECTIONS]
+    elif jd_text and jd_text.strip():
+        # The JD and every resume go to the extractor as one batch
+        jd_sections, *resume_sections = extract_sections_many(
+            [(jd_text, "job description")] + [(text or "", "resume") for text in resume_texts]
+        )
+        
+        for s, section in enumerate(SECTIONS):
+            jd_section = jd_sections[section].strip()
+            if not jd_section:
+                continue
+            
+            texts = [sections.get(section, "").strip() for sections in resume_sections]
+            rows = [i for i, text in enumerate(texts) if text]
+            if not rows:
+                continue
+            
+            # One encode call per section (cache misses only): the JD text rides along as row 0
+            embeddings = embedding_cache.encode(
+                get_embedding_model(EMBEDDING_MODEL_NAME),
+                [jd_section] + [texts[i] for i in rows],
+                batch_size=batch_size,
+                normalize=True,
+            )
+            embeddings = embeddings.astype(np.float64)
+            with stage("cosine"):
+                similarities = embeddings[1:] @ embeddings[0]
+            with stage("scaling"):
+                scores = round_scores(scale_similarity(similarities))
+            
+            # Keep the exact-match shortcut from calculate_simple_similarity
+            identical = np.array([texts[i] == jd_section for i in rows])
+            section_scores[s, rows] = np.where(identical, 100.0, scores)
+    
+    overall = overall_from_sections(section_scores)
+    
+    # Duplicates reuse the canonical resume's column (and sort right after it)
+    row_of = {resume_id: i for i, resume_id in enumerate(resume_ids)}
+    copies = [(resume_id, row_of[canonical]) for resume_id, canonical in duplicates.items() if canonical in row_of]
+    columns = np.array(list(range(n)) + [row for _, row in copies], dtype=np.int64)
+    entry_ids = resume_ids + [resume_id for resume_id, _ in copies]
+    
+    order = np.argsort(-overall[columns], kind="stable")
+    if top_k is not None:
+        order = order[:top_k]
+    
+    leaderboard = []
+    for i in order:
+        column = columns[i]
+        entry = {
+            "resume_id": entry_ids[i],
+            "overall": float(overall[column]),
+            "sections": {section: float(section_scores[s, column]) for s, section in enumerate(SECTIONS)},
+        }
+        if i >= n:
+            entry["duplicate_of"] = resume_ids[column]
+        leaderboard.append(entry)
     
-    return round(overall_score, 1), section_scores
+    logger.debug("Top score: %s%%", leaderboard[0]["overall"] if leaderboard else 0.0)
+    return leaderboard
 
 # Test function
 def test_basic_functionality():
@@ -229,8 +574,9 @@ def test_basic_functionality():
     test_resume = "Python developer with 3 years experience in Django, Flask, machine learning, and data analysis. Bachelor's degree in Computer Science."
     test_jd = "Looking for Python developer with Flask experience, ML skills, and computer science background."
     
-    score, sections = match_resume_to_jd(test_resume, test_jd)
+    score, sections, trace = match_resume_to_jd(test_resume, test_jd, return_trace=True)
     print(f"Test result - Overall: {score}%, Sections: {sections}")
+    print(f"Stage timings: {trace['stage_seconds']}")
 
 if __name__ == "__main__":
     test_basic_functionality()
\ No newline at end of file
@@ -0,0 +1,58 @@
+# model_registry.py
+"""
+Process-wide registry of embedding models.
+
+Models are loaded lazily on first use, once per process, and shared by every module
+(matching, resume_parser, ...). Importing this module does not import
+sentence_transformers or torch.
+
+``RECRUITLY_EMBEDDING_BACKEND`` picks the inference backend (see embedding_backends:
+torch, torch-int8, onnx, onnx-int8) and ``RECRUITLY_EMBEDDING_THREADS`` its thread count.
+"""
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+_models: Dict[Tuple[str, str], object] = {}
+_lock = threading.Lock()
+
+
+def get_backend(backend: Optional[str] = None) -> str:
+    """The requested backend, else RECRUITLY_EMBEDDING_BACKEND, else torch."""
+    return backend or os.getenv("RECRUITLY_EMBEDDING_BACKEND") or "torch"
+
+
+def get_embedding_model(name: str = DEFAULT_EMBEDDING_MODEL, backend: Optional[str] = None):
+    """Return the shared embedding model for ``name`` on ``backend``, loading it on first call."""
+    key = (name, get_backend(backend))
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                from embedding_backends import load_embedding_model
+                threads = os.getenv("RECRUITLY_EMBEDDING_THREADS")
+                model = _models[key] = load_embedding_model(name, key[1], int(threads) if threads else None)
+    return model
+
+
+def is_loaded(name: str = DEFAULT_EMBEDDING_MODEL, backend: Optional[str] = None) -> bool:
+    return (name, get_backend(backend)) in _models
+
+
+def warm_up(name: str = DEFAULT_EMBEDDING_MODEL, background: bool = False) -> Optional[threading.Thread]:
+    """Load the model and run one tiny encode so the first real request is fast.
+
+    With ``background=True`` the work happens on a daemon thread, which is returned.
+    """
+    def _run():
+        get_embedding_model(name).encode(["warm up"], convert_to_numpy=True)
+
+    if background:
+        thread = threading.Thread(target=_run, name=f"warm-up-{name}", daemon=True)
+        thread.start()
+        return thread
+    _run()
+    return None
@@ -1,26 +1,40 @@
 # modules/pdf_extractor.py
+import io
+import multiprocessing
+import os
+import signal
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from xml.etree import ElementTree
 import pdfplumber
 from docx import Document
-from typing import Union, IO
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union, IO
 
-def extract_text_from_pdf_path(path: str) -> str:
-    text = ""
-    with pdfplumber.open(path) as pdf:
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".doc", ".txt")
+
+def _extract_pdf_pages(source: Union[str, IO]) -> List[str]:
+    """Text of every non-empty page, in order."""
+    pages = []
+    with pdfplumber.open(source) as pdf:
         for page in pdf.pages:
             page_text = page.extract_text()
             if page_text:
-                text += page_text + "\n"
-    return text
+                pages.append(page_text)
+    return pages
+
+def _join_pages(pages: List[str]) -> str:
+    # Joined once instead of growing a string page by page
+    return "".join(page + "\n" for page in pages)
+
+def extract_text_from_pdf_path(path: str) -> str:
+    return _join_pages(_extract_pdf_pages(path))
 
 def extract_text_from_pdf_filelike(f: IO) -> str:
     """Accepts a file-like object (e.g. Streamlit uploaded file / BytesIO)."""
-    text = ""
     # pdfplumber can open file-like objects
-    with pdfplumber.open(f) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
+    text = _join_pages(_extract_pdf_pages(f))
     try:
         f.seek(0)
     except Exception:
@@ -71,3 +85,460 @@ def extract_text(input: Union[str, IO]) -> str:
             except Exception:
                 pass
             return text
+
+# ===== BOUNDED STREAMING EXTRACTION =====
+
+class ExtractionBudget(NamedTuple):
+    """
+    Limits for iter_text_parts. ``max_bytes`` caps the input file (PDF/DOCX above it are
+    refused, TXT is read up to it), ``max_uncompressed_bytes`` caps the XML inflated from
+    a DOCX (zip bombs), and ``stop_sections`` ends extraction once each listed section
+    is complete (followed by another header) or has ``section_chars`` characters.
+
+    iter_text_parts checks ``max_seconds`` between parts only; extract_text_isolated
+    also enforces it inside one slow page, and caps memory growth at ``max_memory_mb``.
+    """
+    max_pages: int = 50
+    max_chars: int = 200_000
+    max_bytes: int = 20 * 1024 * 1024
+    max_uncompressed_bytes: int = 50 * 1024 * 1024
+    max_seconds: float = 30.0
+    stop_sections: Tuple[str, ...] = ()
+    section_chars: int = 4000
+    max_memory_mb: Optional[int] = None
+
+DEFAULT_BUDGET = ExtractionBudget()
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_TEXT_CHUNK = 64 * 1024
+# Re-run the section parser only after this many new characters
+_SECTION_CHECK_CHARS = 2000
+
+class _BudgetExceeded(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+class _LimitedReader(io.RawIOBase):
+    """
+    Reads at most ``limit`` bytes of ``raw``, counting them in ``stats[key]``. Past the
+    limit a strict reader raises; otherwise it reports end of file and sets ``exceeded``.
+    The wrapped stream is never closed.
+    """
+
+    def __init__(self, raw: IO, limit: int, stats: Dict, key: str, strict: bool):
+        self.raw = raw
+        self.limit = limit
+        self.stats = stats
+        self.key = key
+        self.strict = strict
+        self.exceeded = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        remaining = self.limit - self.stats[self.key]
+        if remaining <= 0:
+            if self.raw.read(1):
+                if self.strict:
+                    raise _BudgetExceeded(self.key)
+                self.exceeded = True
+            return 0
+        data = self.raw.read(min(len(buffer), remaining))
+        self.stats[self.key] += len(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+def _source_size(source: Union[str, IO]) -> int:
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    position = source.tell()
+    source.seek(0, os.SEEK_END)
+    size = source.tell()
+    source.seek(position)
+    return size
+
+def _source_format(source: Union[str, IO]) -> str:
+    name = (source if isinstance(source, str) else getattr(source, "name", "") or "").lower()
+    mime = "" if isinstance(source, str) else getattr(source, "type", "") or ""
+    if "pdf" in mime or name.endswith(".pdf"):
+        return "pdf"
+    if "word" in mime or name.endswith((".docx", ".doc")):
+        return "docx"
+    return "txt"
+
+def _pdf_page_count(pdf) -> Optional[int]:
+    try:
+        from pdfminer.pdftypes import resolve1
+        return int(resolve1(resolve1(pdf.doc.catalog["Pages"])["Count"]))
+    except Exception:
+        return None
+
+def _iter_pdf_pages(source: Union[str, IO], budget: ExtractionBudget, stats: Dict) -> Iterator[str]:
+    # Only the first max_pages pages get page objects; each page's layout cache is freed after use
+    with pdfplumber.open(source, pages=range(1, budget.max_pages + 1)) as pdf:
+        stats["total_pages"] = _pdf_page_count(pdf)
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            page.close()
+            stats["pages"] += 1
+            if page_text:
+                yield page_text + "\n"
+        if stats["total_pages"] is not None and stats["total_pages"] > stats["pages"]:
+            raise _BudgetExceeded("pages")
+
+def _iter_docx_paragraphs(source: Union[str, IO], budget: ExtractionBudget, stats: Dict) -> Iterator[str]:
+    """Body paragraphs streamed from word/document.xml, like Document(f).paragraphs but without the tree."""
+    with zipfile.ZipFile(source) as archive:
+        with archive.open("word/document.xml") as member:
+            reader = io.BufferedReader(
+                _LimitedReader(member, budget.max_uncompressed_bytes, stats, "uncompressed_bytes", strict=True)
+            )
+            depth = 0
+            textbox_depth = 0
+            body = None
+            parts: List[str] = []
+            for event, element in ElementTree.iterparse(reader, events=("start", "end")):
+                tag = element.tag
+                if event == "start":
+                    depth += 1
+                    if depth == 2:
+                        body = element
+                    elif tag == _W + "txbxContent":
+                        textbox_depth += 1
+                    continue
+                # Text boxes live inside runs; python-docx leaves them out of paragraph text
+                if tag == _W + "txbxContent":
+                    textbox_depth -= 1
+                elif depth >= 4 and not textbox_depth:
+                    if tag == _W + "t":
+                        parts.append(element.text or "")
+                    elif tag in (_W + "tab", _W + "ptab"):
+                        parts.append("\t")
+                    elif tag in (_W + "br", _W + "cr"):
+                        parts.append("\n")
+                    elif tag == _W + "noBreakHyphen":
+                        parts.append("-")
+                if depth == 3:
+                    if tag == _W + "p":
+                        text = "".join(parts)
+                        if text:
+                            yield text + "\n"
+                    parts = []
+                    # Finished body children are dropped so memory stays flat
+                    body.remove(element)
+                depth -= 1
+
+def _iter_text_chunks(source: Union[str, IO], budget: ExtractionBudget, stats: Dict) -> Iterator[str]:
+    is_path = isinstance(source, (str, os.PathLike))
+    raw = open(source, "rb") if is_path else source
+    limited = _LimitedReader(raw, budget.max_bytes, stats, "read_bytes", strict=False)
+    # Same newline handling as extract_text: translated for paths, untouched for uploads
+    reader = io.TextIOWrapper(io.BufferedReader(limited), encoding="utf-8", errors="ignore",
+                              newline=None if is_path else "")
+    try:
+        while True:
+            chunk = reader.read(_TEXT_CHUNK)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        reader.detach()
+        if is_path:
+            raw.close()
+    if limited.exceeded:
+        raise _BudgetExceeded("bytes")
+
+def _sections_complete(text: str, budget: ExtractionBudget) -> bool:
+    from resume_parser import find_section_spans
+
+    done = set()
+    for span in find_section_spans(text):
+        if span.end < len(text) or span.end - span.start >= budget.section_chars:
+            done.add(span.section)
+    return all(section in done for section in budget.stop_sections)
+
+def iter_text_parts(source: Union[str, IO], budget: ExtractionBudget = DEFAULT_BUDGET,
+                    stats: Optional[Dict] = None) -> Iterator[str]:
+    """
+    Stream the text of a PDF (per page), DOCX (per paragraph) or TXT (per chunk) file
+    within ``budget``. Pass a ``stats`` dict to get counts and ``stats["truncated"]``:
+    None, or the limit that stopped extraction ("pages", "chars", "bytes",
+    "uncompressed_bytes", "seconds" or "sections").
+
+    Peak memory is one page or paragraph plus the consumer's own state, whatever the
+    size of the file.
+    """
+    stats = {} if stats is None else stats
+    kind = _source_format(source)
+    stats.update({"format": kind, "parts": 0, "pages": 0, "total_pages": None, "chars": 0, "bytes": 0,
+                  "read_bytes": 0, "uncompressed_bytes": 0, "seconds": 0.0, "truncated": None})
+    start = time.perf_counter()
+    seen: List[str] = []
+    checked_chars = 0
+    try:
+        stats["bytes"] = _source_size(source)
+        if kind != "txt" and stats["bytes"] > budget.max_bytes:
+            raise _BudgetExceeded("bytes")
+        if kind == "pdf":
+            parts = _iter_pdf_pages(source, budget, stats)
+        elif kind == "docx":
+            parts = _iter_docx_paragraphs(source, budget, stats)
+        else:
+            parts = _iter_text_chunks(source, budget, stats)
+        for part in parts:
+            remaining = budget.max_chars - stats["chars"]
+            if len(part) > remaining:
+                part = part[:remaining]
+            stats["chars"] += len(part)
+            if part:
+                stats["parts"] += 1
+                yield part
+            if stats["chars"] >= budget.max_chars:
+                raise _BudgetExceeded("chars")
+            if time.perf_counter() - start > budget.max_seconds:
+                raise _BudgetExceeded("seconds")
+            if budget.stop_sections:
+                seen.append(part)
+                if stats["chars"] - checked_chars >= _SECTION_CHECK_CHARS or kind == "pdf":
+                    checked_chars = stats["chars"]
+                    if _sections_complete("".join(seen), budget):
+                        raise _BudgetExceeded("sections")
+    except _BudgetExceeded as e:
+        stats["truncated"] = e.reason
+    finally:
+        stats["seconds"] = round(time.perf_counter() - start, 4)
+        if not isinstance(source, (str, os.PathLike)):
+            try:
+                source.seek(0)
+            except Exception:
+                pass
+
+def extract_text_bounded(source: Union[str, IO], budget: ExtractionBudget = DEFAULT_BUDGET) -> Tuple[str, Dict]:
+    """(text, stats) from iter_text_parts; the text equals extract_text's when no limit was hit."""
+    stats: Dict = {}
+    text = "".join(iter_text_parts(source, budget, stats))
+    if stats["format"] == "docx" and text.endswith("\n"):
+        text = text[:-1]
+    return text, stats
+
+# ===== ISOLATED EXTRACTION =====
+
+def _limit_address_space(extra_mb: int) -> None:
+    """Let this process map at most ``extra_mb`` more than it already has (Linux only)."""
+    try:
+        import resource
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (ImportError, OSError, ValueError):
+        return
+    limit = current + extra_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _isolated_worker(conn, source: Union[str, IO], budget: ExtractionBudget) -> None:
+    """Child process: send ("part", text, stats) per part, then ("done", stats) or a failure."""
+    if budget.max_memory_mb:
+        _limit_address_space(budget.max_memory_mb)
+    stats: Dict = {}
+    try:
+        for part in iter_text_parts(source, budget, stats):
+            conn.send(("part", part, dict(stats)))
+        conn.send(("done", None, stats))
+    except MemoryError:
+        conn.send(("memory", None, stats))
+    except Exception as e:
+        conn.send(("error", e, stats))
+    finally:
+        conn.close()
+
+def extract_text_isolated(source: Union[str, IO], budget: ExtractionBudget = DEFAULT_BUDGET) -> Tuple[str, Dict]:
+    """
+    extract_text_bounded in a child process, for callers that cannot use SIGALRM (such
+    as Streamlit script threads). The child is killed once ``budget.max_seconds`` have
+    passed, even in the middle of a page, and stops with a MemoryError if it grows by
+    more than ``budget.max_memory_mb``. Text received before either limit is kept and
+    stats["truncated"] is "seconds" or "memory". Parse errors are re-raised here.
+    """
+    context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_isolated_worker, args=(sender, source, budget), daemon=True)
+    start = time.perf_counter()
+    process.start()
+    sender.close()
+    parts: List[str] = []
+    stats: Dict = {"format": _source_format(source), "parts": 0, "chars": 0, "truncated": None}
+    try:
+        while True:
+            remaining = budget.max_seconds - (time.perf_counter() - start)
+            if remaining <= 0 or not receiver.poll(remaining):
+                stats["truncated"] = "seconds"
+                break
+            try:
+                kind, value, stats = receiver.recv()
+            except EOFError:
+                process.join(1)
+                raise RuntimeError(f"extraction process exited with code {process.exitcode}")
+            if kind == "part":
+                parts.append(value)
+            elif kind == "memory":
+                stats["truncated"] = "memory"
+                break
+            elif kind == "error":
+                raise value
+            else:
+                break
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.kill()
+        process.join()
+        stats["seconds"] = round(time.perf_counter() - start, 4)
+    text = "".join(parts)
+    if stats["format"] == "docx" and text.endswith("\n"):
+        text = text[:-1]
+    return text, stats
+
+# ===== BULK INGESTION =====
+
+class ExtractionTimeout(Exception):
+    pass
+
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+def _iter_sources(sources: Union[str, Iterable]) -> Iterator[Tuple[str, Union[str, Tuple[str, bytes]]]]:
+    """
+    Yield (doc_id, job) pairs. Paths are passed to workers as-is; file-likes are read
+    here and shipped as (name, bytes) because open handles cannot cross processes.
+    """
+    if isinstance(sources, (str, os.PathLike)):
+        # A single path is a directory to walk or one file, never a sequence of characters
+        if os.path.isdir(sources):
+            for root, dirs, files in os.walk(sources):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                        path = os.path.join(root, name)
+                        yield path, path
+        elif os.path.isfile(sources):
+            yield str(sources), str(sources)
+        else:
+            raise FileNotFoundError(f"No such file or directory: {str(sources)!r}")
+        return
+
+    for i, source in enumerate(sources):
+        if isinstance(source, (str, os.PathLike)):
+            yield str(source), str(source)
+        else:
+            name = getattr(source, "name", "") or f"document-{i}"
+            yield name, (name, source.read())
+
+def _extract_job(doc_id: str, job: Union[str, Tuple[str, bytes]], timeout: Optional[float],
+                 budget: Optional[ExtractionBudget] = None) -> Tuple[str, str, Dict]:
+    """Worker entry point: never raises, failures are reported in stats["error"]."""
+    stats = {"chars": 0, "bytes": 0, "seconds": 0.0, "error": None, "truncated": None}
+    start = time.perf_counter()
+
+    # SIGALRM interrupts a stuck parser inside this worker without touching the others
+    use_alarm = bool(timeout) and hasattr(signal, "setitimer")
+    if use_alarm:
+        try:
+            previous = signal.signal(signal.SIGALRM, _raise_timeout)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        except ValueError:  # not in the main thread (in-process mode)
+            use_alarm = False
+
+    text = ""
+    try:
+        if isinstance(job, str):
+            stats["bytes"] = os.path.getsize(job)
+            source = job
+        else:
+            name, data = job
+            stats["bytes"] = len(data)
+            source = io.BytesIO(data)
+            source.name = name
+        if budget is None:
+            text = extract_text(source)
+        else:
+            text, bounded = extract_text_bounded(source, budget)
+            stats["truncated"] = bounded["truncated"]
+    except ExtractionTimeout:
+        stats["error"] = f"timeout after {timeout}s"
+    except Exception as e:
+        stats["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+    stats["chars"] = len(text)
+    stats["seconds"] = round(time.perf_counter() - start, 4)
+    return doc_id, text, stats
+
+def iter_extract_texts(sources: Union[str, Iterable],
+                       workers: Optional[int] = None,
+                       max_in_flight: Optional[int] = None,
+                       timeout: Optional[float] = 60.0,
+                       budget: Optional[ExtractionBudget] = None) -> Iterator[Tuple[str, str, Dict]]:
+    """
+    Extract text from many documents in parallel, yielding (doc_id, text, stats) as
+    each one completes (not in input order).
+
+    sources: a directory (walked recursively for PDF/DOCX/TXT files), one file path, or
+             an iterable of paths and/or file-like objects. A path that does not exist
+             raises FileNotFoundError.
+    workers: process count (default: CPU count); 0 or 1 extracts in this process.
+    max_in_flight: bound on submitted-but-unfinished documents (default: 2 x workers),
+                   so huge batches never queue all their bytes at once.
+    timeout: per-file budget in seconds; a file that exceeds it (or fails to parse)
+             is yielded with empty text and stats["error"] set.
+    budget: optional ExtractionBudget; files are then streamed within its limits and
+            stats["truncated"] names the limit that cut one short.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    jobs = _iter_sources(sources)
+
+    if workers <= 1:
+        for doc_id, job in jobs:
+            yield _extract_job(doc_id, job, timeout, budget)
+        return
+
+    max_in_flight = max_in_flight or workers * 2
+    executor = ProcessPoolExecutor(max_workers=workers)
+    in_flight = {}
+    try:
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < max_in_flight:
+                try:
+                    doc_id, job = next(jobs)
+                except StopIteration:
+                    exhausted = True
+                    break
+                in_flight[executor.submit(_extract_job, doc_id, job, timeout, budget)] = doc_id
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                doc_id = in_flight.pop(future)
+                try:
+                    yield future.result()
+                except BrokenProcessPool:
+                    broken = True
+                    yield doc_id, "", {"chars": 0, "bytes": 0, "seconds": 0.0, "error": "worker process crashed", "truncated": None}
+
+            if broken:
+                # A hard crash (e.g. in a C parser) poisons the whole pool; report the
+                # documents that were in flight and carry on with a fresh pool
+                for future, doc_id in in_flight.items():
+                    yield doc_id, "", {"chars": 0, "bytes": 0, "seconds": 0.0, "error": "worker process crashed", "truncated": None}
+                in_flight.clear()
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = ProcessPoolExecutor(max_workers=workers)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
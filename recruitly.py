@@ -0,0 +1,282 @@
+# recruitly.py
+"""
+Headless command line for batch scoring and the scoring service (no Streamlit, no Plotly).
+
+    python -m recruitly score --jd jd.txt --resumes resumes/ --out results.parquet --workers 8
+    python -m recruitly serve --port 8080 --workers 4
+    python -m recruitly rescore --db scores.db --workers 4
+
+Resumes are extracted in parallel worker processes and scored against the JD in
+batches with the same pipeline as ``match_resume_to_jd``. Rows are written to
+CSV, JSONL or Parquet as each batch completes, so partial results survive an
+interrupted run. Progress and throughput go to stderr.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional
+
+from instrumentation import configure_logging, serve_metrics
+from matching import SCORING_MODES, SECTIONS, rank_resumes, set_scoring_mode
+from pdf_extractor import DEFAULT_BUDGET, ExtractionBudget, extract_text, iter_extract_texts
+
+FIELDS = ["resume", "overall", "skills", "experience", "education", "chars", "error", "duplicate_of"]
+SCORE_FIELDS = ["overall", "skills", "experience", "education"]
+
+
+class CsvWriter:
+    def __init__(self, path: str):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=FIELDS)
+        self._writer.writeheader()
+
+    def write(self, rows: List[Dict]) -> None:
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class JsonlWriter:
+    def __init__(self, path: str):
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, rows: List[Dict]) -> None:
+        self._file.write("".join(json.dumps(row) + "\n" for row in rows))
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetWriter:
+    """One row group per batch; needs pyarrow."""
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow: pip install pyarrow (or use .csv / .jsonl)")
+        self._pa = pa
+        self._schema = pa.schema([
+            ("resume", pa.string()), ("overall", pa.float64()), ("skills", pa.float64()),
+            ("experience", pa.float64()), ("education", pa.float64()), ("chars", pa.int64()),
+            ("error", pa.string()), ("duplicate_of", pa.string()),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows: List[Dict]) -> None:
+        if rows:
+            self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+WRITERS = {"csv": CsvWriter, "jsonl": JsonlWriter, "parquet": ParquetWriter}
+
+
+def open_writer(path: str, fmt: Optional[str] = None):
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in WRITERS:
+        raise SystemExit(f"Unknown output format {fmt!r}; use one of {', '.join(WRITERS)} or pass --format")
+    return WRITERS[fmt](path)
+
+
+def batched(items: Iterator, size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def score_batch(jd_text: str, batch: List, dedup=None, scored: Optional[Dict] = None) -> List[Dict]:
+    """
+    Score one batch of extraction results; failed extractions become error rows.
+
+    With a ``dedup.DedupIndex``, a resume that duplicates one scored earlier in the run
+    (kept in ``scored``) or earlier in this batch copies its scores instead.
+    """
+    scored = {} if scored is None else scored
+    rows = {}
+    texts = {}
+    duplicates = {}
+    for doc_id, text, stats in batch:
+        error = stats.get("error") or (None if text.strip() else "no text extracted")
+        rows[doc_id] = {"resume": str(doc_id), "overall": None, "skills": None, "experience": None,
+                        "education": None, "chars": stats.get("chars", len(text)), "error": error,
+                        "duplicate_of": None}
+        if error is not None:
+            continue
+        match = dedup.register(doc_id, text) if dedup is not None else None
+        if match is not None and (match.id in texts or match.id in scored):
+            duplicates[doc_id] = match.id
+        else:
+            texts[doc_id] = text
+
+    for entry in rank_resumes(jd_text, texts, top_k=None) if texts else []:
+        row = rows[entry["resume_id"]]
+        row["overall"] = entry["overall"]
+        row.update(entry["sections"])
+        if dedup is not None:
+            scored[entry["resume_id"]] = {field: row[field] for field in SCORE_FIELDS}
+
+    for doc_id, canonical in duplicates.items():
+        rows[doc_id].update(scored[canonical])
+        rows[doc_id]["duplicate_of"] = str(canonical)
+    return list(rows.values())
+
+
+def cmd_score(args) -> int:
+    if not os.path.isdir(args.resumes) and not os.path.isfile(args.resumes):
+        print(f"--resumes: no such directory or file: {args.resumes}", file=sys.stderr)
+        return 2
+    jd_text = extract_text(args.jd)
+    if not jd_text.strip():
+        print(f"Could not extract any text from {args.jd}", file=sys.stderr)
+        return 1
+
+    if args.verbose:
+        configure_logging("DEBUG")
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+        print(f"Metrics at http://127.0.0.1:{args.metrics_port}/metrics", file=sys.stderr)
+
+    writer = open_writer(args.out, args.format)
+    dedup = None
+    if args.dedup:
+        from dedup import DedupIndex
+        dedup = DedupIndex()
+    earlier: Dict = {}
+    store = None
+    if args.store:
+        from score_store import ScoreStore
+        store = ScoreStore(args.store)
+        store.put_job(args.jd_id or os.path.basename(args.jd), jd_text)
+    start = time.perf_counter()
+    scored = errors = duplicates = 0
+    try:
+        budget = ExtractionBudget(max_pages=args.max_pages, max_chars=args.max_chars)
+        extracted = iter_extract_texts(args.resumes, workers=args.workers, timeout=args.timeout, budget=budget)
+        for batch in batched(extracted, args.batch_size):
+            rows = score_batch(jd_text, batch, dedup, earlier)
+            writer.write(rows)
+            if store is not None:
+                ok = [(doc_id, text, row) for (doc_id, text, _), row in zip(batch, rows) if row["overall"] is not None]
+                store.put_resumes((str(doc_id), text) for doc_id, text, _ in ok)
+                store.record_many(jd_text, ((text, row["overall"], {section: row[section] for section in SECTIONS})
+                                            for _, text, row in ok))
+
+            scored += len(rows)
+            errors += sum(1 for row in rows if row["error"])
+            duplicates += sum(1 for row in rows if row["duplicate_of"])
+            elapsed = time.perf_counter() - start
+            print(f"\r{scored} resumes scored, {errors} errors, {duplicates} duplicates, {elapsed:.1f}s, "
+                  f"{scored / elapsed:.1f} resumes/s", end="", file=sys.stderr, flush=True)
+    finally:
+        writer.close()
+        if store is not None:
+            store.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\nDone: {scored} resumes ({errors} errors) in {elapsed:.1f}s -> {args.out}", file=sys.stderr)
+    return 0
+
+
+def cmd_rescore(args) -> int:
+    from score_store import JOB, RESUME, ScoreStore
+
+    if args.verbose:
+        configure_logging("DEBUG")
+    store = ScoreStore(args.db)
+    try:
+        start = time.perf_counter()
+        rescored = store.refresh(jd_ids=args.jd_id or None, workers=args.workers)
+        print(f"Re-scored {rescored} stale pairs ({store.count(RESUME)} resumes, {store.count(JOB)} jobs) "
+              f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        if args.prune:
+            print(f"Pruned {store.prune()} outdated scores", file=sys.stderr)
+    finally:
+        store.close()
+    return 0
+
+
+def cmd_serve(args) -> int:
+    from server import serve
+
+    if args.verbose:
+        configure_logging("DEBUG")
+    serve(args.host, args.port, workers=args.workers, max_batch=args.max_batch,
+          max_wait=args.max_wait_ms / 1000, max_queue=args.max_queue)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="recruitly", description="Headless Recruitly resume matching.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    score = commands.add_parser("score", help="score a directory of resumes against one job description")
+    score.add_argument("--jd", required=True, help="job description file (TXT, PDF or DOCX)")
+    score.add_argument("--resumes", required=True, help="directory of resumes (searched recursively) or one resume file")
+    score.add_argument("--out", required=True, help="output file: .csv, .jsonl or .parquet")
+    score.add_argument("--format", choices=sorted(WRITERS), help="output format (default: from --out extension)")
+    score.add_argument("--workers", type=int, default=None, help="extraction processes (default: CPU count)")
+    score.add_argument("--batch-size", type=int, default=64, help="resumes scored per batch (default: 64)")
+    score.add_argument("--timeout", type=float, default=60.0, help="per-file extraction timeout in seconds")
+    score.add_argument("--max-pages", type=int, default=DEFAULT_BUDGET.max_pages,
+                       help=f"PDF pages read per resume (default: {DEFAULT_BUDGET.max_pages})")
+    score.add_argument("--max-chars", type=int, default=DEFAULT_BUDGET.max_chars,
+                       help=f"characters kept per resume (default: {DEFAULT_BUDGET.max_chars})")
+    score.add_argument("--dedup", action="store_true",
+                       help="score exact and near-duplicate resumes once and copy the scores")
+    score.add_argument("--scoring", choices=SCORING_MODES, default=None,
+                       help="sections (default) or chunked: score the whole text of long resumes")
+    score.add_argument("--store", default=None,
+                       help="also keep the resumes and scores in this SQLite score store (see score_store.py)")
+    score.add_argument("--jd-id", default=None, help="id of the JD in the score store (default: --jd file name)")
+    score.add_argument("--verbose", action="store_true", help="log matching debug output to stderr")
+    score.add_argument("--metrics-port", type=int, default=None,
+                       help="serve Prometheus metrics on this local port while scoring")
+    score.set_defaults(func=cmd_score)
+
+    rescore = commands.add_parser("rescore", help="re-score the stale pairs of a score store")
+    rescore.add_argument("--db", required=True, help="SQLite score store written by score --store")
+    rescore.add_argument("--jd-id", action="append", help="only this JD (repeatable; default: every JD)")
+    rescore.add_argument("--workers", type=int, default=None, help="scoring threads (default: 1)")
+    rescore.add_argument("--scoring", choices=SCORING_MODES, default=None, help="scoring mode to refresh")
+    rescore.add_argument("--prune", action="store_true", help="then delete scores of other versions")
+    rescore.add_argument("--verbose", action="store_true", help="log debug output to stderr")
+    rescore.set_defaults(func=cmd_rescore)
+
+    serve = commands.add_parser("serve", help="run the HTTP/JSON scoring service (see server.py)")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080, help="0 picks a free port")
+    serve.add_argument("--workers", type=int, default=1, help="worker processes sharing the model")
+    serve.add_argument("--max-batch", type=int, default=32, help="requests scored per batch")
+    serve.add_argument("--max-wait-ms", type=float, default=5.0, help="how long a batch waits to fill up")
+    serve.add_argument("--max-queue", type=int, default=256, help="pending requests per worker before 503")
+    serve.add_argument("--scoring", choices=SCORING_MODES, default=None, help="sections (default) or chunked")
+    serve.add_argument("--verbose", action="store_true", help="log debug output to stderr")
+    serve.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.scoring:
+        # Also seen by forked server workers; RECRUITLY_SCORING_MODE sets the same
+        set_scoring_mode(args.scoring)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,29 @@
 import pdfplumber
 from docx import Document
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import re
+from typing import NamedTuple
 
-# Load model once
-model = SentenceTransformer('all-MiniLM-L6-v2')
+from embedding_cache import get_embedding_cache
+from model_registry import get_embedding_model
+
+# Model is shared with matching.py and loaded on first use
+MODEL_NAME = 'all-MiniLM-L6-v2'
+embedding_cache = get_embedding_cache(MODEL_NAME)
+
+def __getattr__(name):
+    # `resume_parser.model` still works, but no longer loads a second copy at import
+    if name == "model":
+        return get_embedding_model(MODEL_NAME)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def extract_text_from_pdf(file):
-    text = ""
+    pages = []
     with pdfplumber.open(file) as pdf:
         for page in pdf.pages:
             page_text = page.extract_text()
             if page_text:
-                text += page_text + "\n"
-    return text
+                pages.append(page_text + "\n")
+    return "".join(pages)
 
 def extract_text_from_docx(file):
     doc = Document(file)
@@ -42,55 +51,100 @@ def semantic_similarity(text1, text2):
     """
     if not text1.strip() or not text2.strip():
         return 0.0
-    embeddings = model.encode([text1, text2])
-    sim_score = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
+    embeddings = embedding_cache.encode(get_embedding_model(MODEL_NAME), [text1, text2], normalize=True)
+    sim_score = float(embeddings[0] @ embeddings[1])
     return round(sim_score * 100, 2)
 
-def parse_resume_sections(text):
+SECTION_HEADERS = ['skills', 'education', 'projects', 'experience']
+
+# Header wordings recognised for each section (matched case-insensitively)
+HEADER_SYNONYMS = {
+    'skills': ['skills', 'technical skills', 'key skills', 'core skills', 'skill set', 'skills & tools',
+               'skills and tools', 'core competencies', 'competencies', 'technologies', 'tech stack',
+               'requirements', 'qualifications', 'required qualifications', 'preferred qualifications',
+               'what you bring', 'what we are looking for'],
+    'education': ['education', 'academic background', 'education & training', 'education and training',
+                  'certifications', 'education & certifications', 'education and certifications'],
+    'projects': ['projects', 'personal projects', 'key projects', 'selected projects', 'portfolio'],
+    'experience': ['experience', 'work experience', 'professional experience', 'relevant experience',
+                   'work history', 'employment', 'employment history', 'career history',
+                   'responsibilities', 'what you will do', "what you'll do"],
+}
+
+class SectionSpan(NamedTuple):
+    """Offsets of one section: its header starts at ``header_start``, its body is ``text[start:end]``."""
+    section: str
+    header_start: int
+    start: int
+    end: int
+
+class SectionParser:
     """
-    Parse resume text into logical sections by headers like Skills, Education, Projects, Experience.
-    Returns dictionary of sections with text content.
+    All headers compiled into one grammar and found in a single scan.
+
+    A header is a synonym at the start of a line (after optional bullets or '#'),
+    followed by a colon, a dash or the end of the line, so "Experience: 5 years"
+    and "WORK HISTORY" are headers but "experience with AWS" in a sentence is not.
     """
-    section_headers = ['skills', 'education', 'projects', 'experience']
-    sections = {header: "" for header in section_headers}
-    text_lower = text.lower()
 
-    indices = {}
-    for header in section_headers:
-        match = re.search(rf'\b{header}\b', text_lower)
-        if match:
-            indices[header] = match.start()
+    def __init__(self, header_synonyms=HEADER_SYNONYMS):
+        self.sections = list(header_synonyms)
+        self.header_sections = {}
+        for section, synonyms in header_synonyms.items():
+            for synonym in synonyms:
+                self.header_sections[" ".join(synonym.lower().split())] = section
+        # Longest first so "work experience" wins over "experience"
+        alternatives = sorted(self.header_sections, key=len, reverse=True)
+        pattern = "|".join(re.escape(header).replace(r"\ ", r"\s+") for header in alternatives)
+        # Lines may end in "\r\n" too (uploaded TXT files keep their newlines), and offsets
+        # must stay those of the original text, so "\r" is allowed before the line end
+        self.regex = re.compile(
+            rf"^[ \t]*(?:[#*\-\u2022>]+[ \t]*)?(?P<header>{pattern})"
+            rf"(?:[ \t]*:|[ \t]+[\-\u2013](?=[ \t])|[ \t]*\r?$)[ \t]*",
+            re.IGNORECASE | re.MULTILINE,
+        )
+
+    def spans(self, text):
+        """Every section in document order; a body runs up to the next header."""
+        found = [
+            (self.header_sections[" ".join(match.group("header").lower().split())], match.start(), match.end())
+            for match in self.regex.finditer(text)
+        ]
+        return [
+            SectionSpan(section, header_start, body_start, found[i + 1][1] if i + 1 < len(found) else len(text))
+            for i, (section, header_start, body_start) in enumerate(found)
+        ]
+
+    def parse(self, text):
+        """{section: body} for every known section; repeated sections are joined with newlines."""
+        bodies = {section: [] for section in self.sections}
+        for span in self.spans(text):
+            body = text[span.start:span.end].strip()
+            if body:
+                bodies[span.section].append(body)
+        return {section: "\n".join(parts) for section, parts in bodies.items()}
 
-    sorted_headers = sorted(indices.items(), key=lambda x: x[1])
+_default_parser = None
 
-    for i, (header, start_idx) in enumerate(sorted_headers):
-        end_idx = sorted_headers[i + 1][1] if i + 1 < len(sorted_headers) else len(text)
-        content = text[start_idx:end_idx].strip()
-        content = re.sub(rf'(?i){header}', '', content).strip()
-        sections[header] = content
+def get_section_parser():
+    global _default_parser
+    if _default_parser is None:
+        _default_parser = SectionParser()
+    return _default_parser
 
-    return sections
+def find_section_spans(text, parser=None):
+    """Section offsets of ``text`` (see SectionParser.spans); slice the text only where needed."""
+    return (parser or get_section_parser()).spans(text)
+
+def parse_resume_sections(text):
+    """
+    Parse resume text into logical sections by headers like Skills, Education, Projects, Experience.
+    Returns dictionary of sections with text content.
+    """
+    return get_section_parser().parse(text)
 
 def parse_job_description_sections(text):
     """
     Parse job description text into sections similar to resume sections.
     """
-    section_headers = ['skills', 'education', 'projects', 'experience']
-    sections = {header: "" for header in section_headers}
-    text_lower = text.lower()
-
-    indices = {}
-    for header in section_headers:
-        match = re.search(rf'\b{header}\b', text_lower)
-        if match:
-            indices[header] = match.start()
-
-    sorted_headers = sorted(indices.items(), key=lambda x: x[1])
-
-    for i, (header, start_idx) in enumerate(sorted_headers):
-        end_idx = sorted_headers[i + 1][1] if i + 1 < len(sorted_headers) else len(text)
-        content = text[start_idx:end_idx].strip()
-        content = re.sub(rf'(?i){header}', '', content).strip()
-        sections[header] = content
-
-    return sections
+    return get_section_parser().parse(text)
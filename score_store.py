@@ -0,0 +1,280 @@
+# score_store.py
+"""
+Persistent match scores with incremental re-scoring.
+
+Resumes and job descriptions are registered by id; their texts are stored once per
+content hash. A score is keyed by (resume hash, JD hash, model, extractor, scoring
+version), where the versions come from ``current_version()``:
+
+- model: the embedding model name and inference backend
+- extractor: ``matching.extractor_version`` of the active section extractor
+- scoring: ``matching.SCORING_VERSION`` and the scoring mode (sections or chunked)
+
+Editing a JD or resume gives it a new hash, and switching model, backend, extractor or
+scoring mode (or bumping SCORING_VERSION) changes the version, so the affected pairs simply have no
+current score. ``refresh()`` finds those stale pairs in SQL and re-scores only them,
+one ``rank_resumes`` batch per JD, with batches spread over threads. ``top_k`` and
+``histogram`` read stored scores only and never score anything.
+
+    store = ScoreStore("scores.db")
+    store.put_jobs({"req-101": jd_text})
+    store.put_resumes({"alice.pdf": resume_text, ...})
+    store.refresh(workers=4)
+    store.top_k("req-101", k=20)
+"""
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import matching
+from instrumentation import get_logger, metrics, stage
+from model_registry import get_backend
+from section_cache import text_hash
+
+logger = get_logger("score_store")
+
+RESUME = "resume"
+JOB = "job"
+
+# Resumes scored per rank_resumes call during refresh()
+REFRESH_BATCH = 256
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS texts ("
+    " doc_hash TEXT PRIMARY KEY, text TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS documents ("
+    " kind TEXT NOT NULL, doc_id TEXT NOT NULL, doc_hash TEXT NOT NULL,"
+    " PRIMARY KEY (kind, doc_id))",
+    "CREATE INDEX IF NOT EXISTS documents_by_hash ON documents (kind, doc_hash)",
+    "CREATE TABLE IF NOT EXISTS scores ("
+    " resume_hash TEXT NOT NULL, jd_hash TEXT NOT NULL,"
+    " model TEXT NOT NULL, extractor TEXT NOT NULL, scoring TEXT NOT NULL,"
+    " overall REAL NOT NULL, skills REAL NOT NULL, experience REAL NOT NULL, education REAL NOT NULL,"
+    " scored_at REAL NOT NULL,"
+    " PRIMARY KEY (jd_hash, model, extractor, scoring, resume_hash))",
+    # Top-k per JD walks this index in score order
+    "CREATE INDEX IF NOT EXISTS scores_by_overall ON scores (jd_hash, model, extractor, scoring, overall DESC)",
+]
+
+Version = Tuple[str, str, str]
+
+
+def current_version(scoring_mode: Optional[str] = None) -> Version:
+    """(model, extractor, scoring) version that scores computed right now would carry."""
+    return (
+        f"{matching.EMBEDDING_MODEL_NAME}:{get_backend()}",
+        matching.extractor_version(matching.get_extractor()),
+        f"{matching.SCORING_VERSION}:{scoring_mode or matching.get_scoring_mode()}",
+    )
+
+
+class ScoreStore:
+
+    def __init__(self, db_path: str = ":memory:"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        if db_path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+    # ----- documents -----
+
+    def _put(self, kind: str, documents: Union[Dict, Iterable[Tuple]]) -> None:
+        items = list(documents.items()) if isinstance(documents, dict) else list(documents)
+        rows = [(kind, str(doc_id), text_hash(text or ""), text or "") for doc_id, text in items]
+        with self._lock:
+            self._db.executemany("INSERT OR IGNORE INTO texts VALUES (?, ?)", [(h, t) for _, _, h, t in rows])
+            self._db.executemany(
+                "INSERT INTO documents VALUES (?, ?, ?)"
+                " ON CONFLICT (kind, doc_id) DO UPDATE SET doc_hash = excluded.doc_hash",
+                [(k, doc_id, h) for k, doc_id, h, _ in rows],
+            )
+            self._db.commit()
+
+    def put_resumes(self, resumes: Union[Dict, Iterable[Tuple]]) -> None:
+        """Register or update ``{resume_id: text}``; unchanged texts keep their scores."""
+        self._put(RESUME, resumes)
+
+    def put_jobs(self, jobs: Union[Dict, Iterable[Tuple]]) -> None:
+        """Register or update ``{jd_id: text}``; unchanged texts keep their scores."""
+        self._put(JOB, jobs)
+
+    def put_resume(self, resume_id, text: str) -> None:
+        self.put_resumes([(resume_id, text)])
+
+    def put_job(self, jd_id, text: str) -> None:
+        self.put_jobs([(jd_id, text)])
+
+    def remove(self, kind: str, doc_id) -> bool:
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM documents WHERE kind=? AND doc_id=?", (kind, str(doc_id)))
+            self._db.commit()
+            return cursor.rowcount > 0
+
+    def count(self, kind: str) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM documents WHERE kind=?", (kind,)).fetchone()[0]
+
+    # ----- scores -----
+
+    def record_many(self, jd_text: str, results: Iterable[Tuple[str, float, Dict[str, float]]],
+                    version: Optional[Version] = None) -> None:
+        """Store ``(resume_text, overall, sections)`` scores computed elsewhere against one JD."""
+        jd_hash = text_hash(jd_text or "")
+        self._write_scores([(text_hash(resume_text or ""), jd_hash, overall, sections)
+                            for resume_text, overall, sections in results], version or current_version())
+
+    def record(self, resume_text: str, jd_text: str, overall: float, sections: Dict[str, float],
+               version: Optional[Version] = None) -> None:
+        self.record_many(jd_text, [(resume_text, overall, sections)], version)
+
+    def _write_scores(self, scores: List[Tuple[str, str, float, Dict[str, float]]], version: Version) -> None:
+        now = time.time()
+        rows = [
+            (resume_hash, jd_hash) + version
+            + (overall, sections["skills"], sections["experience"], sections["education"], now)
+            for resume_hash, jd_hash, overall, sections in scores
+        ]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+
+    def _job_filter(self, jd_ids: Optional[Iterable]) -> Tuple[str, List]:
+        if jd_ids is None:
+            return "", []
+        jd_ids = [str(jd_id) for jd_id in jd_ids]
+        return f" AND j.doc_id IN ({','.join('?' * len(jd_ids))})", jd_ids
+
+    def stale_pairs(self, jd_ids: Optional[Iterable] = None,
+                    version: Optional[Version] = None) -> List[Tuple[str, str]]:
+        """(resume hash, JD hash) pairs of registered documents without a score at ``version``."""
+        version = version or current_version()
+        job_filter, params = self._job_filter(jd_ids)
+        with self._lock:
+            return self._db.execute(
+                "SELECT DISTINCT r.doc_hash, j.doc_hash FROM documents r, documents j"
+                " WHERE r.kind=? AND j.kind=?" + job_filter +
+                " AND NOT EXISTS (SELECT 1 FROM scores s WHERE s.jd_hash=j.doc_hash"
+                "  AND s.model=? AND s.extractor=? AND s.scoring=? AND s.resume_hash=r.doc_hash)",
+                [RESUME, JOB] + params + list(version),
+            ).fetchall()
+
+    def _texts(self, hashes: Iterable[str]) -> Dict[str, str]:
+        hashes = list(set(hashes))
+        texts: Dict[str, str] = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 900):
+                chunk = hashes[start:start + 900]
+                texts.update(self._db.execute(
+                    f"SELECT doc_hash, text FROM texts WHERE doc_hash IN ({','.join('?' * len(chunk))})", chunk,
+                ).fetchall())
+        return texts
+
+    def refresh(self, jd_ids: Optional[Iterable] = None, workers: Optional[int] = None,
+                batch_size: int = REFRESH_BATCH) -> int:
+        """
+        Score every stale pair (optionally only for ``jd_ids``) and return how many.
+
+        Pairs are grouped per JD into ``rank_resumes`` batches of ``batch_size`` resumes,
+        so each JD is extracted and embedded once; ``workers`` batches run at a time.
+        """
+        version = current_version()
+        stale = self.stale_pairs(jd_ids, version)
+        if not stale:
+            return 0
+        by_job: Dict[str, List[str]] = {}
+        for resume_hash, jd_hash in stale:
+            by_job.setdefault(jd_hash, []).append(resume_hash)
+        texts = self._texts([h for pair in stale for h in pair])
+        tasks = [
+            (jd_hash, resume_hashes[start:start + batch_size])
+            for jd_hash, resume_hashes in by_job.items()
+            for start in range(0, len(resume_hashes), batch_size)
+        ]
+
+        def score(task: Tuple[str, List[str]]) -> List[Tuple[str, str, float, Dict[str, float]]]:
+            jd_hash, resume_hashes = task
+            ranked = matching.rank_resumes(texts[jd_hash], {h: texts[h] for h in resume_hashes}, top_k=None)
+            return [(entry["resume_id"], jd_hash, entry["overall"], entry["sections"]) for entry in ranked]
+
+        logger.debug("Re-scoring %d stale pairs in %d batches", len(stale), len(tasks))
+        with stage("rescore"):
+            if workers and workers > 1 and len(tasks) > 1:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    for scores in pool.map(score, tasks):
+                        self._write_scores(scores, version)
+            else:
+                for task in tasks:
+                    self._write_scores(score(task), version)
+        metrics.inc("scores_refreshed", len(stale))
+        return len(stale)
+
+    # ----- queries -----
+
+    def top_k(self, jd_id, k: Optional[int] = 10, version: Optional[Version] = None) -> List[Dict]:
+        """
+        Best stored scores for one JD as ``{"resume_id", "overall", "sections"}``, best first.
+
+        Only scores at ``version`` (default: the current one) count; stale pairs are
+        left out until ``refresh()`` has run.
+        """
+        version = version or current_version()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT r.doc_id, s.overall, s.skills, s.experience, s.education"
+                " FROM documents j JOIN scores s ON s.jd_hash=j.doc_hash"
+                " JOIN documents r ON r.kind=? AND r.doc_hash=s.resume_hash"
+                " WHERE j.kind=? AND j.doc_id=? AND s.model=? AND s.extractor=? AND s.scoring=?"
+                " ORDER BY s.overall DESC, r.doc_id" + ("" if k is None else " LIMIT ?"),
+                [RESUME, JOB, str(jd_id)] + list(version) + ([] if k is None else [k]),
+            ).fetchall()
+        return [
+            {"resume_id": resume_id, "overall": overall,
+             "sections": {"skills": skills, "experience": experience, "education": education}}
+            for resume_id, overall, skills, experience, education in rows
+        ]
+
+    def histogram(self, jd_id=None, bins: int = 10, version: Optional[Version] = None) -> Dict[str, List]:
+        """
+        Counts of current overall scores in ``bins`` equal buckets over 0-100, for one JD
+        or (``jd_id=None``) every registered one: ``{"edges": [...], "counts": [...]}``.
+        """
+        version = version or current_version()
+        job_filter, params = self._job_filter(None if jd_id is None else [jd_id])
+        width = 100.0 / bins
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT MIN(CAST(s.overall / ? AS INTEGER), ?) AS bucket, COUNT(*)"
+                " FROM documents j JOIN scores s ON s.jd_hash=j.doc_hash"
+                " JOIN documents r ON r.kind=? AND r.doc_hash=s.resume_hash"
+                " WHERE j.kind=?" + job_filter + " AND s.model=? AND s.extractor=? AND s.scoring=?"
+                " GROUP BY bucket",
+                [width, bins - 1, RESUME, JOB] + params + list(version),
+            ).fetchall()
+        counts = [0] * bins
+        for bucket, count in rows:
+            counts[int(bucket)] = count
+        return {"edges": [round(i * width, 6) for i in range(bins + 1)], "counts": counts}
+
+    def prune(self) -> int:
+        """Delete scores of other versions or unregistered texts, and orphaned texts."""
+        version = current_version()
+        with self._lock:
+            removed = self._db.execute(
+                "DELETE FROM scores WHERE NOT (model=? AND extractor=? AND scoring=?)"
+                " OR resume_hash NOT IN (SELECT doc_hash FROM documents WHERE kind=?)"
+                " OR jd_hash NOT IN (SELECT doc_hash FROM documents WHERE kind=?)",
+                list(version) + [RESUME, JOB],
+            ).rowcount
+            self._db.execute("DELETE FROM texts WHERE doc_hash NOT IN (SELECT doc_hash FROM documents)")
+            self._db.commit()
+        return removed
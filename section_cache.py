@@ -0,0 +1,123 @@
+# section_cache.py
+"""
+Memoized section extraction.
+
+Extracted sections are keyed by (text hash, section, context, extractor version), so a JD
+matched against many resumes, or a resume matched against many JDs, is extracted once.
+There is an in-process LRU tier and an optional SQLite tier that persists across
+restarts and can be shared by processes on the same machine. A forked process opens its
+own connection on first use, since SQLite connections must not cross ``fork()``.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+Key = Tuple[str, str, str, str]
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SectionCache:
+
+    def __init__(self, max_entries: int = 10000, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._memory: "OrderedDict[Key, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_pid = 0
+        self._inherited: List[sqlite3.Connection] = []
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if db_path:
+            self._connect()
+
+    def _connect(self) -> None:
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._db_pid = os.getpid()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sections ("
+            " text_hash TEXT NOT NULL, section TEXT NOT NULL, context TEXT NOT NULL,"
+            " extractor TEXT NOT NULL, value TEXT NOT NULL,"
+            " PRIMARY KEY (text_hash, section, context, extractor))"
+        )
+        self._db.commit()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """This process's connection; call with the lock held."""
+        if self._db is not None and self._db_pid != os.getpid():
+            # Inherited from the parent: never used or closed here, just kept referenced
+            self._inherited.append(self._db)
+            self._connect()
+        return self._db
+
+    @staticmethod
+    def key(text: str, section: str, context: str, extractor: str) -> Key:
+        return (text_hash(text), section, context, extractor)
+
+    def _remember(self, key: Key, value: str) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: Key) -> Optional[str]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+            db = self._connection()
+            if db is not None:
+                row = db.execute(
+                    "SELECT value FROM sections WHERE text_hash=? AND section=? AND context=? AND extractor=?",
+                    key,
+                ).fetchone()
+                if row is not None:
+                    self.db_hits += 1
+                    self._remember(key, row[0])
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key: Key, value: str) -> None:
+        self.put_many({key: value})
+
+    def put_many(self, items: Dict[Key, str]) -> None:
+        """Store many sections; the SQLite tier writes them all in one transaction."""
+        with self._lock:
+            for key, value in items.items():
+                self._remember(key, value)
+            db = self._connection()
+            if db is not None and items:
+                with db:
+                    db.executemany(
+                        "INSERT OR REPLACE INTO sections VALUES (?, ?, ?, ?, ?)",
+                        [key + (value,) for key, value in items.items()],
+                    )
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.db_hits + self.misses
+        return {
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._memory),
+            "hit_rate": round((self.hits + self.db_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        """Drop the in-memory tier (the SQLite tier is left untouched)."""
+        with self._lock:
+            self._memory.clear()
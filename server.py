@@ -0,0 +1,282 @@
+# server.py
+"""
+Local HTTP/JSON scoring service.
+
+    python -m recruitly serve --port 8080 --workers 4
+
+Endpoints:
+
+- ``POST /match`` with ``{"resume": "...", "job_description": "..."}`` returns
+  ``{"overall": 72.4, "sections": {"skills": ..., "experience": ..., "education": ...}}``;
+  both fields must be non-empty strings, anything else gets ``400``
+- ``GET /health`` and ``GET /metrics`` (Prometheus text of the worker that answered,
+  see instrumentation.py)
+
+Each worker process runs a ``MicroBatcher``. It collects the requests that arrive
+within ``max_wait`` seconds (up to ``max_batch``) and scores them with one
+``matching.match_many`` call, so one encode call serves many requests. When more than
+``max_queue`` requests are waiting, new ones get ``503`` with ``Retry-After`` instead
+of queueing without bound.
+
+The parent process loads the embedding model before forking, so workers share its
+weights copy-on-write instead of each loading a copy, and all of them accept
+connections on one listening socket. The parent never runs inference, and it loads the
+model with a single thread: a forked child hangs on its first parallel operation if
+the parent already started an intra-op thread pool. Each worker then applies its own
+thread cap and warms up. Per-process resources such as the section cache's SQLite
+connection are reopened in the child.
+"""
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+
+from instrumentation import get_logger, metrics, render_prometheus
+
+logger = get_logger("server")
+
+MAX_BODY_BYTES = 2 * 1024 * 1024
+
+
+class QueueFull(Exception):
+    """The batcher already holds ``max_queue`` pending requests."""
+
+
+class MicroBatcher:
+    """Group concurrent submissions into batches for ``process_batch(items) -> results``."""
+
+    def __init__(self, process_batch: Callable[[List], List], max_batch: int = 32,
+                 max_wait: float = 0.005, max_queue: int = 256):
+        self.process_batch = process_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self._pending: List = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, item) -> Future:
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("batcher is closed")
+            if len(self._pending) >= self.max_queue:
+                metrics.inc("server_rejected")
+                raise QueueFull()
+            self._pending.append((item, future))
+            self._cond.notify()
+        return future
+
+    def _next_batch(self) -> List:
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            # Give concurrent requests a few milliseconds to join this batch
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            metrics.inc("server_batches")
+            metrics.inc("server_batched_requests", len(batch))
+            try:
+                results = self.process_batch([item for item, _ in batch])
+            except Exception as e:
+                logger.exception("Batch of %d failed", len(batch))
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+
+def _score_pairs(pairs: List) -> List:
+    from matching import match_many
+
+    return match_many(pairs)
+
+
+def make_handler(batcher: MicroBatcher, timeout: float = 60.0):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, payload, content_type: str = "application/json",
+                  headers: Optional[dict] = None) -> None:
+            body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/health":
+                self._send(200, {"status": "ok", "pid": os.getpid()})
+            elif path == "/metrics":
+                self._send(200, render_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path.split("?")[0] != "/match":
+                self._send(404, {"error": "not found"})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_BODY_BYTES:
+                self._send(413, {"error": "request body too large"})
+                return
+            try:
+                request = json.loads(self.rfile.read(length))
+                pair = (request["resume"], request["job_description"])
+            except (ValueError, KeyError, TypeError):
+                self._send(400, {"error": "expected JSON with 'resume' and 'job_description'"})
+                return
+            # null, numbers or objects must not be scored as their str() text
+            if not all(isinstance(text, str) and text.strip() for text in pair):
+                self._send(400, {"error": "'resume' and 'job_description' must be non-empty strings"})
+                return
+
+            try:
+                future = batcher.submit(pair)
+            except QueueFull:
+                self._send(503, {"error": "server busy"}, headers={"Retry-After": "1"})
+                return
+            try:
+                overall, sections = future.result(timeout=timeout)
+            except Exception as e:
+                self._send(500, {"error": str(e)})
+                return
+            self._send(200, {"overall": overall, "sections": sections})
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def _serve_worker(sock: socket.socket, max_batch: int, max_wait: float, max_queue: int) -> None:
+    batcher = MicroBatcher(_score_pairs, max_batch=max_batch, max_wait=max_wait, max_queue=max_queue)
+    server = ThreadingHTTPServer(sock.getsockname()[:2], make_handler(batcher), bind_and_activate=False)
+    server.socket.close()
+    server.socket = sock
+    server.daemon_threads = True
+    try:
+        server.serve_forever()
+    finally:
+        batcher.close()
+
+
+def preload_model(warm_up: bool = True):
+    """Load the embedding model in this process and, with ``warm_up``, run one tiny encode."""
+    from matching import EMBEDDING_MODEL_NAME
+    from model_registry import get_embedding_model
+
+    model = get_embedding_model(EMBEDDING_MODEL_NAME)
+    if warm_up:
+        model.encode(["warm up"], convert_to_numpy=True)
+    return model
+
+
+def _start_forked_worker(threads: int) -> None:
+    """Apply the worker's thread cap, then warm up, in a freshly forked child."""
+    from embedding_backends import set_num_threads
+
+    os.environ["RECRUITLY_EMBEDDING_THREADS"] = str(threads)
+    model = preload_model(warm_up=False)
+    set_num_threads(model, threads)
+    model.encode(["warm up"], convert_to_numpy=True)
+
+
+def serve(host: str = "127.0.0.1", port: int = 8080, workers: int = 1, max_batch: int = 32,
+          max_wait: float = 0.005, max_queue: int = 256, threads_per_worker: Optional[int] = None) -> None:
+    """Run the service until interrupted. ``port=0`` picks a free port (printed to stderr)."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(max(128, max_queue))
+
+    if workers > 1 and not hasattr(os, "fork"):
+        logger.warning("os.fork is unavailable; running a single worker")
+        workers = 1
+
+    # Workers would otherwise each start one thread per core and fight over them. The
+    # backend applies RECRUITLY_EMBEDDING_THREADS itself, so the onnx backends never
+    # import torch.
+    threads = threads_per_worker or int(os.getenv("RECRUITLY_EMBEDDING_THREADS") or 0) \
+        or max(1, (os.cpu_count() or 1) // workers)
+    if workers == 1:
+        if threads_per_worker:
+            os.environ["RECRUITLY_EMBEDDING_THREADS"] = str(threads)
+        preload_model()
+    else:
+        # Weights only, with one thread: no thread pool may exist when the workers fork
+        os.environ["RECRUITLY_EMBEDDING_THREADS"] = "1"
+        preload_model(warm_up=False)
+    print(f"Listening on http://{host}:{sock.getsockname()[1]} with {workers} worker(s)", file=sys.stderr, flush=True)
+
+    if workers == 1:
+        try:
+            _serve_worker(sock, max_batch, max_wait, max_queue)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                _start_forked_worker(threads)
+                _serve_worker(sock, max_batch, max_wait, max_queue)
+            finally:
+                os._exit(0)
+        children.append(pid)
+    sock.close()
+
+    def stop(*_):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def terminate(*_):
+        stop()
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, terminate)
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        stop()
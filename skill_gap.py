@@ -0,0 +1,94 @@
+# skill_gap.py
+"""
+Skill-level explanation of a match: which of the JD's skills the resume covers.
+
+Both skill sections (as extracted by ``extract_with_structured_prompt``) are split into
+phrases. Every unique phrase is embedded once through the shared embedding cache, so a
+skill seen in an earlier request costs a dictionary lookup, and the JD-by-resume
+cosine matrix comes from one matrix product. Each JD skill is then:
+
+- matched: some resume skill has cosine similarity of at least ``MATCHED``
+- partial: the closest resume skill is at least ``PARTIAL`` similar (a related skill)
+- missing: nothing on the resume comes close
+
+    explain_match(resume_text, jd_text)["missing"]
+    # [SkillScore(skill="kubernetes", status="missing", score=31.2, closest="docker"), ...]
+
+``python benchmarks.py skill_gap`` checks that this adds little to ``match_resume_to_jd``.
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+import matching
+from instrumentation import metrics, stage
+from model_registry import get_embedding_model
+
+MATCHED = 0.75
+PARTIAL = 0.5
+STATUSES = ("matched", "partial", "missing")
+
+# List separators an extractor may produce: commas, semicolons, pipes, bullets, new lines
+_SEPARATORS = re.compile(r"[,;|\n•·]+")
+
+
+class SkillScore(NamedTuple):
+    skill: str  # the JD skill
+    status: str  # "matched", "partial" or "missing"
+    score: float  # cosine similarity to the closest resume skill, as a percentage
+    closest: Optional[str]  # that resume skill
+
+
+def split_skills(text: str) -> List[str]:
+    """Unique lowercase skill phrases of an extracted skills section, in order."""
+    phrases = (" ".join(part.strip(" \t-*.").split()).lower() for part in _SEPARATORS.split(text or ""))
+    return list(dict.fromkeys(phrase for phrase in phrases if phrase))
+
+
+def skill_gap(resume_skills: Union[str, Sequence[str]], jd_skills: Union[str, Sequence[str]],
+              matched: float = MATCHED, partial: float = PARTIAL) -> Dict[str, List[SkillScore]]:
+    """
+    Classify every JD skill against the resume's skills.
+
+    Skills are an extracted section string or a list of phrases. Returns
+    ``{"matched": [...], "partial": [...], "missing": [...]}`` of SkillScore, in JD order.
+    """
+    resume = split_skills(resume_skills if isinstance(resume_skills, str) else "\n".join(resume_skills))
+    jd = split_skills(jd_skills if isinstance(jd_skills, str) else "\n".join(jd_skills))
+    result: Dict[str, List[SkillScore]] = {status: [] for status in STATUSES}
+    if not jd:
+        return result
+    if not resume:
+        result["missing"] = [SkillScore(skill, "missing", 0.0, None) for skill in jd]
+        return result
+
+    with stage("skill_gap"):
+        phrases = list(dict.fromkeys(jd + resume))
+        row = {phrase: i for i, phrase in enumerate(phrases)}
+        embeddings = matching.embedding_cache.encode(
+            get_embedding_model(matching.EMBEDDING_MODEL_NAME), phrases, normalize=True,
+        )
+        similarity = embeddings[[row[skill] for skill in jd]] @ embeddings[[row[skill] for skill in resume]].T
+        closest = similarity.argmax(axis=1)
+        best = np.clip(similarity[np.arange(len(jd)), closest], 0.0, 1.0)
+
+    resume_set = set(resume)
+    for skill, column, value in zip(jd, closest, best):
+        # The same phrase on both sides is a match even if float rounding says 0.9999
+        value = 1.0 if skill in resume_set else float(value)
+        status = "matched" if value >= matched else "partial" if value >= partial else "missing"
+        nearest = skill if skill in resume_set else resume[column]
+        result[status].append(SkillScore(skill, status, round(value * 100, 1), nearest))
+    metrics.inc("skill_gaps")
+    return result
+
+
+def explain_match(resume_text: str, jd_text: str) -> Dict[str, List[SkillScore]]:
+    """skill_gap of the skills extracted from both documents (extraction is cached)."""
+    if not resume_text or not jd_text:
+        return skill_gap("", "")
+    resume_sections, jd_sections = matching.extract_sections_many(
+        [(resume_text, "resume"), (jd_text, "job description")]
+    )
+    return skill_gap(resume_sections.get("skills", ""), jd_sections.get("skills", ""))
@@ -0,0 +1,90 @@
+# stub_inference.py
+"""
+Local stand-in for the Hugging Face Inference API, shared by the benchmarks and tests.
+
+By default every prompt is answered with ``answer`` (a string, or a function of the
+prompt) after ``delay`` seconds, and ``inputs`` may be a string or a list, like the
+real endpoint. ``statuses`` lists HTTP error codes to return, in order, before
+answering normally. ``responses`` replaces the default answers with scripted
+``(status, body, headers, delay_seconds)`` tuples, used in order and then the last one
+again; ``body`` is sent as JSON unless it is a str.
+
+    with StubInferenceServer(delay=0.05) as server:
+        matching.HF_API_URL = server.url
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+Response = Tuple[int, object, Dict[str, str], float]
+
+
+class StubInferenceServer:
+    """Counts requests, prompts and the most requests in flight; keeps every request body."""
+
+    def __init__(self, delay: float = 0.0, answer: Union[str, Callable[[str], str]] = "Python, SQL, Docker",
+                 statuses: Optional[List[int]] = None, responses: Optional[List[Response]] = None):
+        self.delay = delay
+        self.answer = answer
+        self.statuses = list(statuses or [])
+        self.responses = list(responses or [])
+        self.requests = 0
+        self.prompts = 0
+        self.bodies: List = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                body = json.loads(raw) if raw else {}
+                with stub._lock:
+                    status, payload, headers, delay = stub._next_response(body)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                time.sleep(delay)
+                with stub._lock:
+                    stub.in_flight -= 1
+                data = (payload if isinstance(payload, str) else json.dumps(payload)).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/models/stub"
+
+    def _next_response(self, body) -> Response:
+        """Call with the lock held."""
+        inputs = body.get("inputs", "") if isinstance(body, dict) else ""
+        self.bodies.append(body)
+        self.requests += 1
+        self.prompts += len(inputs) if isinstance(inputs, list) else 1
+        if self.responses:
+            return self.responses[min(self.requests - 1, len(self.responses) - 1)]
+        if self.statuses:
+            return self.statuses.pop(0), {"error": "Model is currently loading", "estimated_time": 0.01}, {}, self.delay
+        prompts = inputs if isinstance(inputs, list) else [inputs]
+        answer = self.answer if callable(self.answer) else (lambda prompt: self.answer)
+        return 200, [{"generated_text": answer(prompt)} for prompt in prompts], {}, self.delay
+
+    def __enter__(self) -> "StubInferenceServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
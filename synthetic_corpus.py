@@ -0,0 +1,195 @@
+# synthetic_corpus.py
+"""
+Synthetic resumes and job descriptions for offline benchmarks.
+
+Documents are generated from a seeded ``random.Random``, so the same seed always gives
+the same corpus. Resume length is controlled with ``paragraphs`` (extra experience
+paragraphs) and JD/resume skill overlap with ``make_pair(rng, overlap=...)``.
+``generate_corpus`` writes the resumes to disk as TXT, DOCX and PDF; the PDF writer
+is a small built-in one, so nothing beyond python-docx is needed.
+
+    python synthetic_corpus.py corpus/ --count 100 --formats txt,pdf --paragraphs 5
+"""
+import argparse
+import json
+import os
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+SKILLS = [
+    "Python", "Java", "JavaScript", "React", "Angular", "Node", "Django", "Flask",
+    "SQL", "PostgreSQL", "MongoDB", "AWS", "Azure", "Docker", "Kubernetes",
+    "machine learning", "data science", "analytics", "Git", "Agile", "Scrum",
+]
+DEGREES = ["Bachelor", "Master", "PhD"]
+FIELDS = ["Computer Science", "Engineering", "Mathematics", "Statistics"]
+VERBS = ["developed", "built", "created", "implemented", "managed", "led"]
+PRODUCTS = ["billing platform", "search service", "mobile app", "data warehouse",
+            "recommendation engine", "internal dashboard", "payments API", "CI pipeline"]
+FORMATS = ("txt", "docx", "pdf")
+
+
+def _filler(rng: random.Random, skills: Sequence[str]) -> str:
+    """One extra experience paragraph, used to grow a document to a target size."""
+    return (
+        f"{rng.choice(VERBS).capitalize()} the {rng.choice(PRODUCTS)} using {rng.choice(skills)} "
+        f"and {rng.choice(SKILLS)}, cutting latency by {rng.randint(10, 60)}% for "
+        f"{rng.randint(2, 50)}k users. Worked with {rng.randint(2, 9)} engineers on design reviews."
+    )
+
+
+def make_resume(rng: random.Random, skills: Optional[Sequence[str]] = None, paragraphs: int = 0) -> str:
+    skills = list(skills) if skills is not None else rng.sample(SKILLS, 6)
+    joined = ", ".join(skills)
+    years = rng.randint(1, 12)
+    verbs = rng.sample(VERBS, 3)
+    text = (
+        f"Software engineer with {years} years of experience. "
+        f"Worked as a developer and {verbs[0]} services in {joined}. "
+        f"{verbs[1].capitalize()} data pipelines and {verbs[2]} a small team.\n"
+        f"Skills: {joined}\n"
+        f"Education: {rng.choice(DEGREES)} degree in {rng.choice(FIELDS)}, State University."
+    )
+    if paragraphs:
+        text += "\n" + "\n".join(_filler(rng, skills) for _ in range(paragraphs))
+    return text
+
+
+def make_jd(rng: random.Random, skills: Optional[Sequence[str]] = None, paragraphs: int = 0) -> str:
+    skills = list(skills) if skills is not None else rng.sample(SKILLS, 5)
+    text = (
+        f"We are looking for an engineer with 3+ years of experience in {', '.join(skills)}. "
+        f"You will have built and managed production systems. "
+        f"A {rng.choice(DEGREES)} degree in {rng.choice(FIELDS)} is required."
+    )
+    if paragraphs:
+        text += "\n" + "\n".join(_filler(rng, skills) for _ in range(paragraphs))
+    return text
+
+
+def make_pair(rng: random.Random, overlap: float = 0.5, skills: int = 6,
+              paragraphs: int = 0) -> Tuple[str, str]:
+    """A (resume, JD) pair where ``overlap`` of the JD's skills also appear on the resume."""
+    resume_skills = rng.sample(SKILLS, skills)
+    shared = round(max(0.0, min(1.0, overlap)) * skills)
+    others = [skill for skill in SKILLS if skill not in resume_skills]
+    jd_skills = rng.sample(resume_skills, shared) + rng.sample(others, min(skills - shared, len(others)))
+    rng.shuffle(jd_skills)
+    return make_resume(rng, resume_skills, paragraphs), make_jd(rng, jd_skills, paragraphs)
+
+
+def _wrap(text: str, width: int = 90) -> List[str]:
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split():
+            if line and len(line) + 1 + len(word) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+        lines.append(line)
+    return lines
+
+
+def _pdf_string(line: str) -> str:
+    line = line.encode("latin-1", "replace").decode("latin-1")
+    return "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def write_pdf(path: str, text: str, lines_per_page: int = 60) -> None:
+    """Write ``text`` as a plain Helvetica PDF with real (extractable) text objects."""
+    lines = _wrap(text)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then a (page, content) pair per page
+    objects: List[bytes] = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_refs = []
+    for page_lines in pages:
+        page_number, content_number = len(objects) + 1, len(objects) + 2
+        page_refs.append(f"{page_number} 0 R")
+        stream = "BT /F1 10 Tf 12 TL 50 800 Td " + " ".join(f"{_pdf_string(line)} Tj T*" for line in page_lines) + " ET"
+        objects.append((
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_number} 0 R >>"
+        ).encode("latin-1"))
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode("latin-1"))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(pages)} >>".encode("latin-1")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode("latin-1") + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def write_docx(path: str, text: str) -> None:
+    from docx import Document
+
+    doc = Document()
+    for paragraph in text.split("\n"):
+        doc.add_paragraph(paragraph)
+    doc.save(path)
+
+
+def write_txt(path: str, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+WRITERS = {"txt": write_txt, "docx": write_docx, "pdf": write_pdf}
+
+
+def generate_corpus(out_dir: str, count: int = 100, formats: Sequence[str] = FORMATS, seed: int = 0,
+                    overlap: float = 0.5, paragraphs: int = 0) -> Dict:
+    """
+    Write ``count`` resumes in every format in ``formats`` plus one JD per resume.
+
+    Returns the manifest (also saved as ``manifest.json``): ``{"resumes": [{"id", "files",
+    "jd"}...], ...}`` where ``files`` maps a format to its path and ``jd`` is the JD text
+    paired with that resume at the requested overlap.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    entries = []
+    for i in range(count):
+        resume, jd = make_pair(rng, overlap=overlap, paragraphs=paragraphs)
+        files = {}
+        for fmt in formats:
+            files[fmt] = os.path.join(out_dir, f"resume_{i:05d}.{fmt}")
+            WRITERS[fmt](files[fmt], resume)
+        entries.append({"id": f"resume_{i:05d}", "files": files, "jd": jd, "chars": len(resume)})
+
+    manifest = {"seed": seed, "overlap": overlap, "paragraphs": paragraphs, "resumes": entries}
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume/JD corpus.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--formats", default=",".join(FORMATS), help="comma-separated: txt,docx,pdf")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--overlap", type=float, default=0.5, help="share of JD skills found on the resume")
+    parser.add_argument("--paragraphs", type=int, default=0, help="extra experience paragraphs per document")
+    args = parser.parse_args(argv)
+
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in WRITERS]
+    if unknown:
+        parser.error(f"unknown formats: {', '.join(unknown)}")
+    manifest = generate_corpus(args.out_dir, args.count, formats, args.seed, args.overlap, args.paragraphs)
+    print(f"Wrote {len(manifest['resumes'])} resumes ({', '.join(formats)}) to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# tests/conftest.py
+import hashlib
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root, next to this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Nothing in the tests may reach the network
+os.environ.pop("HF_API_TOKEN", None)
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+
+class HashingModel:
+    """Bag-of-words vectors; stands in for the sentence embedding model."""
+
+    max_seq_length = 64
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **_):
+        import numpy as np
+
+        vectors = np.full((len(texts), 64), 0.01, dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[i, int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % 64] += 1.0
+        return vectors
+
+    def get_sentence_embedding_dimension(self):
+        return 64
+
+
+@pytest.fixture
+def hashing_model(monkeypatch):
+    """HashingModel in place of the embedding model, with the regex extractor."""
+    import chunking
+    import matching
+
+    model = HashingModel()
+    monkeypatch.setattr(chunking, "get_embedding_model", lambda name: model)
+    monkeypatch.setattr(matching, "get_embedding_model", lambda name: model)
+    matching.set_extractor("regex")
+    matching.embedding_cache.clear()
+    yield model
+    matching.embedding_cache.clear()
+    matching.set_extractor(None)
+    matching.set_scoring_mode(None)
@@ -0,0 +1,61 @@
+# tests/test_chunking.py
+import pytest
+
+import matching
+from chunking import approximate_pieces, chunked_match, iter_windows
+
+
+def test_windows_respect_piece_limit_on_punctuation_heavy_text():
+    text = " ".join(["C++/C#/.NET,"] * 128)
+    windows = list(iter_windows(text, max_tokens=254, overlap=32))
+    assert len(windows) > 1
+    for start, end in windows:
+        assert len(approximate_pieces(text[start:end])) <= 254
+    # Together the windows cover every word
+    assert windows[0][0] == 0 and windows[-1][1] == len(text)
+
+
+def test_word_longer_than_a_window_is_split():
+    text = "see " + "/".join(["a"] * 300) + " done"
+    windows = list(iter_windows(text, max_tokens=50, overlap=10))
+    assert all(len(approximate_pieces(text[start:end])) <= 50 for start, end in windows)
+    assert windows[-1][1] == len(text)
+
+
+def test_windows_follow_the_given_tokenizer():
+    def characters(text):
+        return [(i, i + 1) for i, ch in enumerate(text) if not ch.isspace()]
+
+    text = "kubernetes " * 40
+    windows = list(iter_windows(text, max_tokens=30, overlap=10, tokenize=characters))
+    assert all(len(text[start:end].replace(" ", "")) <= 30 for start, end in windows)
+
+
+def test_overlap_must_be_smaller_than_window():
+    with pytest.raises(ValueError):
+        list(iter_windows("a b c", max_tokens=4, overlap=4))
+
+
+def test_chunked_mode_on_production_paths(hashing_model):
+    jd = "Skills\nPython, Kubernetes, Terraform\nExperience\nFive years running production services."
+    resumes = {
+        "late": "Summary\n" + "Worked on billing. " * 200 + "\nExperience\nRan Kubernetes and Terraform in production.",
+        "none": "Summary\n" + "Worked on billing. " * 200,
+    }
+    expected = {resume_id: chunked_match(text, jd) for resume_id, text in resumes.items()}
+
+    matching.set_scoring_mode("chunked")
+    assert matching.match_resume_to_jd(resumes["late"], jd) == expected["late"]
+    assert matching.match_many([(resumes["none"], jd), ("", jd)]) == [expected["none"], (0.0, {s: 0.0 for s in matching.SECTIONS})]
+    ranked = matching.rank_resumes(jd, resumes, top_k=None)
+    assert [entry["resume_id"] for entry in ranked] == ["late", "none"]
+    for entry in ranked:
+        assert (entry["overall"], entry["sections"]) == expected[entry["resume_id"]]
+
+
+def test_unknown_scoring_mode_is_rejected(monkeypatch):
+    with pytest.raises(ValueError):
+        matching.set_scoring_mode("tokens")
+    monkeypatch.setenv("RECRUITLY_SCORING_MODE", "tokens")
+    with pytest.raises(ValueError):
+        matching.get_scoring_mode()
@@ -0,0 +1,69 @@
+# tests/test_dedup.py
+import random
+
+from dedup import DedupIndex, collapse_duplicates
+from synthetic_corpus import make_resume
+
+
+def corpus(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    return {f"r-{i}": make_resume(rng, paragraphs=rng.randint(2, 6)) for i in range(n)}
+
+
+def edit_words(text: str, count: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = text.split(" ")
+    for i in rng.sample(range(len(words)), count):
+        words[i] = "edited"
+    return " ".join(words)
+
+
+def test_exact_duplicate_ignores_whitespace():
+    resumes = corpus(50)
+    index = DedupIndex()
+    for doc_id, text in resumes.items():
+        index.add(doc_id, text)
+    match = index.find("  " + resumes["r-7"].replace(" ", "  \n") + "\n")
+    assert match.id == "r-7" and match.kind == "exact"
+
+
+def test_near_duplicate_finds_the_edited_original():
+    resumes = corpus(50)
+    index = DedupIndex()
+    for doc_id, text in resumes.items():
+        index.add(doc_id, text)
+    match = index.find(edit_words(resumes["r-12"], 3))
+    assert match.id == "r-12" and match.kind == "near"
+    assert index.threshold <= match.similarity < 1.0
+
+
+def test_distinct_resumes_are_not_duplicates():
+    resumes = corpus(300)
+    unique, duplicates = collapse_duplicates(resumes)
+    assert duplicates == {} and unique == resumes
+
+    # The earliest copy is canonical for the whole group
+    resumes["copy"] = resumes["r-3"]
+    resumes["near"] = edit_words(resumes["r-3"], 2, seed=1)
+    _, duplicates = collapse_duplicates(resumes)
+    assert duplicates == {"copy": "r-3", "near": "r-3"}
+
+
+def test_save_and_load_round_trip(tmp_path):
+    resumes = corpus(100)
+    path = str(tmp_path / "dedup")
+    index = DedupIndex(path, threshold=0.6)
+    for doc_id, text in list(resumes.items())[:60]:
+        assert index.register(doc_id, text) is None
+    index.save()
+
+    reloaded = DedupIndex(path)
+    assert reloaded.threshold == 0.6 and len(reloaded) == 60 and reloaded.ids == index.ids
+    for text in list(resumes.values())[:60]:
+        assert reloaded.find(text) == index.find(text)
+    # Appending after a load grows the loaded arrays
+    for doc_id, text in list(resumes.items())[60:]:
+        assert reloaded.register(doc_id, text) is None
+    assert reloaded.find(edit_words(resumes["r-90"], 3)).id == "r-90"
+    reloaded.save()
+    assert len(DedupIndex(path)) == 100
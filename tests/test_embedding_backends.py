@@ -0,0 +1,44 @@
+# tests/test_embedding_backends.py
+import os
+import random
+
+import numpy as np
+import pytest
+
+from embedding_backends import BACKENDS, COSINE_TOLERANCE, load_embedding_model
+from model_registry import DEFAULT_EMBEDDING_MODEL
+from synthetic_corpus import make_pair
+
+# Any SentenceTransformer name or path available offline
+MODEL = os.getenv("RECRUITLY_TEST_EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+
+
+def pair_cosines(model, pairs) -> np.ndarray:
+    vectors = np.asarray(model.encode([text for pair in pairs for text in pair], batch_size=8), dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return np.einsum("ij,ij->i", vectors[0::2], vectors[1::2])
+
+
+@pytest.fixture(scope="module")
+def pairs():
+    rng = random.Random(0)
+    return [make_pair(rng, overlap=rng.random(), paragraphs=rng.randint(0, 3)) for _ in range(16)]
+
+
+@pytest.fixture(scope="module")
+def reference(pairs):
+    pytest.importorskip("sentence_transformers")
+    try:
+        model = load_embedding_model(MODEL, "torch")
+    except OSError as exc:
+        pytest.skip(f"{MODEL} is not available offline: {exc}")
+    return pair_cosines(model, pairs)
+
+
+@pytest.mark.parametrize("backend", [backend for backend in BACKENDS if backend != "torch"])
+def test_backend_cosines_stay_within_tolerance_of_torch(backend, pairs, reference):
+    if backend.startswith("onnx"):
+        pytest.importorskip("onnxruntime")
+        pytest.importorskip("onnx")
+    drift = np.abs(pair_cosines(load_embedding_model(MODEL, backend), pairs) - reference)
+    assert drift.max() <= COSINE_TOLERANCE, f"{backend} drifts {drift.max():.4f} from torch"
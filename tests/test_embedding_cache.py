@@ -0,0 +1,43 @@
+# tests/test_embedding_cache.py
+import os
+
+import numpy as np
+
+from embedding_cache import DiskEmbeddingStore
+
+
+def vectors(n: int, seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((n, 16)).astype(np.float32)
+
+
+def test_rows_stay_aligned_after_a_writer_crash(tmp_path):
+    store = DiskEmbeddingStore(str(tmp_path))
+    first = vectors(3, 0)
+    store.put_many(["a", "b", "c"], first)
+
+    # A writer died after appending one full row, half of another and a torn key line
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(vectors(1, 1).tobytes())
+        f.write(vectors(1, 2).tobytes()[:30])
+    with open(tmp_path / "keys.txt", "ab") as f:
+        f.write(b"d 3")
+
+    second = vectors(2, 3)
+    store.put_many(["e", "f"], second)
+
+    reopened = DiskEmbeddingStore(str(tmp_path))
+    assert reopened.get("d") is None
+    for key, expected in zip("abcef", np.concatenate([first, second])):
+        np.testing.assert_array_equal(reopened.get(key), expected)
+    assert os.path.getsize(tmp_path / "vectors.f32") % (4 * 16) == 0
+
+
+def test_reads_the_implicit_row_format(tmp_path):
+    stored = vectors(2, 0)
+    (tmp_path / "meta.json").write_text('{"dim": 16}', encoding="utf-8")
+    (tmp_path / "vectors.f32").write_bytes(stored.tobytes())
+    (tmp_path / "keys.txt").write_bytes(b"a\nb\n")
+    store = DiskEmbeddingStore(str(tmp_path))
+    np.testing.assert_array_equal(store.get("b"), stored[1])
+    store.put_many(["c"], vectors(1, 1))
+    np.testing.assert_array_equal(DiskEmbeddingStore(str(tmp_path)).get("c"), vectors(1, 1)[0])
@@ -0,0 +1,90 @@
+# tests/test_extractors.py
+import re
+
+import pytest
+
+import matching
+from extractors import BatchedHTTPExtractor, PromptExtractor, RegexExtractor
+from instrumentation import metrics
+from matching import simple_extraction_fallback
+from stub_inference import StubInferenceServer
+
+RESUME = "Senior engineer. Skills: Python, Docker, Kubernetes and SQL. BSc in Computer Science."
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_regex_backend_is_not_counted_as_a_fallback():
+    result = RegexExtractor(simple_extraction_fallback).extract_batch([(RESUME, "resume")], ["skills", "education"])
+    assert "python" in result[0]["skills"].lower()
+    assert "fallbacks" not in metrics.counters
+
+
+def test_failed_model_output_is_counted_as_a_fallback():
+    def call_llm(prompt):
+        # The model answers nothing for skills, so only that section falls back
+        return "" if prompt.startswith("What technical skills") else "BSc in Computer Science"
+
+    extractor = PromptExtractor(call_llm, simple_extraction_fallback)
+    result = extractor.extract_batch([(RESUME, "resume")], ["skills", "education"])
+    assert "python" in result[0]["skills"].lower()
+    assert result[0]["education"] == "BSc in Computer Science"
+    assert metrics.counters["fallbacks"] == 1
+
+
+def answer_by_prompt(prompt):
+    # Name the section asked for and the document it was asked about
+    section = {"technical": "skills", "work": "experience", "education": "education"}[prompt.split()[1]]
+    return f"{section} of {re.search(r'doc-[0-9]+', prompt).group()}"
+
+
+def test_batched_extractor_maps_each_answer_to_its_prompt():
+    documents = [(f"Resume doc-{i}: Python and SQL engineer, BSc.", "resume") for i in range(3)]
+    documents.insert(1, ("short", "resume"))
+    with StubInferenceServer(answer=answer_by_prompt) as server:
+        extractor = BatchedHTTPExtractor(server.url, {"Authorization": "Bearer test"}, simple_extraction_fallback,
+                                         max_batch=4, max_new_tokens=50)
+        results = extractor.extract_batch(documents, list(matching.SECTIONS))
+    # 3 extractable documents x 3 sections in batches of 4 prompts
+    assert [len(body["inputs"]) for body in server.bodies] == [4, 4, 1]
+    assert server.bodies[0]["parameters"]["max_new_tokens"] == 50
+    assert results[1] == {section: "" for section in matching.SECTIONS}
+    for result, i in zip([results[0]] + results[2:], range(3)):
+        assert result == {section: f"{section} of doc-{i}" for section in matching.SECTIONS}
+
+
+@pytest.mark.parametrize("response", [
+    (500, "oops", {}, 0.0),
+    (200, [{"generated_text": "only one answer"}], {}, 0.0),
+    (200, {"error": "not a list"}, {}, 0.0),
+])
+def test_batched_extractor_falls_back_on_bad_responses(response):
+    with StubInferenceServer(responses=[response]) as server:
+        extractor = BatchedHTTPExtractor(server.url, {}, simple_extraction_fallback)
+        result = extractor.extract_batch([(RESUME, "resume")], ["skills", "education"])
+    assert server.requests == 1
+    assert "python" in result[0]["skills"].lower()
+    assert metrics.counters["llm_failures"] == 1 and metrics.counters["fallbacks"] == 2
+
+
+def test_hf_batch_posts_through_the_pooled_session(monkeypatch):
+    sessions = []
+    session = matching._get_http_session()
+    original_post = session.post
+
+    def post(*args, **kwargs):
+        sessions.append(session)
+        return original_post(*args, **kwargs)
+
+    monkeypatch.setattr(session, "post", post)
+    with StubInferenceServer() as server:
+        monkeypatch.setattr(matching, "HF_API_URL", server.url)
+        extractor = matching.make_extractor("hf-batch")
+        extractor.extract_batch([(RESUME, "resume")], ["skills"])
+        extractor.extract_batch([(RESUME + " Again.", "resume")], ["skills"])
+    assert server.requests == 2 and sessions == [session, session]
@@ -0,0 +1,59 @@
+# tests/test_job_catalog.py
+import hashlib
+
+import numpy as np
+import pytest
+
+import vector_index
+from job_catalog import JobCatalog
+
+DIM = 384
+
+
+def fake_embed_sections(self, section_texts):
+    """Deterministic per-text vectors in place of the embedding model."""
+    n = len(section_texts)
+    vectors = np.zeros((len(self.sections), n, DIM), dtype=np.float32)
+    present = np.zeros((len(self.sections), n), dtype=bool)
+    hashes = np.zeros((len(self.sections), n), dtype=np.uint64)
+    for s, section in enumerate(self.sections):
+        for i, doc in enumerate(section_texts):
+            text = doc.get(section, "").strip()
+            if text:
+                seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "little")
+                vector = np.random.default_rng(seed).standard_normal(DIM)
+                vectors[s, i] = vector / np.linalg.norm(vector)
+                present[s, i] = True
+                hashes[s, i] = vector_index._section_hash(text)
+    return vectors, present, hashes
+
+
+@pytest.fixture(autouse=True)
+def offline_embeddings(monkeypatch):
+    monkeypatch.setattr(vector_index.SectionIndex, "embed_sections", fake_embed_sections)
+
+
+POSTINGS = {
+    f"req-{i}": f"We need a {skill} engineer with 3+ years of experience. A Bachelor degree is required."
+    for i, skill in enumerate(["Python", "Java", "React", "Docker", "AWS", "SQL"] * 40)
+}
+
+
+def test_reopen_remove_save_reload(tmp_path):
+    path = str(tmp_path / "catalog")
+    catalog = JobCatalog(path)
+    assert catalog.upsert_many(POSTINGS) == len(POSTINGS)
+    catalog.save()
+
+    reopened = JobCatalog(path)
+    assert len(reopened) == len(POSTINGS)
+    assert reopened.remove("req-7")
+    reopened.save()
+
+    reloaded = JobCatalog(path)
+    assert len(reloaded) == len(POSTINGS) - 1
+    assert "req-7" not in reloaded and "req-8" in reloaded
+    # Unchanged postings are not re-embedded; the removed one is
+    assert reloaded.upsert_many(POSTINGS) == 1
+    reloaded.save()
+    assert len(JobCatalog(path)) == len(POSTINGS)
@@ -0,0 +1,59 @@
+# tests/test_lexical_index.py
+import pytest
+
+import text_preprocessor
+from lexical_index import LexicalIndex, lexical_prefilter
+
+
+@pytest.fixture(autouse=True)
+def offline_stop_words(monkeypatch):
+    monkeypatch.setattr(text_preprocessor, "get_stop_words", lambda: frozenset({"and", "with", "the"}))
+
+
+def matches(index, query):
+    return [hit["id"] for hit in index.search(query) if hit["score"] > 0]
+
+
+RESUMES = {
+    "a": "Python developer with Django and PostgreSQL",
+    "b": "Java engineer with Spring and Kafka",
+    "c": "Frontend developer with React and TypeScript",
+}
+
+
+def test_prefilter_reindexes_changed_text():
+    index = LexicalIndex()
+    assert list(lexical_prefilter("kafka", RESUMES, top_n=1, index=index)) == ["b"]
+    changed = dict(RESUMES, a="COBOL mainframe programmer with Kafka Kafka Kafka")
+    assert list(lexical_prefilter("kafka", changed, top_n=1, index=index)) == ["a"]
+    assert matches(index, "django") == []
+
+
+def test_upsert_many_tokenizes_only_new_or_changed():
+    index = LexicalIndex()
+    assert index.upsert_many(RESUMES) == 3
+    assert index.upsert_many(RESUMES) == 0
+    assert index.upsert_many(dict(RESUMES, c="Rust systems programmer")) == 1
+    assert matches(index, "rust") == ["c"]
+
+
+def test_duplicate_ids_in_one_call_keep_the_last_text():
+    index = LexicalIndex()
+    index.add_many([("a", "python django"), ("b", "java"), ("a", "golang kubernetes")])
+    assert len(index) == 2
+    assert matches(index, "python") == []
+    assert matches(index, "kubernetes") == ["a"]
+    assert "python" not in index.vocab
+    index.compact()
+    assert index.ids == ["a", "b"]
+
+
+def test_hashes_survive_save_and_compact(tmp_path):
+    index = LexicalIndex(str(tmp_path))
+    index.upsert_many(RESUMES)
+    index.delete("b")
+    index.compact()
+    index.save()
+    reopened = LexicalIndex(str(tmp_path))
+    assert reopened.upsert_many({"a": RESUMES["a"], "c": RESUMES["c"]}) == 0
+    assert reopened.upsert_many({"a": "Haskell"}) == 1
@@ -0,0 +1,30 @@
+# tests/test_lexicon.py
+from lexicon import Lexicon, get_lexicon
+
+LEXICON = Lexicon({
+    "skills": {"terms": ["ml", "machine learning", "c++", "c", ".net", "spring", "spring boot"]},
+    "experience": {"terms": ["led"], "patterns": [r"\d+\+?\s*years?\s*of\s*experience"]},
+})
+
+
+def test_terms_match_only_on_word_boundaries():
+    found = LEXICON.find_all("HTML and XML pages, YAML files; we skilled up and settled")
+    assert found == {"skills": [], "experience": []}
+    assert LEXICON.find_all("Applied ML (and ml-ops) daily")["skills"] == ["ml", "ml"]
+    # "c" is a term, but "c++" and "c#" are not "c"
+    assert LEXICON.find_all("C++, C#, C and .NET")["skills"] == ["c++", "c", ".net"]
+
+
+def test_multi_word_terms_match_across_whitespace():
+    found = LEXICON.find_all("Machine\n  Learning on Spring Boot; spring cleaning")
+    assert found["skills"] == ["machine learning", "spring boot", "spring"]
+
+
+def test_patterns_ride_along_with_terms():
+    assert LEXICON.find_all("Led a team, 5+ years of experience")["experience"] == ["led", "5+ years of experience"]
+
+
+def test_default_lexicon():
+    found = get_lexicon().find_all("HTML, CSS and machine learning with Spring Boot; BSc in computer science")
+    assert "html" in found["skills"] and "machine learning" in found["skills"]
+    assert "ml" not in found["skills"] and "computer science" in found["education"]
@@ -0,0 +1,90 @@
+# tests/test_llm_client.py
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from llm_client import AsyncLLMClient  # noqa: E402
+from stub_inference import StubInferenceServer  # noqa: E402
+
+
+OK = (200, [{"generated_text": " skills: python "}], {}, 0.0)
+
+
+def generate(url, prompts, **options):
+    async def run():
+        async with AsyncLLMClient(url, {}, **options) as client:
+            return await client.generate_many(prompts), client
+
+    return asyncio.run(run())
+
+
+def test_retries_429_and_5xx_then_succeeds():
+    responses = [(429, {"error": "rate limited"}, {}, 0.0), (500, "oops", {}, 0.0),
+                 (503, {"estimated_time": 0.01}, {}, 0.0), OK]
+    with StubInferenceServer(responses=responses) as server:
+        (text,), client = generate(server.url, ["prompt"], backoff=0.01)
+    assert text == "skills: python"
+    assert server.requests == 4
+    assert (client.retries, client.failures) == (3, 0)
+
+
+def test_gives_up_after_max_retries():
+    with StubInferenceServer(responses=[(502, "bad gateway", {}, 0.0)]) as server:
+        (text,), client = generate(server.url, ["prompt"], backoff=0.01, max_retries=2)
+    assert text == ""
+    assert server.requests == 3
+    assert (client.retries, client.failures) == (2, 1)
+
+
+def test_backoff_is_jittered_and_capped():
+    client = AsyncLLMClient("http://unused", {}, backoff=0.5, max_backoff=2.0)
+    for attempt, cap in ((0, 0.5), (1, 1.0), (5, 2.0)):
+        delays = [client._retry_delay(attempt, None) for _ in range(200)]
+        assert all(0 <= delay <= cap for delay in delays)
+        assert len(set(delays)) > 100
+    # A server hint raises the floor, but never above max_backoff
+    assert all(client._retry_delay(0, 1.5) >= 1.5 for _ in range(50))
+    assert client._retry_delay(0, 30.0) == 2.0
+
+
+def test_honors_retry_after():
+    with StubInferenceServer(responses=[(429, "slow down", {"Retry-After": "0.3"}, 0.0), OK]) as server:
+        start = time.perf_counter()
+        (text,), _ = generate(server.url, ["prompt"], backoff=0.001)
+    assert text == "skills: python"
+    assert time.perf_counter() - start >= 0.3
+
+
+def test_deadline_covers_slow_responses_and_retries():
+    with StubInferenceServer(responses=[(200, [{"generated_text": "late"}], {}, 2.0)]) as server:
+        start = time.perf_counter()
+        (text,), client = generate(server.url, ["prompt"], deadline=0.3)
+        elapsed = time.perf_counter() - start
+    assert text == ""
+    assert client.failures == 1
+    assert elapsed < 1.5
+
+    with StubInferenceServer(responses=[(503, "loading", {}, 0.0)]) as server:
+        start = time.perf_counter()
+        (text,), _ = generate(server.url, ["prompt"], max_retries=100, backoff=0.05, deadline=0.5)
+        elapsed = time.perf_counter() - start
+    assert text == ""
+    assert 0.5 <= elapsed < 1.5
+
+
+def test_concurrency_cap_bounds_requests_in_flight():
+    with StubInferenceServer(responses=[(200, [{"generated_text": "ok"}], {}, 0.1)]) as server:
+        texts, _ = generate(server.url, [f"prompt {i}" for i in range(12)], concurrency=3)
+    assert texts == ["ok"] * 12
+    assert server.max_in_flight == 3
+
+
+def test_non_retryable_4xx_fails_at_once():
+    with StubInferenceServer(responses=[(400, "<html>bad request</html>", {}, 0.0), OK]) as server:
+        (text,), client = generate(server.url, ["prompt"], backoff=0.01)
+    assert text == ""
+    assert server.requests == 1
+    assert (client.retries, client.failures) == (0, 1)
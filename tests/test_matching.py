@@ -0,0 +1,28 @@
+# tests/test_matching.py
+import random
+
+import numpy as np
+
+import matching
+from synthetic_corpus import make_pair
+
+
+def test_batched_paths_match_the_single_pair_path(hashing_model):
+    rng = random.Random(0)
+    pairs = [make_pair(rng, overlap=rng.random(), paragraphs=rng.randint(0, 3)) for _ in range(120)]
+    # Without an education section the overall is a mean of two scores, often exactly x.x5
+    pairs = [(resume.split("\nEducation:")[0] if i % 2 else resume, jd) for i, (resume, jd) in enumerate(pairs)]
+    single = [matching.match_resume_to_jd(resume, jd) for resume, jd in pairs]
+    assert matching.match_many(pairs) == single
+
+    jd = pairs[0][1]
+    resumes = {f"r{i}": resume for i, (resume, _) in enumerate(pairs)}
+    ranked = {entry["resume_id"]: (entry["overall"], entry["sections"])
+              for entry in matching.rank_resumes(jd, resumes, top_k=None)}
+    assert ranked == {resume_id: matching.match_resume_to_jd(text, jd) for resume_id, text in resumes.items()}
+
+
+def test_overall_is_the_rounded_mean_of_non_zero_sections():
+    scores = np.array([[31.8, 0.0], [31.9, 0.0], [0.0, 0.0]])
+    assert matching.overall_from_sections(scores).tolist() == [matching.round_scores(31.85), 0.0]
+    assert matching.score_sections({}, {}) == (0.0, {section: 0.0 for section in matching.SECTIONS})
@@ -0,0 +1,87 @@
+# tests/test_pdf_extractor.py
+import time
+
+import pytest
+
+import pdf_extractor
+from pdf_extractor import ExtractionBudget, extract_text_bounded, extract_text_isolated, iter_extract_texts
+
+
+def test_single_file_path_is_one_document(tmp_path):
+    path = tmp_path / "one.txt"
+    path.write_text("Python developer with SQL experience.", encoding="utf-8")
+    results = list(iter_extract_texts(str(path), workers=0))
+    assert [(doc_id, text) for doc_id, text, _ in results] == [(str(path), "Python developer with SQL experience.")]
+    assert list(iter_extract_texts(path, workers=0))[0][0] == str(path)
+
+
+def test_directory_is_walked(tmp_path):
+    for name in ("a.txt", "b.txt", "notes.md"):
+        (tmp_path / name).write_text(f"resume {name}", encoding="utf-8")
+    doc_ids = sorted(doc_id for doc_id, _, _ in iter_extract_texts(str(tmp_path), workers=0))
+    assert doc_ids == [str(tmp_path / "a.txt"), str(tmp_path / "b.txt")]
+
+
+def test_missing_path_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list(iter_extract_texts(str(tmp_path / "resumse"), workers=0))
+
+
+def test_isolated_matches_bounded(tmp_path):
+    path = tmp_path / "resume.txt"
+    path.write_text("Skills\nPython, SQL\n\nExperience\nData engineer\n" * 50, encoding="utf-8")
+    budget = ExtractionBudget(max_chars=1000)
+    text, stats = extract_text_isolated(str(path), budget)
+    expected, expected_stats = extract_text_bounded(str(path), budget)
+    assert text == expected
+    assert stats["truncated"] == expected_stats["truncated"] == "chars"
+
+
+def test_isolated_kills_a_part_that_outlives_max_seconds(tmp_path, monkeypatch):
+    def stuck_parser(source, budget, stats):
+        yield "first page\n"
+        time.sleep(30)
+        yield "never read\n"
+
+    monkeypatch.setattr(pdf_extractor, "_iter_text_chunks", stuck_parser)
+    path = tmp_path / "slow.txt"
+    path.write_text("unused", encoding="utf-8")
+    start = time.perf_counter()
+    text, stats = extract_text_isolated(str(path), ExtractionBudget(max_seconds=0.5))
+    assert time.perf_counter() - start < 5
+    assert text == "first page\n"
+    assert stats["truncated"] == "seconds"
+
+
+def test_isolated_caps_memory_growth(tmp_path, monkeypatch):
+    def greedy_parser(source, budget, stats):
+        yield "first page\n"
+        hog = bytearray(1024 * 1024 * 1024)
+        yield str(len(hog))
+
+    monkeypatch.setattr(pdf_extractor, "_iter_text_chunks", greedy_parser)
+    path = tmp_path / "bomb.txt"
+    path.write_text("unused", encoding="utf-8")
+    text, stats = extract_text_isolated(str(path), ExtractionBudget(max_memory_mb=200))
+    assert text == "first page\n"
+    assert stats["truncated"] == "memory"
+
+
+def test_streaming_a_large_file_stays_within_a_small_memory_cap(tmp_path):
+    path = tmp_path / "huge.txt"
+    line = "Experienced Python developer with SQL, Docker and Kubernetes.\n"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(line * (40 * 1024 * 1024 // len(line)))
+    budget = ExtractionBudget(max_chars=10 ** 9, max_bytes=10 ** 9, max_seconds=60, max_memory_mb=64)
+    text, stats = extract_text_isolated(str(path), budget)
+    assert stats["truncated"] is None
+    assert len(text) == path.stat().st_size
+
+
+def test_isolated_reraises_parse_errors(tmp_path):
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"not a pdf at all")
+    with pytest.raises(Exception) as bounded:
+        extract_text_bounded(str(path))
+    with pytest.raises(type(bounded.value)):
+        extract_text_isolated(str(path))
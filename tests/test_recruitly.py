@@ -0,0 +1,12 @@
+# tests/test_recruitly.py
+import recruitly
+
+
+def test_score_rejects_missing_resumes_path(tmp_path, capsys):
+    jd = tmp_path / "jd.txt"
+    jd.write_text("Python engineer", encoding="utf-8")
+    out = tmp_path / "out.csv"
+    code = recruitly.main(["score", "--jd", str(jd), "--resumes", str(tmp_path / "resumse"), "--out", str(out)])
+    assert code != 0
+    assert "no such directory or file" in capsys.readouterr().err
+    assert not out.exists()
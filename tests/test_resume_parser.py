@@ -0,0 +1,49 @@
+# tests/test_resume_parser.py
+from resume_parser import SectionParser, parse_resume_sections
+
+RESUME = (
+    "Jane Doe\n"
+    "Skills\n"
+    "Python, SQL, Docker\n"
+    "\n"
+    "WORK EXPERIENCE\n"
+    "Data engineer at Acme, experience with AWS and Spark.\n"
+    "Education: BSc Computer Science\n"
+    "- Projects -  ETL toolkit\n"
+)
+
+EXPECTED = {
+    "skills": "Python, SQL, Docker",
+    "education": "BSc Computer Science",
+    "projects": "ETL toolkit",
+    "experience": "Data engineer at Acme, experience with AWS and Spark.",
+}
+
+
+def test_headers_on_their_own_line_inline_and_bulleted():
+    assert parse_resume_sections(RESUME) == EXPECTED
+
+
+def test_windows_newlines():
+    sections = parse_resume_sections(RESUME.replace("\n", "\r\n"))
+    assert {section: body.replace("\r\n", "\n") for section, body in sections.items()} == EXPECTED
+
+
+def test_spans_index_the_original_text():
+    text = RESUME.replace("\n", "\r\n")
+    spans = SectionParser().spans(text)
+    assert [span.section for span in spans] == ["skills", "experience", "education", "projects"]
+    assert text[spans[0].header_start:spans[0].start].strip() == "Skills"
+    assert text[spans[0].start:spans[0].end].strip() == "Python, SQL, Docker"
+
+
+def test_header_words_inside_sentences_are_not_headers():
+    assert parse_resume_sections("Summary\nI have experience with AWS.\nskills in Go are a plus") == {
+        "skills": "", "education": "", "projects": "", "experience": "",
+    }
+
+
+def test_repeated_sections_are_joined():
+    sections = parse_resume_sections("Skills\nPython\nExperience\nAcme\nTechnical Skills:\nRust")
+    assert sections["skills"] == "Python\nRust"
+    assert sections["experience"] == "Acme"
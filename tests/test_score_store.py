@@ -0,0 +1,94 @@
+# tests/test_score_store.py
+import random
+
+import pytest
+
+import matching
+from score_store import JOB, RESUME, ScoreStore, current_version
+from section_cache import text_hash
+from synthetic_corpus import make_jd, make_resume
+
+
+@pytest.fixture
+def store(hashing_model):
+    rng = random.Random(0)
+    store = ScoreStore()
+    store.put_jobs({f"jd-{j}": make_jd(rng) for j in range(2)})
+    store.put_resumes({f"r-{i}": make_resume(rng) for i in range(5)})
+    yield store
+    store.close()
+
+
+def texts(store, kind):
+    return dict(store._db.execute(
+        "SELECT d.doc_id, t.text FROM documents d JOIN texts t ON t.doc_hash=d.doc_hash WHERE d.kind=?", (kind,),
+    ).fetchall())
+
+
+def test_refresh_scores_only_stale_pairs(store):
+    assert len(store.stale_pairs()) == 10
+    assert store.refresh() == 10
+    assert store.stale_pairs() == [] and store.refresh() == 0
+
+    # An edited resume is stale against every JD; an edited JD against every resume
+    store.put_resume("r-0", "Skills\nCOBOL\nExperience\nMainframes.")
+    assert len(store.stale_pairs()) == 2
+    store.put_job("jd-1", "Skills\nFortran\nExperience\nNumerical codes.")
+    assert len(store.stale_pairs()) == 1 + 5
+    assert len(store.stale_pairs(jd_ids=["jd-0"])) == 1
+    assert store.refresh(workers=2) == 6 and store.stale_pairs() == []
+    # Re-registering the same text keeps its scores
+    store.put_resume("r-0", "Skills\nCOBOL\nExperience\nMainframes.")
+    assert store.stale_pairs() == []
+
+
+def test_new_version_makes_every_pair_stale(store):
+    store.refresh()
+    model, extractor, _ = current_version()
+    assert len(store.stale_pairs(version=(model, extractor, "other"))) == 10
+    matching.set_scoring_mode("chunked")
+    assert len(store.stale_pairs()) == 10
+
+
+def test_top_k_matches_single_pair_scores(store):
+    store.refresh()
+    jobs, resumes = texts(store, JOB), texts(store, RESUME)
+    expected = sorted(
+        ({"resume_id": resume_id, "overall": overall, "sections": sections}
+         for resume_id, (overall, sections) in
+         ((resume_id, matching.match_resume_to_jd(text, jobs["jd-0"])) for resume_id, text in resumes.items())),
+        key=lambda entry: (-entry["overall"], entry["resume_id"]),
+    )
+    assert store.top_k("jd-0", k=None) == expected
+    assert store.top_k("jd-0", k=3) == expected[:3]
+    assert store.top_k("missing") == []
+
+
+def test_histogram_counts_current_scores(store):
+    store.refresh()
+    overall = [entry["overall"] for jd_id in ("jd-0", "jd-1") for entry in store.top_k(jd_id, k=None)]
+    histogram = store.histogram(bins=4)
+    assert histogram["edges"] == [0.0, 25.0, 50.0, 75.0, 100.0]
+    assert histogram["counts"] == [sum(min(int(score // 25), 3) == b for score in overall) for b in range(4)]
+    assert sum(store.histogram("jd-0")["counts"]) == 5
+    # A score of exactly 100 falls in the last bucket
+    before = store.histogram("jd-0", bins=4)["counts"]
+    old = next(entry["overall"] for entry in store.top_k("jd-0", k=None) if entry["resume_id"] == "r-0")
+    store.record(texts(store, RESUME)["r-0"], texts(store, JOB)["jd-0"], 100.0,
+                 {"skills": 100.0, "experience": 100.0, "education": 100.0})
+    before[min(int(old // 25), 3)] -= 1
+    before[3] += 1
+    assert store.histogram("jd-0", bins=4)["counts"] == before
+
+
+def test_prune_drops_scores_and_texts_of_removed_documents(store):
+    store.refresh()
+    old_text = texts(store, RESUME)["r-1"]
+    assert store.remove(RESUME, "r-0") and not store.remove(RESUME, "r-0")
+    store.put_resume("r-1", "Skills\nCOBOL")
+    assert store.count(RESUME) == 4
+    # r-0 and the old r-1 text were scored against both JDs
+    assert store.prune() == 4 and store.prune() == 0
+    assert store._texts([text_hash(old_text)]) == {}
+    assert store._db.execute("SELECT COUNT(*) FROM texts").fetchone()[0] == 2 + 4
+    assert sorted(entry["resume_id"] for entry in store.top_k("jd-0", k=None)) == ["r-2", "r-3", "r-4"]
@@ -0,0 +1,70 @@
+# tests/test_section_cache.py
+import pytest
+
+import extractors
+import matching
+from extractors import PromptExtractor
+from section_cache import SectionCache
+
+RESUME = "Senior engineer. Skills: Python, Docker, Kubernetes and SQL. BSc in Computer Science."
+JD = "We need Python and SQL experience building data services. Degree preferred."
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    cache = SectionCache(db_path=str(tmp_path / "sections.db"))
+    monkeypatch.setattr(matching, "section_cache", cache)
+    yield cache
+    matching.set_extractor(None)
+
+
+def counting_extractor(model: str = "flan-t5"):
+    prompts = []
+
+    def call_llm(prompt):
+        prompts.append(prompt)
+        return "python, sql"
+
+    return PromptExtractor(call_llm, matching.simple_extraction_fallback, model=model), prompts
+
+
+def test_repeated_documents_hit_the_cache(cache):
+    extractor, prompts = counting_extractor()
+    matching.set_extractor(extractor)
+    first = matching.extract_sections_many([(RESUME, "resume"), (JD, "job description")])
+    assert len(prompts) == 2 * len(matching.SECTIONS)
+    assert matching.extract_sections_many([(JD, "job description"), (RESUME, "resume")]) == first[::-1]
+    assert len(prompts) == 2 * len(matching.SECTIONS)
+    assert cache.stats()["hits"] == 2 * len(matching.SECTIONS)
+
+    # The SQLite tier answers a fresh process
+    reopened = SectionCache(db_path=cache.db_path)
+    key = reopened.key(RESUME, "skills", "resume", matching.extractor_version(extractor))
+    assert reopened.get(key) == first[0]["skills"] and reopened.stats()["db_hits"] == 1
+
+
+def test_new_model_or_prompt_version_misses(cache, monkeypatch):
+    extractor, prompts = counting_extractor("flan-t5")
+    matching.set_extractor(extractor)
+    matching.extract_sections_many([(RESUME, "resume")])
+    extracted = len(prompts)
+
+    other_model, other_prompts = counting_extractor("flan-t5-xl")
+    matching.set_extractor(other_model)
+    matching.extract_sections_many([(RESUME, "resume")])
+    assert len(other_prompts) == extracted
+
+    monkeypatch.setattr(extractors, "PROMPT_VERSION", "2")
+    new_prompts, newer = counting_extractor("flan-t5")
+    matching.set_extractor(new_prompts)
+    matching.extract_sections_many([(RESUME, "resume")])
+    assert len(newer) == extracted
+    assert len({matching.extractor_version(e) for e in (extractor, other_model, new_prompts)}) == 3
+
+
+def test_put_many_writes_one_transaction(cache):
+    statements = []
+    cache._db.set_trace_callback(statements.append)
+    cache.put_many({cache.key(f"resume {i}", "skills", "resume", "v"): "python" for i in range(20)})
+    assert statements.count("COMMIT") == 1
+    assert cache._db.execute("SELECT COUNT(*) FROM sections").fetchone()[0] == 20
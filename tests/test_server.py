@@ -0,0 +1,125 @@
+# tests/test_server.py
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from model_registry import DEFAULT_EMBEDDING_MODEL
+from server import MicroBatcher, make_handler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Any SentenceTransformer name or path available offline
+MODEL = os.getenv("RECRUITLY_TEST_EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+
+
+@pytest.fixture
+def server_url():
+    scored = []
+
+    def score(pairs):
+        scored.extend(pairs)
+        return [(50.0, {"skills": 50.0}) for _ in pairs]
+
+    batcher = MicroBatcher(score, max_wait=0.0)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(batcher, timeout=5.0))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/match", scored
+    server.shutdown()
+    server.server_close()
+    batcher.close()
+
+
+def post(url, body: bytes):
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.mark.parametrize("payload", [
+    {"resume": None, "job_description": "Python developer"},
+    {"resume": "Python developer", "job_description": 42},
+    {"resume": {"skills": "python"}, "job_description": "Python developer"},
+    {"resume": ["python"], "job_description": "Python developer"},
+    {"resume": "", "job_description": "Python developer"},
+    {"resume": "Python developer", "job_description": "   "},
+    {"resume": "Python developer"},
+    ["Python developer", "Python developer"],
+])
+def test_rejects_fields_that_are_not_non_empty_strings(server_url, payload):
+    url, scored = server_url
+    status, body = post(url, json.dumps(payload).encode("utf-8"))
+    assert status == 400
+    assert "error" in body
+    assert scored == []
+
+
+def test_scores_valid_request(server_url):
+    url, scored = server_url
+    status, body = post(url, json.dumps({"resume": "Python", "job_description": "Python"}).encode("utf-8"))
+    assert (status, body) == (200, {"overall": 50.0, "sections": {"skills": 50.0}})
+    assert scored == [("Python", "Python")]
+    assert post(url, b"not json")[0] == 400
+
+
+SERVE_SCRIPT = (
+    "import sys, matching, server\n"
+    "matching.EMBEDDING_MODEL_NAME = sys.argv[1]\n"
+    "server.serve(port=0, workers=2, threads_per_worker=2)\n"
+)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="workers are forked")
+def test_forked_workers_answer_match(tmp_path):
+    pytest.importorskip("sentence_transformers")
+    from embedding_backends import load_embedding_model
+    try:
+        load_embedding_model(MODEL, "torch")
+    except OSError as exc:
+        pytest.skip(f"{MODEL} is not available offline: {exc}")
+
+    db_path = str(tmp_path / "sections.db")
+    env = dict(os.environ, RECRUITLY_SECTION_CACHE_DB=db_path, RECRUITLY_EMBEDDING_BACKEND="torch")
+    process = subprocess.Popen([sys.executable, "-c", SERVE_SCRIPT, MODEL], cwd=ROOT, env=env,
+                               stderr=subprocess.PIPE, text=True)
+    try:
+        for line in process.stderr:
+            if line.startswith("Listening on"):
+                url = line.split()[2] + "/match"
+                break
+        else:
+            pytest.fail("server did not start")
+        threading.Thread(target=process.stderr.read, daemon=True).start()
+
+        results = []
+        body = {"resume": "Python developer with SQL and Docker. BSc Computer Science.",
+                "job_description": "Hiring a Python engineer who knows SQL."}
+
+        def client(i):
+            payload = dict(body, resume=f"{body['resume']} Candidate {i}.")
+            results.append(post(url, json.dumps(payload).encode("utf-8")))
+
+        clients = [threading.Thread(target=client, args=(i,)) for i in range(8)]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join(60)
+        assert [status for status, _ in results] == [200] * 8
+        assert all(0 <= payload["overall"] <= 100 for _, payload in results)
+    finally:
+        process.terminate()
+        process.wait(30)
+
+    # The workers wrote their extractions through connections of their own
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("SELECT COUNT(*) FROM sections").fetchone()[0] > 0
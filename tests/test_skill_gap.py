@@ -0,0 +1,38 @@
+# tests/test_skill_gap.py
+import pytest
+
+import skill_gap
+from skill_gap import SkillScore, explain_match, split_skills
+
+RESUME = "Experienced developer.\nSkills: Python, Docker, deep learning, SQL\nExperience: built APIs."
+JD = "Looking for an engineer.\nSkills: Python, Kubernetes, machine learning, SQL\nExperience: five years."
+
+
+@pytest.fixture
+def model(hashing_model, monkeypatch):
+    monkeypatch.setattr(skill_gap, "get_embedding_model", lambda name: hashing_model)
+    return hashing_model
+
+
+def test_known_pair_reports_matched_partial_and_missing_skills(model):
+    gap = explain_match(RESUME, JD)
+    assert [s.skill for s in gap["matched"]] == ["python", "sql"]
+    assert all(s.score == 100.0 and s.closest == s.skill for s in gap["matched"])
+    # Sharing one of two words puts "machine learning" halfway to "deep learning"
+    assert [(s.skill, s.closest) for s in gap["partial"]] == [("machine learning", "deep learning")]
+    assert [s.skill for s in gap["missing"]] == ["kubernetes"]
+    assert gap["missing"][0].score < skill_gap.PARTIAL * 100
+
+
+def test_empty_sides(model):
+    assert skill_gap.skill_gap("python, sql", "") == {"matched": [], "partial": [], "missing": []}
+    assert skill_gap.skill_gap("", ["Python", "SQL"])["missing"] == [
+        SkillScore("python", "missing", 0.0, None), SkillScore("sql", "missing", 0.0, None),
+    ]
+    assert explain_match("", JD) == {"matched": [], "partial": [], "missing": []}
+
+
+def test_split_skills_normalizes_and_dedupes():
+    assert split_skills("Python; SQL | python\n• Machine   Learning,\n- Docker.") == [
+        "python", "sql", "machine learning", "docker",
+    ]
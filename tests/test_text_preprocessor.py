@@ -0,0 +1,25 @@
+# tests/test_text_preprocessor.py
+from text_preprocessor import TechTokenizer, clean_texts
+
+
+def test_unicode_punctuation_separates_tokens():
+    tokens = TechTokenizer().tokenize("Skills—Python, Docker • “Kubernetes”; SQL… Go「gRPC」 and AWS")
+    assert tokens == ["skills", "python", "docker", "kubernetes", "sql", "go", "grpc", "and", "aws"]
+
+
+def test_tech_terms_survive_unicode_punctuation():
+    tokens = TechTokenizer().tokenize("C++ — C# • .NET – Node.js; 5+ years. Next line")
+    assert tokens == ["c++", "c#", ".net", "node.js", "5+", "years", "next", "line"]
+
+
+def test_full_width_ascii_reads_as_ascii():
+    assert TechTokenizer().tokenize("Ｃ＃／ＳＱＬ，５＋ years") == ["c#", "sql", "5+", "years"]
+    assert TechTokenizer(keep_digits=False).tokenize("５＋ years") == ["+", "years"]
+
+
+def test_non_ascii_letters_are_kept():
+    assert TechTokenizer().tokenize("Café résumé, Zürich") == ["café", "résumé", "zürich"]
+
+
+def test_clean_texts_splits_documents_with_unicode_punctuation():
+    assert clean_texts(["Python—SQL", "Go·Rust"], stop_words=frozenset()) == ["python sql", "go rust"]
@@ -0,0 +1,70 @@
+# tests/test_vector_index.py
+import numpy as np
+import pytest
+
+from vector_index import SectionIndex
+
+DIM = 384  # all-MiniLM-L6-v2; small files happened to survive the old in-place save
+
+
+def random_rows(n: int, sections: int = 3, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((sections, n, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=-1, keepdims=True)
+    present = np.ones((sections, n), dtype=bool)
+    hashes = np.arange(1, sections * n + 1, dtype=np.uint64).reshape(sections, n)
+    return vectors, present, hashes
+
+
+@pytest.mark.parametrize("dtype", ["float32", "int8"])
+def test_save_after_delete_on_loaded_index(tmp_path, dtype):
+    path = str(tmp_path / "index")
+    index = SectionIndex(path, dtype=dtype)
+    vectors, present, hashes = random_rows(1000)
+    index.add_vectors([f"doc-{i}" for i in range(1000)], vectors, present, hashes)
+    index.save()
+
+    # The reopened vectors are memory maps of the files save() rewrites
+    reopened = SectionIndex(path)
+    assert isinstance(reopened.vectors[0], np.memmap)
+    assert reopened.delete("doc-3")
+    reopened.save()
+
+    reloaded = SectionIndex(path)
+    assert len(reloaded) == 999
+    assert "doc-3" not in reloaded and "doc-4" in reloaded
+    for s in range(3):
+        np.testing.assert_array_equal(np.asarray(reloaded.vectors[s]), np.asarray(reopened.vectors[s]))
+
+    extra, extra_present, extra_hashes = random_rows(5, seed=1)
+    reloaded.add_vectors([f"new-{i}" for i in range(5)], extra, extra_present, extra_hashes + np.uint64(10000))
+    reloaded.compact()
+    reloaded.save()
+    final = SectionIndex(path)
+    assert len(final) == 1004 and final.ids[-1] == "new-4"
+    assert not final.deleted.any()
+
+
+@pytest.mark.parametrize("dtype", ["float32", "int8"])
+def test_incremental_adds_grow_geometrically(tmp_path, dtype):
+    vectors, present, hashes = random_rows(1500)
+    ids = [f"doc-{i}" for i in range(1500)]
+    batch = SectionIndex(dtype=dtype)
+    batch.add_vectors(ids, vectors, present, hashes)
+
+    path = str(tmp_path / "index")
+    index = SectionIndex(path, dtype=dtype)
+    capacities = set()
+    for i in range(1500):
+        index.add_vectors([ids[i]], vectors[:, i:i + 1], present[:, i:i + 1], hashes[:, i:i + 1])
+        capacities.add(len(index.vectors[0]))
+    assert capacities == {1024, 2048}
+
+    query = vectors[:, 7]
+    assert index.search_vectors(query, present[:, 7], hashes[:, 7], k=20) == \
+        batch.search_vectors(query, present[:, 7], hashes[:, 7], k=20)
+    index.save()
+    reopened = SectionIndex(path)
+    assert len(reopened) == 1500 and reopened.vectors[0].shape == (1500, DIM)
+    assert reopened.search_vectors(query, present[:, 7], hashes[:, 7], k=20) == \
+        batch.search_vectors(query, present[:, 7], hashes[:, 7], k=20)
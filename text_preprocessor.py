@@ -1,11 +1,53 @@
+import os
 import re
-import nltk
-from nltk.corpus import stopwords
+import sys
+import unicodedata
+from functools import lru_cache
+from itertools import islice
+from typing import FrozenSet, Iterable, Iterator, List, Optional, Union
 
-# Download stopwords if not done yet (run once)
-nltk.download('stopwords')
+# Stopwords are cached as a plain word list so later processes never import nltk
+STOPWORDS_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "recruitly", "stopwords_english.txt")
 
-stop_words = set(stopwords.words('english'))
+@lru_cache(maxsize=1)
+def get_stop_words():
+    """
+    Load the English stopword set once per process:
+    - from the local word-list cache if present (no nltk import, works offline)
+    - otherwise from nltk, downloading the corpus only if it is missing
+    """
+    try:
+        with open(STOPWORDS_CACHE, "r", encoding="utf-8") as f:
+            return frozenset(f.read().split())
+    except OSError:
+        pass
+
+    import nltk
+    from nltk.corpus import stopwords
+
+    try:
+        words = stopwords.words('english')
+    except LookupError:
+        nltk.download('stopwords', quiet=True)
+        words = stopwords.words('english')
+
+    try:
+        os.makedirs(os.path.dirname(STOPWORDS_CACHE), exist_ok=True)
+        tmp_path = f"{STOPWORDS_CACHE}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(words))
+        os.replace(tmp_path, STOPWORDS_CACHE)
+    except OSError:
+        pass
+    return frozenset(words)
+
+def __getattr__(name):
+    # `text_preprocessor.stop_words` is kept for existing callers
+    if name == "stop_words":
+        return get_stop_words()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+_NON_ALPHA = re.compile(r'[^a-z\s]')
 
 def clean_text(text):
     """
@@ -14,14 +56,105 @@ def clean_text(text):
     - Removing punctuation and numbers
     - Removing stopwords
     """
+    stop_words = get_stop_words()
+
     # Lowercase
     text = text.lower()
 
     # Remove punctuation and numbers (keep only alphabets and spaces)
-    text = re.sub(r'[^a-z\s]', '', text)
+    text = _NON_ALPHA.sub('', text)
 
     # Tokenize and remove stopwords
     words = text.split()
     filtered_words = [word for word in words if word not in stop_words]
 
     return ' '.join(filtered_words)
+
+
+# Separates documents inside one batched pass; never part of a token
+_DOC_SEPARATOR = "\x00"
+
+@lru_cache(maxsize=1)
+def _unicode_separators() -> FrozenSet[str]:
+    """Non-ASCII punctuation (P*) and separators (Z*): dashes, curly quotes, bullets, NBSP..."""
+    # No punctuation or separator is assigned above plane 1, so the scan stops there
+    return frozenset(
+        chr(i) for i in range(128, 0x20000) if unicodedata.category(chr(i))[0] in "PZ"
+    )
+
+class TechTokenizer:
+    """
+    Tech-aware tokenizer built from C-level string operations (no per-character regex).
+
+    Letters, digits and ``token_symbols`` make up tokens. Every other ASCII character and
+    all Unicode punctuation and spaces ("—", "“", "•", no-break space...) are separators;
+    full-width ASCII ("Ｃ＃", "５＋") is read as ASCII. So
+    with the defaults "c++", "c#", "python3", "node.js", ".net", "3.5" and the "5" of
+    "5 years" (or "5+") survive, unlike in clean_text. A "." that ends a sentence is
+    dropped. ``keep_digits=False`` drops digits as clean_text does.
+    """
+
+    def __init__(self, token_symbols: str = "+#.", keep_digits: bool = True):
+        keep = set("abcdefghijklmnopqrstuvwxyz" + ("0123456789" if keep_digits else "") + token_symbols)
+        keep.add(_DOC_SEPARATOR)
+        separators = {chr(i) for i in range(128) if chr(i) not in keep} | _unicode_separators()
+        mapping = {char: " " for char in separators}
+        # Full-width forms ("Ｃ＃", "５＋") read as the ASCII characters they stand for
+        mapping.update({chr(i + 0xFEE0): mapping.get(chr(i), chr(i)) for i in range(0x21, 0x7F)})
+        self.table = str.maketrans(mapping)
+        self.strip_periods = "." in token_symbols
+
+    def normalize(self, text: str) -> str:
+        """Lowercased text with separators turned into spaces."""
+        text = text.lower().translate(self.table)
+        if self.strip_periods:
+            text += " "
+            while ". " in text:
+                text = text.replace(". ", " ")
+        return text
+
+    def tokenize(self, text: str) -> List[str]:
+        return self.normalize(text).split()
+
+@lru_cache(maxsize=1)
+def get_tech_tokenizer() -> TechTokenizer:
+    return TechTokenizer()
+
+def _clean_batch(batch: List[str], tokenizer: TechTokenizer, stop_words: FrozenSet[str],
+                 as_tokens: bool) -> List[Union[str, List[str]]]:
+    # One lowercase + one translate + one filter pass for the whole batch
+    joined = f" {_DOC_SEPARATOR} ".join(
+        text.replace(_DOC_SEPARATOR, " ") if _DOC_SEPARATOR in text else text for text in batch
+    )
+    kept = [token for token in tokenizer.tokenize(joined) if token not in stop_words]
+    docs = " ".join(kept).split(_DOC_SEPARATOR)
+    if as_tokens:
+        # Interned tokens share one string object per vocabulary word
+        return [list(map(sys.intern, doc.split())) for doc in docs]
+    return [doc.strip() for doc in docs]
+
+def iter_clean_texts(texts: Iterable[str], tokenizer: Optional[TechTokenizer] = None,
+                     stop_words: Optional[FrozenSet[str]] = None, as_tokens: bool = False,
+                     batch_size: int = 512) -> Iterator[Union[str, List[str]]]:
+    """
+    Stream cleaned documents: lowercased, tech-aware tokens, stopwords removed.
+
+    Documents are processed ``batch_size`` at a time, so memory stays bounded for any
+    corpus size. Yields a space-joined string per document, or with ``as_tokens`` a list
+    of interned tokens.
+    """
+    tokenizer = tokenizer or get_tech_tokenizer()
+    stop_words = frozenset(stop_words) if stop_words is not None else get_stop_words()
+    iterator = iter(texts)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield from _clean_batch(batch, tokenizer, stop_words, as_tokens)
+
+def clean_texts(texts: Iterable[str], tokenizer: Optional[TechTokenizer] = None,
+                stop_words: Optional[FrozenSet[str]] = None, as_tokens: bool = False,
+                batch_size: int = 512, stream: bool = False):
+    """Batch version of clean_text with the tech-aware tokenizer; ``stream=True`` returns a generator."""
+    cleaned = iter_clean_texts(texts, tokenizer, stop_words, as_tokens, batch_size)
+    return cleaned if stream else list(cleaned)
@@ -0,0 +1,406 @@
+# vector_index.py
+"""
+On-disk per-section embedding index for retrieving the best documents for a query.
+
+Each indexed document (a resume by default) stores one ``all-MiniLM-L6-v2`` vector per
+scored section (skills / experience / education), as float32 or as int8 with a
+per-row scale. Search scores every section with a blocked matrix product and combines
+the section scores exactly like ``match_resume_to_jd`` (same scaling, same mean over
+non-zero sections), so ``index.search(jd_text, k)`` returns the same numbers as
+``rank_resumes`` without re-extracting or re-embedding the pool.
+
+Optional approximate mode: an IVF (k-means inverted file) over the concatenated section
+vectors picks candidate rows from the ``nprobe`` closest lists, which are then scored
+exactly.
+
+Layout of an index directory::
+
+    meta.json              model, dtype, dim, sections, context
+    ids.json               document ids, row order
+    vectors_<section>.npy  (rows, dim) float32 or int8
+    scales.npy             (sections, rows) float32, int8 only
+    present.npy            (sections, rows) bool, section text was non-empty
+    hashes.npy             (sections, rows) uint64, hash of the section text
+    deleted.npy            (rows,) bool tombstones
+    ivf_centroids.npy      (lists, sections * dim) float32, once trained
+    ivf_assign.npy         (rows,) int32, once trained
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+import matching
+from embedding_cache import get_embedding_cache
+from model_registry import get_embedding_model
+
+BLOCK_ROWS = 65536
+# Candidates per thread before search_vectors starts scoring blocks in parallel
+PARALLEL_ROWS = 16384
+
+
+def _section_hash(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _grown(array: np.ndarray, size: int, needed: int, axis: int = 0) -> np.ndarray:
+    """``array`` with room for ``needed`` rows along ``axis``, keeping its first ``size``."""
+    if needed <= array.shape[axis]:
+        return array
+    # Grow geometrically so one-at-a-time ingestion stays amortized O(1)
+    shape = list(array.shape)
+    shape[axis] = max(needed, 2 * shape[axis], 1024)
+    grown = np.zeros(shape, dtype=array.dtype)
+    rows = (slice(None),) * axis + (slice(0, size),)
+    grown[rows] = array[rows]
+    return grown
+
+
+def _quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    scale = np.abs(vectors).max(axis=1) / 127.0
+    scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+    return np.round(vectors / scale[:, None]).astype(np.int8), scale
+
+
+class SectionIndex:
+
+    def __init__(self, path: Optional[str] = None, dtype: str = "float32", context: str = "resume",
+                 sections: Optional[List[str]] = None, model_name: str = matching.EMBEDDING_MODEL_NAME):
+        if dtype not in ("float32", "int8"):
+            raise ValueError("dtype must be 'float32' or 'int8'")
+        self.path = path
+        self.dtype = dtype
+        self.context = context
+        self.sections = list(sections or matching.SECTIONS)
+        self.model_name = model_name
+        self.dim: Optional[int] = None
+
+        self.ids: List = []
+        self._row_of: Dict = {}
+        # Row arrays below keep spare capacity past _size, like dedup.DedupIndex
+        self._size = 0
+        self.vectors: List[Optional[np.ndarray]] = [None] * len(self.sections)
+        self.scales = np.zeros((len(self.sections), 0), dtype=np.float32)
+        self.present = np.zeros((len(self.sections), 0), dtype=bool)
+        self.hashes = np.zeros((len(self.sections), 0), dtype=np.uint64)
+        self.deleted = np.zeros(0, dtype=bool)
+        self.ivf_centroids: Optional[np.ndarray] = None
+        self.ivf_assign: Optional[np.ndarray] = None
+
+        if path and os.path.exists(os.path.join(path, "meta.json")):
+            self._load()
+
+    # ----- persistence -----
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _save_array(self, name: str, array: np.ndarray) -> None:
+        # Write beside the target and swap it in: the loaded vectors may be a memory map
+        # of the very file being replaced, which must not be truncated underneath it
+        tmp_path = self._file(f"{name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.asarray(array))
+        os.replace(tmp_path, self._file(name))
+
+    def _load(self) -> None:
+        with open(self._file("meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dtype, self.context, self.sections = meta["dtype"], meta["context"], meta["sections"]
+        self.model_name, self.dim = meta["model"], meta["dim"]
+        with open(self._file("ids.json"), "r", encoding="utf-8") as f:
+            self.ids = json.load(f)
+        self.deleted = np.load(self._file("deleted.npy"))
+        self._size = len(self.ids)
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self.ids) if not self.deleted[row]}
+        # Vectors stay memory-mapped: a large pool is paged in by the OS as it is scanned
+        self.vectors = [np.load(self._file(f"vectors_{s}.npy"), mmap_mode="r") for s in self.sections]
+        self.present = np.load(self._file("present.npy"))
+        self.hashes = np.load(self._file("hashes.npy"))
+        self.scales = np.load(self._file("scales.npy"))
+        if os.path.exists(self._file("ivf_centroids.npy")):
+            self.ivf_centroids = np.load(self._file("ivf_centroids.npy"))
+            self.ivf_assign = np.load(self._file("ivf_assign.npy"))
+
+    def save(self) -> None:
+        if not self.path:
+            raise ValueError("This index has no path; pass one to SectionIndex() to persist it")
+        os.makedirs(self.path, exist_ok=True)
+        n = self._size
+        for s, section in enumerate(self.sections):
+            if self.vectors[s] is not None:
+                self._save_array(f"vectors_{section}.npy", self.vectors[s][:n])
+        self._save_array("present.npy", self.present[:, :n])
+        self._save_array("hashes.npy", self.hashes[:, :n])
+        self._save_array("scales.npy", self.scales[:, :n])
+        self._save_array("deleted.npy", self.deleted[:n])
+        if self.ivf_centroids is not None:
+            self._save_array("ivf_centroids.npy", self.ivf_centroids)
+            self._save_array("ivf_assign.npy", self.ivf_assign[:n])
+        with open(self._file("ids.json"), "w", encoding="utf-8") as f:
+            json.dump(self.ids, f)
+        # meta.json last: its presence marks a complete index
+        with open(self._file("meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "dtype": self.dtype, "dim": self.dim,
+                       "context": self.context, "sections": self.sections}, f)
+
+    # ----- building -----
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, doc_id) -> bool:
+        return doc_id in self._row_of
+
+    def embed_sections(self, section_texts: List[Dict[str, str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(sections, n, dim) normalized vectors, presence mask and text hashes for extracted sections."""
+        model = get_embedding_model(self.model_name)
+        cache = get_embedding_cache(self.model_name)
+        n = len(section_texts)
+        vectors = None
+        present = np.zeros((len(self.sections), n), dtype=bool)
+        hashes = np.zeros((len(self.sections), n), dtype=np.uint64)
+        for s, section in enumerate(self.sections):
+            texts = [doc.get(section, "").strip() for doc in section_texts]
+            rows = [i for i, text in enumerate(texts) if text]
+            if rows:
+                embedded = cache.encode(model, [texts[i] for i in rows], normalize=True)
+                if vectors is None:
+                    vectors = np.zeros((len(self.sections), n, embedded.shape[1]), dtype=np.float32)
+                vectors[s, rows] = embedded
+                present[s, rows] = True
+                hashes[s, rows] = [_section_hash(texts[i]) for i in rows]
+        if vectors is None:
+            dim = self.dim or int(model.get_sentence_embedding_dimension())
+            vectors = np.zeros((len(self.sections), n, dim), dtype=np.float32)
+        return vectors, present, hashes
+
+    def add_many(self, documents: Union[Dict, Iterable[Tuple]], dedup=None) -> None:
+        """
+        Add or replace documents from ``{doc_id: text}`` or ``(doc_id, text)`` pairs.
+
+        With a ``dedup.DedupIndex``, a document that duplicates one already in this index
+        copies that document's vectors instead of being extracted and embedded again.
+        """
+        items = list(documents.items()) if isinstance(documents, dict) else list(documents)
+        if not items:
+            return
+        copies = []
+        if dedup is not None:
+            fresh = []
+            for doc_id, text in items:
+                match = dedup.register(doc_id, text or "")
+                if match is not None and match.id in self._row_of and match.id != doc_id:
+                    copies.append((doc_id, self._row_of[match.id]))
+                else:
+                    fresh.append((doc_id, text))
+            items = fresh
+        if copies:
+            self.add_vectors([doc_id for doc_id, _ in copies], *self._row_vectors([row for _, row in copies]))
+        if items:
+            extracted = matching.extract_sections_many([(text or "", self.context) for _, text in items])
+            self.add_vectors([doc_id for doc_id, _ in items], *self.embed_sections(extracted))
+
+    def _row_vectors(self, rows: List[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The stored (sections, n, dim) vectors, presence and hashes of existing rows."""
+        rows = np.asarray(rows, dtype=np.int64)
+        vectors = np.zeros((len(self.sections), len(rows), self.dim), dtype=np.float32)
+        for s in range(len(self.sections)):
+            if self.vectors[s] is not None:
+                block = np.asarray(self.vectors[s][rows], dtype=np.float32)
+                vectors[s] = block * self.scales[s, rows, None] if self.dtype == "int8" else block
+        return vectors, self.present[:, rows], self.hashes[:, rows]
+
+    def add(self, doc_id, text: str) -> None:
+        self.add_many([(doc_id, text)])
+
+    def add_vectors(self, doc_ids: List, vectors: np.ndarray, present: np.ndarray, hashes: np.ndarray) -> None:
+        """Append precomputed (sections, n, dim) normalized section vectors."""
+        for doc_id in doc_ids:
+            if doc_id in self._row_of:
+                self.delete(doc_id)
+        if self.dim is None:
+            self.dim = int(vectors.shape[2])
+
+        start, needed = self._size, self._size + len(doc_ids)
+        new_scales = np.ones((len(self.sections), len(doc_ids)), dtype=np.float32)
+        # A memory-mapped array is copied into memory once, on its first growth
+        for s in range(len(self.sections)):
+            block = vectors[s]
+            if self.dtype == "int8":
+                block, new_scales[s] = _quantize(block)
+            old = self.vectors[s]
+            if old is None:
+                old = np.zeros((0, self.dim), dtype=np.int8 if self.dtype == "int8" else np.float32)
+            self.vectors[s] = _grown(old, start, needed)
+            self.vectors[s][start:needed] = block
+        self.scales = _grown(self.scales, start, needed, axis=1)
+        self.present = _grown(self.present, start, needed, axis=1)
+        self.hashes = _grown(self.hashes, start, needed, axis=1)
+        self.deleted = _grown(self.deleted, start, needed)
+        self.scales[:, start:needed] = new_scales
+        self.present[:, start:needed] = present
+        self.hashes[:, start:needed] = hashes
+        self.deleted[start:needed] = False
+
+        for offset, doc_id in enumerate(doc_ids):
+            self.ids.append(doc_id)
+            self._row_of[doc_id] = start + offset
+        self._size = needed
+
+        if self.ivf_centroids is not None:
+            assign = self._nearest_lists(self._concat_rows(np.arange(start, needed)), 1)[:, 0]
+            self.ivf_assign = _grown(self.ivf_assign, start, needed)
+            self.ivf_assign[start:needed] = assign
+
+    def delete(self, doc_id) -> bool:
+        """Tombstone a document; the row is dropped for good by ``compact()``."""
+        row = self._row_of.pop(doc_id, None)
+        if row is None:
+            return False
+        self.deleted[row] = True
+        return True
+
+    def compact(self) -> None:
+        """Rewrite the arrays without deleted rows."""
+        keep = np.flatnonzero(~self.deleted[:self._size])
+        self.vectors = [None if v is None else np.asarray(v)[keep] for v in self.vectors]
+        self.scales, self.present, self.hashes = self.scales[:, keep], self.present[:, keep], self.hashes[:, keep]
+        self.ids = [self.ids[i] for i in keep]
+        self._size = len(self.ids)
+        self.deleted = np.zeros(self._size, dtype=bool)
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        if self.ivf_assign is not None:
+            self.ivf_assign = self.ivf_assign[keep]
+
+    # ----- approximate mode -----
+
+    def _concat_rows(self, rows: np.ndarray) -> np.ndarray:
+        parts = []
+        for s in range(len(self.sections)):
+            block = np.asarray(self.vectors[s][rows], dtype=np.float32)
+            parts.append(block * self.scales[s, rows, None] if self.dtype == "int8" else block)
+        return np.concatenate(parts, axis=1)
+
+    def _nearest_lists(self, points: np.ndarray, nprobe: int) -> np.ndarray:
+        scores = points @ self.ivf_centroids.T
+        nprobe = min(nprobe, scores.shape[1])
+        return np.argsort(-scores, axis=1)[:, :nprobe]
+
+    def train_ivf(self, n_lists: Optional[int] = None, iterations: int = 10, sample: int = 50000, seed: int = 0) -> None:
+        """Cluster the live rows with spherical k-means to enable ``approximate=True`` search."""
+        live = np.flatnonzero(~self.deleted[:self._size])
+        if len(live) == 0:
+            return
+        n_lists = n_lists or max(1, int(np.sqrt(len(live))))
+        rng = np.random.default_rng(seed)
+        train = self._concat_rows(rng.choice(live, size=min(sample, len(live)), replace=False))
+        centroids = train[rng.choice(len(train), size=min(n_lists, len(train)), replace=False)]
+        for _ in range(iterations):
+            assign = np.argmax(train @ centroids.T, axis=1)
+            for c in range(len(centroids)):
+                members = train[assign == c]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+        self.ivf_centroids = centroids.astype(np.float32)
+        assign = np.zeros(len(self.ids), dtype=np.int32)
+        for start in range(0, len(self.ids), BLOCK_ROWS):
+            rows = np.arange(start, min(start + BLOCK_ROWS, len(self.ids)))
+            assign[rows] = self._nearest_lists(self._concat_rows(rows), 1)[:, 0]
+        self.ivf_assign = assign
+
+    # ----- search -----
+
+    def _score_rows(self, rows: np.ndarray, query: np.ndarray, query_present: np.ndarray,
+                    query_hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        section_scores = np.zeros((len(self.sections), len(rows)), dtype=np.float64)
+        # A contiguous run of rows (the common case without deletions) is sliced, not copied
+        select = slice(rows[0], rows[-1] + 1) if len(rows) and rows[-1] - rows[0] + 1 == len(rows) else rows
+        for s in range(len(self.sections)):
+            if not query_present[s] or self.vectors[s] is None:
+                continue
+            block = np.asarray(self.vectors[s][select], dtype=np.float32)
+            similarities = (block @ query[s]).astype(np.float64)
+            if self.dtype == "int8":
+                similarities = similarities * self.scales[s, rows]
+            scores = matching.round_scores(matching.scale_similarity(similarities))
+            # Same shortcuts as calculate_simple_similarity: empty -> 0, identical -> 100
+            scores = np.where(self.hashes[s, rows] == query_hashes[s], 100.0, scores)
+            section_scores[s] = np.where(self.present[s, rows], scores, 0.0)
+        return section_scores, matching.overall_from_sections(section_scores)
+
+    def _top_block(self, rows: np.ndarray, query: np.ndarray, query_present: np.ndarray,
+                   query_hashes: np.ndarray, k: Optional[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        section_scores, overall = self._score_rows(rows, query, query_present, query_hashes)
+        if k is not None and len(rows) > k:
+            keep = np.lexsort((rows, -overall))[:k]
+            rows, overall, section_scores = rows[keep], overall[keep], section_scores[:, keep]
+        return rows, overall, section_scores
+
+    def search_vectors(self, query: np.ndarray, query_present: np.ndarray, query_hashes: np.ndarray,
+                       k: Optional[int] = 10, approximate: bool = False, nprobe: int = 8,
+                       workers: Optional[int] = None) -> List[Dict]:
+        """
+        Top-k live rows for one precomputed (sections, dim) query (``k=None``: every row).
+
+        Large candidate sets are split into blocks scored on ``workers`` threads (numpy
+        releases the GIL in the matrix products); by default one thread per
+        ``PARALLEL_ROWS`` candidates, up to the CPU count.
+        """
+        if approximate and self.ivf_centroids is not None:
+            concat = np.concatenate([query[s] if query_present[s] else np.zeros_like(query[s])
+                                     for s in range(len(self.sections))])
+            lists = self._nearest_lists(concat[None, :], nprobe)[0]
+            n = self._size
+            candidates = np.flatnonzero(np.isin(self.ivf_assign[:n], lists) & ~self.deleted[:n])
+        else:
+            candidates = np.flatnonzero(~self.deleted[:self._size])
+
+        if workers is None:
+            workers = min(os.cpu_count() or 1, len(candidates) // PARALLEL_ROWS)
+        workers = max(1, workers)
+        block_rows = min(BLOCK_ROWS, max(1, -(-len(candidates) // workers)))
+        blocks = [candidates[start:start + block_rows] for start in range(0, len(candidates), block_rows)]
+
+        def score_block(rows):
+            return self._top_block(rows, query, query_present, query_hashes, k)
+
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_overall = np.zeros(0)
+        best_sections = np.zeros((len(self.sections), 0))
+        if workers > 1 and len(blocks) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                scored = list(pool.map(score_block, blocks))
+        else:
+            scored = map(score_block, blocks)
+        for rows, overall, section_scores in scored:
+            best_rows = np.concatenate([best_rows, rows])
+            best_overall = np.concatenate([best_overall, overall])
+            best_sections = np.concatenate([best_sections, section_scores], axis=1)
+            if k is not None and len(best_rows) > k:
+                # Keep only the running top-k so memory stays bounded by the block size
+                keep = np.lexsort((best_rows, -best_overall))[:k]
+                best_rows, best_overall, best_sections = best_rows[keep], best_overall[keep], best_sections[:, keep]
+
+        order = np.lexsort((best_rows, -best_overall))[:k]
+        return [
+            {
+                "id": self.ids[best_rows[i]],
+                "overall": float(best_overall[i]),
+                "sections": {section: float(best_sections[s, i]) for s, section in enumerate(self.sections)},
+            }
+            for i in order
+        ]
+
+    def search(self, query_text: str, k: Optional[int] = 10, approximate: bool = False, nprobe: int = 8,
+               query_context: str = "job description", workers: Optional[int] = None) -> List[Dict]:
+        """Best k indexed documents for ``query_text`` (a JD when indexing resumes)."""
+        if not len(self) or not query_text or not query_text.strip():
+            return []
+        extracted = matching.extract_sections(query_text, query_context)
+        vectors, present, hashes = self.embed_sections([extracted])
+        return self.search_vectors(vectors[:, 0], present[:, 0], hashes[:, 0], k, approximate, nprobe, workers)